@@ -0,0 +1,107 @@
+"""Measure queued_emails size and scan time before/after moving bodies to the body store.
+
+Usage: python -m benchmarks.body_store [--rows N]
+
+Seeds a throwaway SQLite database with inline bodies shaped like real traffic
+(a compose fanned out to many recipients plus personalised campaign mail),
+then reports file size and full-scan latency before and after
+``migrate_inline_bodies`` as JSON.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timezone
+
+
+def _scan_seconds(engine, repeats: int = 5) -> float:
+    from sqlalchemy import text
+
+    timings = []
+    with engine.connect() as conn:
+        for _ in range(repeats):
+            started = time.perf_counter()
+            # An unindexed predicate forces SQLite to walk every row's pages.
+            conn.execute(
+                text("SELECT COUNT(*) FROM queued_emails WHERE to_address LIKE '%@example.org'")
+            ).scalar()
+            timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def _file_size(engine, path: str) -> int:
+    from sqlalchemy import text
+
+    with engine.connect() as conn:
+        conn.execute(text("VACUUM"))
+    return os.path.getsize(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="pm-bench-")
+    db_path = os.path.join(workdir, "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    from protonmailer import database
+    from protonmailer.models import QueuedEmail
+    from protonmailer.services.body_store import migrate_inline_bodies
+
+    database.init_db()
+    now = datetime.now(timezone.utc)
+    newsletter = "<html><body>" + "<p>Monthly product update and release notes.</p>" * 80 + "</body></html>"
+    rows = []
+    for index in range(args.rows):
+        if index % 2:
+            body = newsletter
+        else:
+            body = newsletter.replace("Monthly", f"Hi contact {index}, monthly")
+        rows.append(
+            {
+                "account_id": 1,
+                "from_address": "sender@example.com",
+                "to_address": f"user{index}@example.com",
+                "subject": "Update",
+                "_body_html": body,
+                "scheduled_for": now,
+                "status": "sent",
+                "source": "campaign",
+                "priority": 0,
+                "attempts": 1,
+            }
+        )
+    with database.SessionLocal() as session:
+        session.bulk_insert_mappings(QueuedEmail, rows)
+        session.commit()
+
+    before = {"bytes": _file_size(database.engine, db_path), "scan_seconds": _scan_seconds(database.engine)}
+    with database.SessionLocal() as session:
+        started = time.perf_counter()
+        stats = migrate_inline_bodies(session)
+        migrate_seconds = time.perf_counter() - started
+    after = {"bytes": _file_size(database.engine, db_path), "scan_seconds": _scan_seconds(database.engine)}
+
+    print(
+        json.dumps(
+            {
+                "rows": args.rows,
+                "migrated_rows": stats["rows"],
+                "migrate_seconds": round(migrate_seconds, 3),
+                "before": before,
+                "after": after,
+                "size_ratio": round(after["bytes"] / before["bytes"], 3),
+                "scan_speedup": round(before["scan_seconds"] / after["scan_seconds"], 2),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
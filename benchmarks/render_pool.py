@@ -0,0 +1,99 @@
+"""Measure campaign render throughput against process-pool size.
+
+Usage: python -m benchmarks.render_pool [--contacts N] [--workers 1,2,4]
+
+Renders a heavily personalised template (loops, filters, conditionals) for a
+synthetic audience through ``render_contexts`` at each worker count and prints
+messages per second and speedup over inline rendering as JSON. Worker counts
+default to powers of two up to ``os.cpu_count()``.
+"""
+
+import argparse
+import json
+import os
+import time
+
+SUBJECT = "{{ first_name | default('there', true) | title }}, your {{ month }} digest"
+BODY = """<html><body>
+<h1>Hello {{ name | default('friend', true) }}</h1>
+{% for item in items %}
+<div class="item {{ loop.cycle('odd', 'even') }}">
+  <h2>{{ item.title | title }}</h2>
+  <p>{{ item.summary | truncate(120) }}</p>
+  {% if item.price %}<strong>{{ '%.2f' | format(item.price) }}</strong>{% endif %}
+  <a href="https://example.com/r?u={{ email | urlencode }}&i={{ loop.index }}">Read more</a>
+</div>
+{% endfor %}
+<p>Sent to {{ email }}.</p>
+</body></html>"""
+
+
+def _items(count: int) -> list[tuple[int, dict]]:
+    catalogue = [
+        {"title": f"product update {n}", "summary": "Release notes and improvements. " * 8, "price": n * 1.5}
+        for n in range(40)
+    ]
+    return [
+        (
+            index,
+            {
+                "name": f"Contact {index}",
+                "first_name": f"contact{index}",
+                "email": f"user{index}@example.com",
+                "month": "October",
+                "items": catalogue[index % 10 : index % 10 + 30],
+            },
+        )
+        for index in range(count)
+    ]
+
+
+def _worker_counts(spec: str | None) -> list[int]:
+    if spec:
+        return [int(part) for part in spec.split(",")]
+    cores = os.cpu_count() or 1
+    counts, workers = [1], 2
+    while workers <= cores:
+        counts.append(workers)
+        workers *= 2
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--contacts", type=int, default=20_000)
+    parser.add_argument("--workers", help="comma-separated worker counts")
+    args = parser.parse_args()
+
+    from protonmailer.config import get_settings
+    from protonmailer.services.render_pool import render_contexts
+
+    get_settings().RENDER_POOL_MIN_CONTACTS = 0
+    items = _items(args.contacts)
+    results = []
+    for workers in _worker_counts(args.workers):
+        started = time.perf_counter()
+        rendered = sum(len(chunk) for chunk in render_contexts(SUBJECT, BODY, items, workers=workers))
+        elapsed = time.perf_counter() - started
+        results.append({"workers": workers, "seconds": round(elapsed, 3), "msg_per_s": round(rendered / elapsed)})
+
+    baseline = results[0]["msg_per_s"]
+    for result in results:
+        result["speedup"] = round(result["msg_per_s"] / baseline, 2)
+    print(
+        json.dumps(
+            {
+                "contacts": args.contacts,
+                "cpu_count": os.cpu_count(),
+                "chunk_size": get_settings().RENDER_CHUNK_SIZE,
+                "results": results,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
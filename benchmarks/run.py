@@ -0,0 +1,312 @@
+"""End-to-end throughput scenarios against a throwaway database and a local SMTP sink.
+
+Usage: python -m benchmarks.run [--scenario NAME ...] [--contacts N] [--output FILE]
+
+Scenarios:
+  campaign_enqueue  run_campaigns over the seeded audience
+  queue_drain       process_queued_emails until the queue is empty, via the sink
+  csv_import        POST /contacts/import-csv (create, then update)
+  csv_export        GET /contacts/export-csv
+  endpoints         dashboard and list pages, logged in
+
+Every scenario runs in its own interpreter against its own SQLite file so peak
+RSS is per scenario. Results are printed (or written) as JSON with items/sec,
+p50/p99 latency in ms and peak RSS in MB.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+SCENARIOS = ("campaign_enqueue", "queue_drain", "csv_import", "csv_export", "endpoints")
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _result(name: str, items: int, seconds: float, latencies: list[float], **extra) -> dict:
+    return {
+        "scenario": name,
+        "items": items,
+        "seconds": round(seconds, 3),
+        "items_per_s": round(items / seconds, 1) if seconds else 0.0,
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 3),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        **extra,
+    }
+
+
+def _timed(latencies: list[float], func):
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+    return wrapper
+
+
+def _client(**kwargs):
+    from fastapi.testclient import TestClient
+
+    from protonmailer import main
+
+    return TestClient(main.app, **kwargs)
+
+
+def campaign_enqueue(args) -> dict:
+    from protonmailer import database, scheduler
+    from protonmailer.models import QueuedEmail
+
+    from benchmarks.seed import seed
+
+    with database.SessionLocal() as session:
+        seed(session, args.contacts, args.campaigns, render_mode=args.render_mode)
+
+    latencies: list[float] = []
+    scheduler._enqueue_campaign_emails = _timed(latencies, scheduler._enqueue_campaign_emails)
+    started = time.perf_counter()
+    scheduler.run_campaigns()
+    elapsed = time.perf_counter() - started
+
+    with database.SessionLocal() as session:
+        enqueued = session.query(QueuedEmail).count()
+    return _result("campaign_enqueue", enqueued, elapsed, latencies, latency_unit="campaign run")
+
+
+MAX_DRAIN_TICKS = 1_000
+
+
+def _due_count(session_factory, queued_email) -> int:
+    from datetime import datetime, timezone
+
+    with session_factory() as session:
+        return (
+            session.query(queued_email)
+            .filter(
+                queued_email.status == "queued",
+                queued_email.scheduled_for <= datetime.now(timezone.utc),
+            )
+            .count()
+        )
+
+
+def queue_drain(args) -> dict:
+    from protonmailer import database, scheduler
+    from protonmailer.config import get_settings
+    from protonmailer.models import QueuedEmail
+
+    from benchmarks.seed import seed
+    from benchmarks.smtp_sink import SMTPSink
+
+    sink = SMTPSink(
+        latency=args.smtp_latency, error_rate=args.error_rate, error_reply=args.error_reply, seed=1
+    )
+    with sink:
+        with database.SessionLocal() as session:
+            seed(session, args.contacts, args.campaigns, smtp_port=sink.port, render_mode=args.render_mode)
+        scheduler.run_campaigns()
+        # Injected failures are transient; retry them on the next tick rather than after backoff.
+        get_settings().RETRY_BASE_SECONDS = 0
+        get_settings().RETRY_MAX_SECONDS = 0
+
+        latencies: list[float] = []
+        scheduler.send_email = _timed(latencies, scheduler.send_email)
+        started = time.perf_counter()
+        ticks = 0
+        idle_ticks = 0
+        # Stop once nothing is left, or after a few ticks without a single SMTP
+        # transaction (e.g. the account is paused after a throttling reply).
+        while idle_ticks < 3 and ticks < MAX_DRAIN_TICKS:
+            before = sink.accepted + sink.rejected
+            scheduler.process_queued_emails()
+            ticks += 1
+            idle_ticks = idle_ticks + 1 if sink.accepted + sink.rejected == before else 0
+            if not _due_count(database.SessionLocal, QueuedEmail):
+                break
+        elapsed = time.perf_counter() - started
+
+        with database.SessionLocal() as session:
+            remaining = session.query(QueuedEmail).filter(QueuedEmail.status == "queued").count()
+    return _result(
+        "queue_drain",
+        sink.accepted,
+        elapsed,
+        latencies,
+        latency_unit="send_email call",
+        rejected=sink.rejected,
+        ticks=ticks,
+        remaining_queued=remaining,
+        smtp_latency_ms=args.smtp_latency * 1000,
+    )
+
+
+def _csv(rows: int, tag: str) -> bytes:
+    lines = ["email,name,tags"]
+    lines.extend(f"user{index}@example.com,User {index},{tag}" for index in range(rows))
+    return ("\n".join(lines) + "\n").encode()
+
+
+def csv_import(args) -> dict:
+    client = _client()
+    latencies: list[float] = []
+    started = time.perf_counter()
+    for tag in ("imported", "updated"):
+        request_started = time.perf_counter()
+        response = client.post(
+            "/contacts/import-csv", files={"file": ("contacts.csv", _csv(args.contacts, tag), "text/csv")}
+        )
+        latencies.append(time.perf_counter() - request_started)
+        response.raise_for_status()
+    elapsed = time.perf_counter() - started
+    return _result("csv_import", args.contacts * 2, elapsed, latencies, latency_unit="request")
+
+
+def csv_export(args) -> dict:
+    from protonmailer import database
+
+    from benchmarks.seed import seed
+
+    with database.SessionLocal() as session:
+        seed(session, args.contacts, args.campaigns)
+
+    client = _client()
+    latencies: list[float] = []
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        request_started = time.perf_counter()
+        response = client.get("/contacts/export-csv")
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - request_started)
+    elapsed = time.perf_counter() - started
+    return _result("csv_export", args.contacts * args.repeat, elapsed, latencies, latency_unit="request")
+
+
+def endpoints(args) -> dict:
+    from protonmailer import database, scheduler
+    from protonmailer.config import get_settings
+
+    from benchmarks.seed import seed
+
+    with database.SessionLocal() as session:
+        seed(session, args.contacts, args.campaigns)
+    scheduler.run_campaigns()
+
+    settings = get_settings()
+    client = _client(raise_server_exceptions=False)
+    client.post(
+        "/ui/login",
+        data={"username": settings.ADMIN_USERNAME, "password": settings.ADMIN_PASSWORD},
+        follow_redirects=False,
+    )
+    paths = ["/", "/ui/queue", "/ui/contacts", "/ui/campaigns", "/contacts/?limit=100", "/campaigns/"]
+    latencies: list[float] = []
+    per_path: dict[str, list[float]] = {path: [] for path in paths}
+    errors: dict[str, int] = {}
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        for path in paths:
+            request_started = time.perf_counter()
+            response = client.get(path, follow_redirects=False)
+            took = time.perf_counter() - request_started
+            if response.status_code >= 400:
+                # Reported rather than raised so one broken page does not hide the rest.
+                errors[path] = errors.get(path, 0) + 1
+                continue
+            latencies.append(took)
+            per_path[path].append(took)
+    elapsed = time.perf_counter() - started
+    return _result(
+        "endpoints",
+        len(latencies),
+        elapsed,
+        latencies,
+        latency_unit="request",
+        p50_ms_by_path={
+            path: round(_percentile(values, 0.5) * 1000, 3) for path, values in per_path.items() if values
+        },
+        errors_by_path=errors,
+    )
+
+
+def _run_one(args) -> dict:
+    """Run a single scenario in this process (the child side of ``main``)."""
+
+    workdir = tempfile.mkdtemp(prefix="pm-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    from protonmailer import database, models  # noqa: F401  (registers the tables)
+
+    database.init_db()
+    return globals()[args.only](args)
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="repeatable; default all")
+    parser.add_argument("--contacts", type=int, default=2_000)
+    parser.add_argument("--campaigns", type=int, default=4)
+    parser.add_argument("--render-mode", choices=["eager", "lazy"], default="eager")
+    parser.add_argument("--smtp-latency", type=float, default=0.0, help="seconds per message")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of messages rejected")
+    parser.add_argument("--error-reply", default="450 4.3.0 Injected temporary failure")
+    parser.add_argument("--repeat", type=int, default=20, help="requests per path")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    parser.add_argument("--only", choices=SCENARIOS, help=argparse.SUPPRESS)
+    return parser
+
+
+def main() -> None:
+    args = _parser().parse_args()
+    if args.only:
+        print(json.dumps(_run_one(args)))
+        return
+
+    passthrough = [
+        f"--contacts={args.contacts}",
+        f"--campaigns={args.campaigns}",
+        f"--render-mode={args.render_mode}",
+        f"--smtp-latency={args.smtp_latency}",
+        f"--error-rate={args.error_rate}",
+        f"--error-reply={args.error_reply}",
+        f"--repeat={args.repeat}",
+    ]
+    results = []
+    for name in args.scenario or SCENARIOS:
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks.run", f"--only={name}", *passthrough],
+            capture_output=True,
+            text=True,
+        )
+        if completed.returncode != 0:
+            results.append({"scenario": name, "error": completed.stderr.strip().splitlines()[-1:]})
+            continue
+        results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    report = json.dumps({"python": sys.version.split()[0], "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
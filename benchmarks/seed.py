@@ -0,0 +1,105 @@
+"""Seed a database with contacts, a template and campaigns for benchmarking.
+
+Usage: python -m benchmarks.seed --database sqlite:///bench.db [--contacts N] [--campaigns C]
+
+Contacts are spread evenly over C tags (``seg0`` .. ``seg{C-1}``), one due
+one-time campaign per tag, all sending through a single account that points at
+``--smtp-host``/``--smtp-port`` (see ``benchmarks.smtp_sink``).
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+TEMPLATE_SUBJECT = "{{ first_name | default('Hello', true) }}, your weekly update"
+TEMPLATE_BODY = """<html><body>
+<h1>Hi {{ name | default('there', true) }}</h1>
+{% for n in range(12) %}<p>Item {{ n }} picked for {{ email }}.</p>{% endfor %}
+</body></html>"""
+
+
+def seed(
+    session,
+    contacts: int,
+    campaigns: int = 1,
+    smtp_host: str = "127.0.0.1",
+    smtp_port: int = 2525,
+    render_mode: str = "eager",
+) -> dict[str, int]:
+    """Insert the benchmark fixture; returns the ids and counts created."""
+
+    from protonmailer.models import Account, Campaign, Contact, Template
+
+    account = Account(
+        display_name="Benchmark",
+        email_address="bench@example.com",
+        smtp_host=smtp_host,
+        smtp_port=smtp_port,
+        smtp_username="bench",
+        smtp_password_encrypted="bench",
+        use_ssl=False,
+        use_tls=False,
+    )
+    template = Template(name="Benchmark", subject=TEMPLATE_SUBJECT, body_html=TEMPLATE_BODY)
+    session.add_all([account, template])
+    session.flush()
+
+    run_at = (datetime.now(timezone.utc) - timedelta(minutes=1)).isoformat()
+    session.add_all(
+        Campaign(
+            name=f"Benchmark {index}",
+            account_id=account.id,
+            template_id=template.id,
+            schedule_type="one_time",
+            schedule_config={"freq": "once", "run_at": run_at},
+            target_tags=f"seg{index}",
+            render_mode=render_mode,
+            active=True,
+        )
+        for index in range(campaigns)
+    )
+    session.bulk_insert_mappings(
+        Contact,
+        [
+            {
+                "email": f"user{index}@example.com",
+                "name": f"User{index} Example",
+                "tags": f"seg{index % campaigns},bench",
+                "tags_updated_at": datetime.now(timezone.utc),
+            }
+            for index in range(contacts)
+        ],
+    )
+    session.commit()
+    return {"account_id": account.id, "template_id": template.id, "contacts": contacts, "campaigns": campaigns}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database", required=True, help="SQLAlchemy URL, e.g. sqlite:///bench.db")
+    parser.add_argument("--contacts", type=int, default=10_000)
+    parser.add_argument("--campaigns", type=int, default=1)
+    parser.add_argument("--smtp-host", default="127.0.0.1")
+    parser.add_argument("--smtp-port", type=int, default=2525)
+    parser.add_argument("--render-mode", choices=["eager", "lazy"], default="eager")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database
+    from protonmailer import database, models  # noqa: F401  (registers the tables)
+
+    database.init_db()
+    with database.SessionLocal() as session:
+        result = seed(
+            session,
+            args.contacts,
+            args.campaigns,
+            args.smtp_host,
+            args.smtp_port,
+            args.render_mode,
+        )
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
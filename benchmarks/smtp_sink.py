@@ -0,0 +1,155 @@
+"""A local SMTP sink for benchmarks and end-to-end tests.
+
+Speaks just enough ESMTP for ``smtplib`` and ``send_email``: EHLO/HELO, AUTH
+PLAIN/LOGIN (any credentials), MAIL, RCPT, DATA, RSET, NOOP and QUIT. STARTTLS
+is not offered, so point accounts at it with ``use_ssl=False, use_tls=False``.
+
+Each connection is served on its own thread. ``latency`` delays the reply to
+every accepted message, and ``error_rate`` answers that fraction of messages
+with ``error_reply`` instead of 250. The default reply is a plain transient
+450; pass a 421/451 reply to exercise the throttling path instead.
+
+    with SMTPSink(latency=0.005, error_rate=0.01) as sink:
+        ...  # send to 127.0.0.1:sink.port
+        print(sink.accepted, sink.rejected)
+"""
+
+import random
+import socketserver
+import threading
+import time
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    server: "_SinkServer"
+    # Multi-line replies go out as several small writes; with Nagle on, the
+    # client's delayed ACK adds ~40ms to every EHLO and skews the numbers.
+    disable_nagle_algorithm = True
+
+    def _reply(self, line: str) -> None:
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+        self.wfile.flush()
+
+    def _readline(self) -> str | None:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        return line.decode("utf-8", "replace").rstrip("\r\n")
+
+    def _read_data(self) -> bytes:
+        lines = []
+        while True:
+            line = self.rfile.readline()
+            if not line or line in (b".\r\n", b".\n"):
+                break
+            lines.append(line[1:] if line.startswith(b".") else line)
+        return b"".join(lines)
+
+    def handle(self) -> None:
+        sink = self.server.sink
+        self._reply("220 sink ESMTP ready")
+        while True:
+            line = self._readline()
+            if line is None:
+                return
+            verb, _, argument = line.partition(" ")
+            verb = verb.upper()
+            if verb == "EHLO":
+                self._reply("250-sink")
+                self._reply("250-8BITMIME")
+                self._reply("250-SIZE 104857600")
+                self._reply("250 AUTH PLAIN LOGIN")
+            elif verb == "HELO":
+                self._reply("250 sink")
+            elif verb == "AUTH":
+                mechanism, _, initial = argument.partition(" ")
+                if mechanism.upper() == "LOGIN":
+                    self._reply("334 VXNlcm5hbWU6")
+                    self._readline()
+                    self._reply("334 UGFzc3dvcmQ6")
+                    self._readline()
+                elif not initial:
+                    self._reply("334 ")
+                    self._readline()
+                self._reply("235 2.7.0 Authentication successful")
+            elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                self._reply("250 2.0.0 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                message = self._read_data()
+                if sink.latency:
+                    time.sleep(sink.latency)
+                self._reply(sink.record(message))
+            elif verb == "QUIT":
+                self._reply("221 2.0.0 Bye")
+                return
+            else:
+                self._reply("502 5.5.2 Command not implemented")
+
+
+class _SinkServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: tuple[str, int], sink: "SMTPSink") -> None:
+        self.sink = sink
+        super().__init__(address, _SMTPHandler)
+
+
+class SMTPSink:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        error_reply: str = "450 4.3.0 Injected temporary failure",
+        keep_messages: bool = False,
+        seed: int | None = None,
+    ) -> None:
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_reply = error_reply
+        self.keep_messages = keep_messages
+        self.messages: list[bytes] = []
+        self.accepted = 0
+        self.rejected = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = _SinkServer((host, port), self)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def host(self) -> str:
+        return self._server.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def record(self, message: bytes) -> str:
+        """Count a received message and return the reply to send for it."""
+
+        with self._lock:
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.rejected += 1
+                return self.error_reply
+            self.accepted += 1
+            if self.keep_messages:
+                self.messages.append(message)
+        return "250 2.0.0 Queued"
+
+    def start(self) -> "SMTPSink":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "SMTPSink":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
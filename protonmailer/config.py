@@ -11,6 +11,69 @@ class Settings(BaseSettings):
     ADMIN_USERNAME: str = "admin"
     ADMIN_PASSWORD: str = "change-me"
     SESSION_SECRET: str = "change-me-secret"
+    # Rows left in "sending" longer than this are assumed orphaned by a crash.
+    SEND_LEASE_SECONDS: int = 300
+    # Transient SMTP failures are retried with jittered exponential backoff.
+    MAX_SEND_ATTEMPTS: int = 5
+    RETRY_BASE_SECONDS: int = 60
+    RETRY_MAX_SECONDS: int = 3600
+    # Per-account rate limiting: pace short waits in-tick, defer longer ones.
+    RATE_LIMIT_MAX_WAIT_SECONDS: float = 2.0
+    THROTTLE_PAUSE_SECONDS: float = 5.0
+    # Throttling replies a message may get before they count against its attempts.
+    MAX_THROTTLE_DEFERRALS: int = 20
+    # Open an SMTP endpoint's circuit after this many consecutive connection failures.
+    CIRCUIT_FAILURE_THRESHOLD: int = 3
+    CIRCUIT_RESET_SECONDS: int = 60
+    # Rows claimed per worker tick, shared between the transactional and bulk
+    # lanes in proportion to their weights (unused share spills to the other lane).
+    SEND_BATCH_SIZE: int = 500
+    TRANSACTIONAL_LANE_WEIGHT: int = 4
+    BULK_LANE_WEIGHT: int = 1
+    ATTACHMENT_DIR: str = "./attachments"
+    # Campaign rendering: 0 or 1 renders inline; 2+ uses a process pool for
+    # audiences of at least RENDER_POOL_MIN_CONTACTS. Campaign runs commit and
+    # checkpoint once per RENDER_CHUNK_SIZE contacts.
+    RENDER_WORKERS: int = 0
+    RENDER_CHUNK_SIZE: int = 500
+    RENDER_POOL_MIN_CONTACTS: int = 2000
+    # Composes to more recipients than this are enqueued by a background job.
+    COMPOSE_BACKGROUND_THRESHOLD: int = 500
+    COMPOSE_CHUNK_SIZE: int = 500
+    # Profile each scheduler job's first PROFILE_TICKS ticks after start-up
+    # (jobs can also be armed from the Profiling page); output goes to PROFILE_DIR.
+    PROFILE_TICKS: int = 0
+    PROFILE_DIR: str = "./profiles"
+    # Log a warning when one request or scheduler tick runs more than
+    # SQL_WARN_QUERIES statements, spends over SQL_WARN_SECONDS in the database,
+    # or repeats a statement SQL_REPEAT_THRESHOLD times (a likely N+1).
+    SQL_WARN_QUERIES: int = 200
+    SQL_WARN_SECONDS: float = 1.0
+    SQL_REPEAT_THRESHOLD: int = 20
+    # LOG_FORMAT is "json" or "text". Per-message send logs are sampled, keeping
+    # one in LOG_SAMPLE_EVERY (1 keeps all); each send tick logs a summary.
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    LOG_SAMPLE_EVERY: int = 100
+    # /health/details re-reads queue and database figures at most this often,
+    # and flags a scheduler job whose last good tick is older than the limit.
+    HEALTH_CACHE_SECONDS: float = 10.0
+    HEALTH_STALE_TICK_SECONDS: int = 180
+    # Retention: finished queue rows are archived without bodies this many days
+    # after their last update, and archived rows are deleted after
+    # ARCHIVE_RETENTION_DAYS (0 keeps forever). The purge runs every
+    # RETENTION_INTERVAL_HOURS in batches of RETENTION_BATCH_SIZE rows.
+    RETENTION_SENT_DAYS: int = 30
+    RETENTION_FAILED_DAYS: int = 90
+    RETENTION_CANCELLED_DAYS: int = 30
+    ARCHIVE_RETENTION_DAYS: int = 365
+    RETENTION_BATCH_SIZE: int = 500
+    RETENTION_INTERVAL_HOURS: int = 24
+    # Suppressed addresses are held in memory and re-read from the database at
+    # least every SUPPRESSION_CACHE_SECONDS. With SUPPRESS_HARD_BOUNCES, a
+    # recipient rejected as a bad or disabled mailbox (5.1.x, 5.2.1) is suppressed.
+    SUPPRESSION_CACHE_SECONDS: float = 300.0
+    SUPPRESS_HARD_BOUNCES: bool = True
 
     model_config = SettingsConfigDict(env_file=".env")
 
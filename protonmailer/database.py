@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 from .config import get_settings
@@ -14,29 +14,129 @@ Base = declarative_base()
 
 
 def init_db() -> None:
+    _enable_incremental_vacuum()
+    existing_tables = set(inspect(engine).get_table_names())
     Base.metadata.create_all(bind=engine)
-    _run_sqlite_migrations()
+    _run_sqlite_migrations(existing_tables)
 
 
-def _run_sqlite_migrations() -> None:
-    """Apply lightweight, in-code migrations for SQLite deployments."""
+def _enable_incremental_vacuum() -> None:
+    """Create new SQLite files with auto_vacuum=INCREMENTAL.
+
+    That lets the retention purge hand freed pages back to the filesystem. The
+    mode can only be picked before the first table exists; an existing file
+    keeps its mode until someone runs a full ``VACUUM`` after setting it.
+    """
 
     if not database_url.startswith("sqlite"):
         return
 
     with engine.begin() as conn:
-        columns = {row[1] for row in conn.execute(text("PRAGMA table_info('queued_emails')"))}
-
-        if "source" not in columns:
-            conn.execute(
-                text(
-                    "ALTER TABLE queued_emails ADD COLUMN source TEXT NOT NULL DEFAULT 'manual'"
-                )
-            )
-
-        if "metadata_json" not in columns:
-            conn.execute(
-                text(
-                    "ALTER TABLE queued_emails ADD COLUMN metadata_json TEXT"
-                )
-            )
+        has_tables = conn.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'table'")).first()
+        if not has_tables:
+            conn.execute(text("PRAGMA auto_vacuum = INCREMENTAL"))
+
+
+# Columns added after a table's first release, in the order they were introduced.
+_SQLITE_COLUMN_ADDITIONS: dict[str, list[tuple[str, str]]] = {
+    "accounts": [
+        ("max_per_second", "FLOAT"),
+        ("max_per_hour", "INTEGER"),
+    ],
+    "campaigns": [
+        ("render_mode", "TEXT NOT NULL DEFAULT 'eager'"),
+        ("audience_mode", "TEXT NOT NULL DEFAULT 'full'"),
+    ],
+    "campaign_runs": [
+        ("audience_since", "DATETIME"),
+    ],
+    "contacts": [
+        ("tags_updated_at", "DATETIME"),
+    ],
+    "templates": [
+        ("version", "INTEGER NOT NULL DEFAULT 1"),
+    ],
+    "queued_emails": [
+        ("source", "TEXT NOT NULL DEFAULT 'manual'"),
+        ("metadata_json", "TEXT"),
+        ("claimed_at", "DATETIME"),
+        ("attempts", "INTEGER NOT NULL DEFAULT 0"),
+        ("next_attempt_at", "DATETIME"),
+        ("priority", "INTEGER NOT NULL DEFAULT 0"),
+        ("mime_payload", "BLOB"),
+        ("body_id", "INTEGER REFERENCES email_bodies(id)"),
+        ("contact_id", "INTEGER REFERENCES contacts(id)"),
+        ("template_version", "INTEGER"),
+        ("run_id", "INTEGER REFERENCES campaign_runs(id)"),
+        ("enrollment_id", "INTEGER REFERENCES sequence_enrollments(id)"),
+        ("timeline_json", "TEXT"),
+        ("throttle_deferrals", "INTEGER NOT NULL DEFAULT 0"),
+    ],
+}
+
+# Statements that populate a column right after it is first added.
+_SQLITE_BACKFILLS: dict[tuple[str, str], str] = {
+    ("contacts", "tags_updated_at"): "UPDATE contacts SET tags_updated_at = created_at",
+    ("queued_emails", "priority"): (
+        "UPDATE queued_emails SET priority = 10 "
+        "WHERE source = 'manual' AND campaign_id IS NULL"
+    ),
+}
+
+# Statements that populate a table created in an existing database from rows it already holds.
+_SQLITE_TABLE_BACKFILLS: dict[str, str] = {
+    # One row per (campaign, account, day) of the finished emails still in the queue.
+    "delivery_stats": (
+        "INSERT INTO delivery_stats (campaign_id, account_id, day, sent_count, failed_count, "
+        "cancelled_count, latency_seconds_total) "
+        "SELECT campaign_id, account_id, "
+        "date(CASE WHEN status = 'sent' THEN COALESCE(sent_at, updated_at) ELSE updated_at END), "
+        "SUM(status = 'sent'), SUM(status = 'failed'), SUM(status = 'cancelled'), "
+        "COALESCE(SUM(CASE WHEN status = 'sent' THEN MAX(0, (julianday(sent_at) - "
+        "julianday(MAX(created_at, scheduled_for))) * 86400) END), 0) "
+        "FROM queued_emails WHERE status IN ('sent', 'failed', 'cancelled') "
+        "GROUP BY 1, 2, 3"
+    ),
+}
+
+_SQLITE_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_queued_emails_due "
+    "ON queued_emails (status, priority, scheduled_for)",
+    "CREATE INDEX IF NOT EXISTS ix_queued_emails_body_id ON queued_emails (body_id)",
+    "CREATE INDEX IF NOT EXISTS ix_queued_emails_enrollment_id ON queued_emails (enrollment_id)",
+    "CREATE INDEX IF NOT EXISTS ix_contacts_tags_updated_at ON contacts (tags_updated_at)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ux_queued_emails_run_contact "
+    "ON queued_emails (campaign_id, run_id, contact_id)",
+    "CREATE INDEX IF NOT EXISTS ix_queued_emails_status_updated_at "
+    "ON queued_emails (status, updated_at)",
+]
+
+
+def _run_sqlite_migrations(existing_tables: set[str] | None = None) -> None:
+    """Apply lightweight, in-code migrations for SQLite deployments.
+
+    ``existing_tables`` are the tables present before ``create_all``; tables
+    missing from it are new and get their ``_SQLITE_TABLE_BACKFILLS`` entry.
+    """
+
+    if not database_url.startswith("sqlite"):
+        return
+
+    with engine.begin() as conn:
+
+        for table, additions in _SQLITE_COLUMN_ADDITIONS.items():
+            columns = {row[1] for row in conn.execute(text(f"PRAGMA table_info('{table}')"))}
+            for column, ddl in additions:
+                if column not in columns:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+                    backfill = _SQLITE_BACKFILLS.get((table, column))
+                    if backfill:
+                        conn.execute(text(backfill))
+
+        if existing_tables:
+            for table, backfill in _SQLITE_TABLE_BACKFILLS.items():
+                if table not in existing_tables:
+                    conn.execute(text(backfill))
+
+        for statement in _SQLITE_INDEXES:
+            conn.execute(text(statement))
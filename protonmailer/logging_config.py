@@ -0,0 +1,133 @@
+"""Process-wide logging: a queue in front of the real handlers, JSON lines out.
+
+``configure_logging`` installs a ``QueueHandler`` on the root logger, so a log
+call on the send path only merges the message arguments and puts the record on
+a queue; a ``QueueListener`` thread does the formatting (tracebacks included)
+and the write.
+
+Per-message records opt into sampling with ``extra=SAMPLED``: of those, only
+one in ``LOG_SAMPLE_EVERY`` per call site is kept. Tick summaries carry the
+totals, so sampled-out messages are still accounted for.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+from datetime import datetime, timezone
+
+from protonmailer.config import get_settings
+
+# Pass as ``extra`` on per-message log calls that may be sampled out.
+SAMPLED = {"sampled": True}
+
+# Attributes every LogRecord has; anything else was passed via ``extra``.
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message",
+    "asctime",
+}
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with ``extra`` fields included as keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        timestamp = datetime.fromtimestamp(record.created, timezone.utc)
+        entry = {
+            "ts": timestamp.isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """A ``QueueHandler`` that leaves exception formatting to the listener.
+
+    The stock ``prepare`` formats the whole record on the logging thread,
+    folding any traceback into ``msg`` and dropping ``exc_info``, so the
+    listener's formatter never sees it. Only the message is merged here.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class SampleFilter(logging.Filter):
+    """Keep one in ``every`` records marked ``sampled``, counted per call site.
+
+    ``every`` of 1 keeps them all; 0 drops them all.
+    """
+
+    def __init__(self, every: int) -> None:
+        super().__init__()
+        self.every = every
+        self._seen: dict[tuple[str, object], int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sampled", False) or self.every == 1:
+            return True
+        if self.every <= 0:
+            return False
+        key = (record.name, record.msg)
+        with self._lock:
+            seen = self._seen.get(key, 0)
+            self._seen[key] = seen + 1
+        if seen % self.every:
+            return False
+        record.sample_every = self.every
+        return True
+
+
+def configure_logging() -> logging.handlers.QueueListener:
+    """Route root logging through a queue listener; safe to call more than once."""
+
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    settings = get_settings()
+    output = logging.StreamHandler()
+    if settings.LOG_FORMAT == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    handler = LazyQueueHandler(records)
+    handler.addFilter(SampleFilter(settings.LOG_SAMPLE_EVERY))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
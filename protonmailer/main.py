@@ -1,20 +1,34 @@
 import logging
 
-from fastapi import Depends, FastAPI, Request
+from fastapi import Depends, FastAPI, Request, Response
 from fastapi.responses import JSONResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from starlette.middleware.sessions import SessionMiddleware
 
+from protonmailer import database, schemas
 from protonmailer.config import get_settings
 from protonmailer.dependencies import get_db
 from protonmailer.database import init_db
-from protonmailer.routers import accounts, campaigns, contacts, templates, ui
-from protonmailer.scheduler import start_scheduler
+from protonmailer.logging_config import configure_logging
+from protonmailer.routers import (
+    accounts,
+    attachments,
+    campaigns,
+    contacts,
+    metrics,
+    status,
+    suppressions,
+    templates,
+    ui,
+)
+from protonmailer.scheduler import scheduler, start_scheduler
+from protonmailer.services import health, sql_stats
+from protonmailer.services.body_store import migrate_inline_bodies
 from protonmailer.services.auth_service import require_login
 
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger("protonmailer")
 
 settings = get_settings()
@@ -26,9 +40,26 @@ app.add_middleware(SessionMiddleware, secret_key=settings.SESSION_SECRET)
 template_engine = Jinja2Templates(directory="templates")
 
 
+@app.middleware("http")
+async def track_sql(request: Request, call_next):
+    with sql_stats.track(f"{request.method} <unmatched>") as stats:
+        response = await call_next(request)
+        route = request.scope.get("route")
+        if route is not None:
+            # Label by route template so /contacts/1 and /contacts/2 share a series.
+            stats.scope = f"{request.method} {route.path}"
+    if settings.ENV == "dev":
+        response.headers["X-DB-Queries"] = str(stats.count)
+        response.headers["X-DB-Time-Ms"] = f"{stats.seconds * 1000:.1f}"
+        response.headers["X-DB-Repeated"] = str(len(stats.repeated(settings.SQL_REPEAT_THRESHOLD)))
+    return response
+
+
 @app.on_event("startup")
 def on_startup() -> None:
     init_db()
+    with database.SessionLocal() as session:
+        migrate_inline_bodies(session)
     start_scheduler(app)
 
 
@@ -37,6 +68,15 @@ def read_health(db: Session = Depends(get_db)) -> dict[str, str]:
     return {"status": "ok", "env": settings.ENV}
 
 
+@app.get("/health/details", response_model=schemas.HealthDetails)
+def read_health_details(response: Response):
+    details = health.health_details(scheduler_running=scheduler.running)
+    if details["status"] == "down":
+        # Only an unreachable database takes the instance out of rotation.
+        response.status_code = 503
+    return details
+
+
 @app.get("/", include_in_schema=False)
 def dashboard_root(
     request: Request,
@@ -59,4 +99,8 @@ app.include_router(accounts.router)
 app.include_router(contacts.router)
 app.include_router(templates.router)
 app.include_router(campaigns.router)
+app.include_router(attachments.router)
+app.include_router(suppressions.router)
+app.include_router(status.router)
+app.include_router(metrics.router)
 app.include_router(ui.router)
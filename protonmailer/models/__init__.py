@@ -1,15 +1,32 @@
 from protonmailer.database import Base
 from protonmailer.models.account import Account
+from protonmailer.models.archived_email import ArchivedEmail
+from protonmailer.models.attachment import Attachment
 from protonmailer.models.campaign import Campaign
+from protonmailer.models.campaign_run import CampaignRun
 from protonmailer.models.contact import Contact
+from protonmailer.models.delivery_stat import DeliveryStat
+from protonmailer.models.email_body import EmailBody
+from protonmailer.models.enqueue_job import EnqueueJob
 from protonmailer.models.queued_email import QueuedEmail
+from protonmailer.models.sequence import Sequence, SequenceEnrollment
+from protonmailer.models.suppression import Suppression
 from protonmailer.models.template import Template
 
 __all__ = [
     "Base",
     "Account",
+    "ArchivedEmail",
+    "Attachment",
     "Campaign",
+    "CampaignRun",
     "Contact",
+    "DeliveryStat",
+    "EmailBody",
+    "EnqueueJob",
     "QueuedEmail",
+    "Sequence",
+    "SequenceEnrollment",
+    "Suppression",
     "Template",
 ]
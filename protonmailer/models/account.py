@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, DateTime, Integer, String, func
+from sqlalchemy import Boolean, Column, DateTime, Float, Integer, String, func
 
 from protonmailer.database import Base
 
@@ -15,6 +15,8 @@ class Account(Base):
     smtp_password_encrypted = Column(String, nullable=False)  # TODO: store encrypted
     use_ssl = Column(Boolean, default=False, nullable=False)
     use_tls = Column(Boolean, default=True, nullable=False)
+    max_per_second = Column(Float)
+    max_per_hour = Column(Integer)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
@@ -0,0 +1,37 @@
+import sqlalchemy as sa
+from sqlalchemy import Column, DateTime, Integer, String, Text, func
+
+from protonmailer.database import Base
+
+
+class ArchivedEmail(Base):
+    """A compact record of a queued email removed by the retention purge.
+
+    Keeps who/what/when and the outcome; bodies, MIME payloads and attachment
+    links are dropped. ``id`` is the original queued email id.
+    """
+
+    __tablename__ = "archived_emails"
+    __table_args__ = (
+        # Incremental campaign audiences skip contacts the campaign already mailed.
+        sa.Index("ix_archived_emails_campaign_contact", "campaign_id", "contact_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    campaign_id = Column(Integer)
+    run_id = Column(Integer)
+    enrollment_id = Column(Integer)
+    contact_id = Column(Integer)
+    account_id = Column(Integer, nullable=False)
+    from_address = Column(String, nullable=False)
+    to_address = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    status = Column(String, nullable=False)
+    source = Column(String, nullable=False)
+    attempts = Column(Integer, nullable=False)
+    last_error = Column(Text)
+    timeline_json = Column(Text)
+    scheduled_for = Column(DateTime(timezone=True), nullable=False)
+    sent_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Table, func
+
+from protonmailer.database import Base
+
+# Many queued emails can reference one stored attachment.
+queued_email_attachments = Table(
+    "queued_email_attachments",
+    Base.metadata,
+    Column("queued_email_id", Integer, ForeignKey("queued_emails.id"), primary_key=True),
+    Column("attachment_id", Integer, ForeignKey("attachments.id"), primary_key=True, index=True),
+)
+
+
+class Attachment(Base):
+    """A file stored once on disk, addressed by the SHA-256 of its content."""
+
+    __tablename__ = "attachments"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), nullable=False, unique=True, index=True)
+    filename = Column(String, nullable=False)
+    content_type = Column(String, nullable=False, default="application/octet-stream")
+    size = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -15,6 +15,12 @@ class Campaign(Base):
     schedule_config = Column(JSON, nullable=True)
     target_tags = Column(String)
     active = Column(Boolean, default=True, nullable=False)
+    # "eager" renders every email at enqueue time; "lazy" enqueues only
+    # (contact, template version) and renders in the send worker.
+    render_mode = Column(String, default="eager", nullable=False)
+    # "full" targets every matching contact on each run; "incremental" only
+    # contacts created or re-tagged since the previous run (everyone on the first).
+    audience_mode = Column(String, default="full", nullable=False)
     last_run_at = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, func
+from sqlalchemy.orm import relationship
+
+from protonmailer.database import Base
+
+
+class CampaignRun(Base):
+    """One execution of a campaign, checkpointed so a crashed run can resume."""
+
+    __tablename__ = "campaign_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    campaign_id = Column(Integer, ForeignKey("campaigns.id"), nullable=False, index=True)
+    # "running" until every matching contact is enqueued, then "completed";
+    # "failed" if the campaign's account or template disappeared mid-run.
+    status = Column(String, default="running", nullable=False)
+    # Highest contact id whose email has been committed; contacts are walked in id order.
+    cursor = Column(Integer, default=0, nullable=False)
+    total_contacts = Column(Integer)
+    # Incremental runs only consider contacts whose tags changed after this.
+    audience_since = Column(DateTime(timezone=True))
+    enqueued_count = Column(Integer, default=0, nullable=False)
+    skipped_count = Column(Integer, default=0, nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=False)
+    finished_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+    campaign = relationship("Campaign")
@@ -1,8 +1,15 @@
+from datetime import datetime, timezone
+
 from sqlalchemy import Column, DateTime, Integer, String, func
+from sqlalchemy.orm import validates
 
 from protonmailer.database import Base
 
 
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class Contact(Base):
     __tablename__ = "contacts"
 
@@ -10,7 +17,16 @@ class Contact(Base):
     email = Column(String, nullable=False, index=True)
     name = Column(String)
     tags = Column(String)
+    # When ``tags`` last changed (or the contact was created); the watermark for
+    # incremental campaign audiences.
+    tags_updated_at = Column(DateTime(timezone=True), default=_utcnow, nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
     )
+
+    @validates("tags")
+    def _touch_tags(self, key: str, value: str | None) -> str | None:
+        if value != self.tags:
+            self.tags_updated_at = _utcnow()
+        return value
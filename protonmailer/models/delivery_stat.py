@@ -0,0 +1,36 @@
+import sqlalchemy as sa
+from sqlalchemy import Column, Date, DateTime, Float, Integer, func
+
+from protonmailer.database import Base
+
+
+class DeliveryStat(Base):
+    """Final outcomes per (campaign, account, UTC day), kept up to date by the send worker.
+
+    ``campaign_id`` is null for compose and sequence mail. Rows outlive the
+    queued emails they count, so stats survive the retention purge.
+    """
+
+    __tablename__ = "delivery_stats"
+    __table_args__ = (
+        sa.Index(
+            "ux_delivery_stats_campaign_account_day", "campaign_id", "account_id", "day", unique=True
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    campaign_id = Column(Integer)
+    account_id = Column(Integer, nullable=False)
+    day = Column(Date, nullable=False, index=True)
+    sent_count = Column(Integer, default=0, nullable=False)
+    failed_count = Column(Integer, default=0, nullable=False)
+    cancelled_count = Column(Integer, default=0, nullable=False)
+    # Sum over sent emails of the time from becoming due to delivery.
+    latency_seconds_total = Column(Float, default=0.0, nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+    @property
+    def avg_latency_seconds(self) -> float | None:
+        return self.latency_seconds_total / self.sent_count if self.sent_count else None
@@ -0,0 +1,34 @@
+import zlib
+
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String, func
+
+from protonmailer.database import Base
+
+
+class EmailBody(Base):
+    """A deduplicated, compressed (html, text) body shared by queued emails."""
+
+    __tablename__ = "email_bodies"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), nullable=False, unique=True, index=True)
+    compression = Column(String, nullable=False, default="zlib")
+    html_data = Column(LargeBinary, nullable=False)
+    text_data = Column(LargeBinary)
+    raw_size = Column(Integer, nullable=False)
+    stored_size = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    @property
+    def html(self) -> str:
+        if "_html" not in self.__dict__:
+            self.__dict__["_html"] = zlib.decompress(self.html_data).decode("utf-8")
+        return self.__dict__["_html"]
+
+    @property
+    def text(self) -> str | None:
+        if self.text_data is None:
+            return None
+        if "_text" not in self.__dict__:
+            self.__dict__["_text"] = zlib.decompress(self.text_data).decode("utf-8")
+        return self.__dict__["_text"]
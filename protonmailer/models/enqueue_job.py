@@ -0,0 +1,28 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, JSON, String, Text, func
+from sqlalchemy.orm import relationship
+
+from protonmailer.database import Base
+
+
+class EnqueueJob(Base):
+    """A large compose submission enqueued in the background, chunk by chunk."""
+
+    __tablename__ = "enqueue_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    account_id = Column(Integer, ForeignKey("accounts.id"), nullable=False)
+    # "pending", "running", "completed" or "failed".
+    status = Column(String, default="pending", nullable=False)
+    # {"to_addresses": [...], "steps": [...], "scheduled_for": iso, "attachment_ids": [...]}
+    payload = Column(JSON, nullable=False)
+    total = Column(Integer, nullable=False)
+    # Recipients enqueued so far; also where a restarted job picks up.
+    enqueued_count = Column(Integer, default=0, nullable=False)
+    error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+    finished_at = Column(DateTime(timezone=True))
+
+    account = relationship("Account")
@@ -1,25 +1,67 @@
+import json
+
 import sqlalchemy as sa
 from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, func
 from sqlalchemy.orm import relationship
 
 from protonmailer.database import Base
 
+# Interactive mail outranks bulk campaign traffic in the send worker.
+PRIORITY_TRANSACTIONAL = 10
+PRIORITY_BULK = 0
+SOURCE_PRIORITIES = {"manual": PRIORITY_TRANSACTIONAL, "campaign": PRIORITY_BULK}
+
+# Stages recorded in ``timeline_json``, in the order a send attempt goes through them.
+TIMELINE_STAGES = ("queued", "claim", "render", "serialize", "connect", "auth", "data")
+
+
+def default_priority(source: str | None) -> int:
+    return SOURCE_PRIORITIES.get(source or "manual", PRIORITY_BULK)
+
+
+def _priority_from_source(context) -> int:
+    return default_priority(context.get_current_parameters().get("source"))
+
 
 class QueuedEmail(Base):
     __tablename__ = "queued_emails"
+    __table_args__ = (
+        sa.Index("ix_queued_emails_due", "status", "priority", "scheduled_for"),
+        # A campaign run enqueues each contact at most once.
+        sa.Index("ux_queued_emails_run_contact", "campaign_id", "run_id", "contact_id", unique=True),
+        # The retention purge walks finished rows by age.
+        sa.Index("ix_queued_emails_status_updated_at", "status", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     campaign_id = Column(Integer, ForeignKey("campaigns.id"))
+    run_id = Column(Integer, ForeignKey("campaign_runs.id"))
+    enrollment_id = Column(Integer, ForeignKey("sequence_enrollments.id"), index=True)
+    contact_id = Column(Integer, ForeignKey("contacts.id"))
+    template_version = Column(Integer)
     account_id = Column(Integer, ForeignKey("accounts.id"), nullable=False)
     from_address = Column(String, nullable=False)
     to_address = Column(String, nullable=False)
     subject = Column(String, nullable=False)
-    body_html = Column(Text, nullable=False)
-    body_text = Column(Text)
+    # Bodies live in email_bodies (see services.body_store); the inline columns
+    # only hold content for rows that have not been moved there.
+    body_id = Column(Integer, ForeignKey("email_bodies.id"), index=True)
+    _body_html = Column("body_html", Text, nullable=False, default="")
+    _body_text = Column("body_text", Text)
+    # Final RFC 5322 bytes, built once before the first send attempt and reused by retries.
+    mime_payload = Column(sa.LargeBinary)
     scheduled_for = Column(DateTime(timezone=True), nullable=False)
     status = Column(String, nullable=False)
     source = sa.Column(sa.String, default="manual", nullable=False)
+    priority = Column(Integer, default=_priority_from_source, nullable=False)
     metadata_json = sa.Column(sa.Text, nullable=True)
+    # Stage durations (ms) of the latest send attempt, keyed by TIMELINE_STAGES.
+    timeline_json = sa.Column(sa.Text, nullable=True)
+    claimed_at = Column(DateTime(timezone=True))
+    attempts = Column(Integer, default=0, nullable=False)
+    # Throttling replies that were deferred without spending an attempt.
+    throttle_deferrals = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime(timezone=True))
     last_error = Column(Text)
     sent_at = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -29,3 +71,32 @@ class QueuedEmail(Base):
 
     campaign = relationship("Campaign")
     account = relationship("Account")
+    attachments = relationship("Attachment", secondary="queued_email_attachments")
+    body = relationship("EmailBody", lazy="selectin")
+    enrollment = relationship("SequenceEnrollment")
+
+    @property
+    def needs_render(self) -> bool:
+        """Lazy campaign rows carry no content until the send worker renders them."""
+
+        return self.body_id is None and self.contact_id is not None and not self._body_html
+
+    @property
+    def timeline(self) -> dict[str, float]:
+        return json.loads(self.timeline_json or "{}")
+
+    @property
+    def body_html(self) -> str:
+        return self.body.html if self.body is not None else self._body_html
+
+    @body_html.setter
+    def body_html(self, value: str) -> None:
+        self._body_html = value
+
+    @property
+    def body_text(self) -> str | None:
+        return self.body.text if self.body is not None else self._body_text
+
+    @body_text.setter
+    def body_text(self, value: str | None) -> None:
+        self._body_text = value
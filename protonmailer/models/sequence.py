@@ -0,0 +1,42 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, JSON, String, func
+from sqlalchemy.orm import relationship
+
+from protonmailer.database import Base
+
+
+class Sequence(Base):
+    """A multi-step compose: the ordered steps every enrollment works through."""
+
+    __tablename__ = "sequences"
+
+    id = Column(Integer, primary_key=True, index=True)
+    account_id = Column(Integer, ForeignKey("accounts.id"), nullable=False)
+    from_address = Column(String, nullable=False)
+    # [{"subject", "body", "offset_type", "offset_value", "day_of_month", "month_interval"}, ...]
+    steps = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    account = relationship("Account")
+
+
+class SequenceEnrollment(Base):
+    """One recipient's progress through a sequence.
+
+    Only the step in ``current_step`` (1-based) has a queued email; the next one
+    is enqueued when it is sent.
+    """
+
+    __tablename__ = "sequence_enrollments"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sequence_id = Column(Integer, ForeignKey("sequences.id"), nullable=False, index=True)
+    to_address = Column(String, nullable=False)
+    # "active", "completed", "cancelled", or "failed" when a step could not be delivered.
+    status = Column(String, default="active", nullable=False)
+    current_step = Column(Integer, default=1, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+    sequence = relationship("Sequence")
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, DateTime, Integer, String, Text, func
+
+from protonmailer.database import Base
+
+
+class Suppression(Base):
+    """An address no mail is enqueued for (unsubscribed, bounced, complained or added by hand)."""
+
+    __tablename__ = "suppressions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Stored lower-cased and stripped; see services.suppression.normalize.
+    email = Column(String, nullable=False, unique=True, index=True)
+    # "unsubscribe", "bounce", "complaint" or "manual".
+    reason = Column(String, default="manual", nullable=False)
+    note = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
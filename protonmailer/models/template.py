@@ -11,6 +11,7 @@ class Template(Base):
     subject = Column(String, nullable=False)
     body_html = Column(Text, nullable=False)
     body_text = Column(Text)
+    version = Column(Integer, default=1, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
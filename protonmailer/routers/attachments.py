@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from sqlalchemy.orm import Session
+
+from protonmailer import models, schemas
+from protonmailer.dependencies import get_db
+from protonmailer.services.attachment_store import store_attachment
+
+router = APIRouter(prefix="/attachments", tags=["attachments"])
+
+
+@router.post("/", response_model=schemas.AttachmentRead, status_code=status.HTTP_201_CREATED)
+async def upload_attachment(file: UploadFile = File(...), db: Session = Depends(get_db)):
+    content = await file.read()
+    attachment = store_attachment(db, content, file.filename or "", file.content_type)
+    db.commit()
+    db.refresh(attachment)
+    return attachment
+
+
+@router.get("/", response_model=list[schemas.AttachmentRead])
+def list_attachments(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    return db.query(models.Attachment).offset(skip).limit(limit).all()
+
+
+@router.get("/{attachment_id}", response_model=schemas.AttachmentRead)
+def get_attachment(attachment_id: int, db: Session = Depends(get_db)):
+    attachment = db.query(models.Attachment).filter(models.Attachment.id == attachment_id).first()
+    if not attachment:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Attachment not found")
+    return attachment
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 
 from protonmailer import models, schemas
 from protonmailer.dependencies import get_db
+from protonmailer.services.delivery_stats import campaign_stats
 
 router = APIRouter(prefix="/campaigns", tags=["campaigns"])
 
@@ -64,6 +65,31 @@ def delete_campaign(campaign_id: int, db: Session = Depends(get_db)):
     return None
 
 
+@router.get("/{campaign_id}/runs", response_model=list[schemas.CampaignRunRead])
+def list_campaign_runs(campaign_id: int, db: Session = Depends(get_db)):
+    campaign = db.query(models.Campaign).filter(models.Campaign.id == campaign_id).first()
+    if not campaign:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Campaign not found")
+    return (
+        db.query(models.CampaignRun)
+        .filter(models.CampaignRun.campaign_id == campaign_id)
+        .order_by(models.CampaignRun.id.desc())
+        .all()
+    )
+
+
+@router.get("/{campaign_id}/stats", response_model=schemas.CampaignStats)
+def get_campaign_stats(campaign_id: int, days: int = 30, db: Session = Depends(get_db)):
+    campaign = db.query(models.Campaign).filter(models.Campaign.id == campaign_id).first()
+    if not campaign:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Campaign not found")
+    if days < 1:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="days must be positive"
+        )
+    return campaign_stats(db, campaign_id, days)
+
+
 @router.post("/{campaign_id}/activate", response_model=schemas.CampaignRead)
 def activate_campaign(campaign_id: int, db: Session = Depends(get_db)):
     campaign = db.query(models.Campaign).filter(models.Campaign.id == campaign_id).first()
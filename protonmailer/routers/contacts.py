@@ -32,6 +32,28 @@ def list_contacts(
     return query.offset(skip).limit(limit).all()
 
 
+@router.get("/export-csv")
+def export_contacts(db: Session = Depends(get_db)):
+    contacts = db.query(models.Contact).all()
+
+    def iter_rows():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["email", "name", "tags"])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+        for contact in contacts:
+            writer.writerow([contact.email, contact.name or "", contact.tags or ""])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    headers = {"Content-Disposition": "attachment; filename=contacts.csv"}
+    return StreamingResponse(iter_rows(), media_type="text/csv", headers=headers)
+
+
 @router.get("/{contact_id}", response_model=schemas.ContactRead)
 def get_contact(contact_id: int, db: Session = Depends(get_db)):
     contact = db.query(models.Contact).filter(models.Contact.id == contact_id).first()
@@ -105,25 +127,3 @@ async def import_contacts(file: UploadFile = File(...), db: Session = Depends(ge
 
     db.commit()
     return {"created": created, "updated": updated, "failed": failed}
-
-
-@router.get("/export-csv")
-def export_contacts(db: Session = Depends(get_db)):
-    contacts = db.query(models.Contact).all()
-
-    def iter_rows():
-        buffer = io.StringIO()
-        writer = csv.writer(buffer)
-        writer.writerow(["email", "name", "tags"])
-        yield buffer.getvalue()
-        buffer.seek(0)
-        buffer.truncate(0)
-
-        for contact in contacts:
-            writer.writerow([contact.email, contact.name or "", contact.tags or ""])
-            yield buffer.getvalue()
-            buffer.seek(0)
-            buffer.truncate(0)
-
-    headers = {"Content-Disposition": "attachment; filename=contacts.csv"}
-    return StreamingResponse(iter_rows(), media_type="text/csv", headers=headers)
@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.orm import Session
+
+from protonmailer.dependencies import get_db
+from protonmailer.services import metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def read_metrics(db: Session = Depends(get_db)):
+    metrics.collect_queue_metrics(db)
+    return PlainTextResponse(metrics.render_metrics(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,24 @@
+from typing import Optional
+
+from fastapi import APIRouter
+
+from protonmailer import schemas
+from protonmailer.services import health, retention
+
+router = APIRouter(prefix="/status", tags=["status"])
+
+
+@router.get("/circuit-breakers", response_model=list[schemas.CircuitBreakerStatus])
+def list_circuit_breakers():
+    return health.breaker_statuses()
+
+
+@router.get("/retention", response_model=Optional[schemas.RetentionReportRead])
+def read_last_retention_report():
+    report = retention.last_report()
+    return report.as_dict() if report is not None else None
+
+
+@router.post("/retention/run", response_model=schemas.RetentionReportRead)
+def run_retention():
+    return retention.purge_expired().as_dict()
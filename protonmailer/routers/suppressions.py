@@ -0,0 +1,45 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, Response, UploadFile, status
+from sqlalchemy.orm import Session
+
+from protonmailer import models, schemas
+from protonmailer.dependencies import get_db
+from protonmailer.services import suppression
+
+router = APIRouter(prefix="/suppressions", tags=["suppressions"])
+
+
+@router.post("/", response_model=schemas.SuppressionRead, status_code=status.HTTP_201_CREATED)
+def create_suppression(entry: schemas.SuppressionCreate, db: Session = Depends(get_db)):
+    if not suppression.suppress(db, [entry.email], entry.reason.value, entry.note):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Address already suppressed")
+    return (
+        db.query(models.Suppression)
+        .filter(models.Suppression.email == suppression.normalize(entry.email))
+        .one()
+    )
+
+
+@router.get("/", response_model=list[schemas.SuppressionRead])
+def list_suppressions(
+    q: Optional[str] = None, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
+):
+    query = db.query(models.Suppression)
+    if q:
+        query = query.filter(models.Suppression.email.contains(suppression.normalize(q)))
+    return query.order_by(models.Suppression.id.desc()).offset(skip).limit(limit).all()
+
+
+@router.post("/import-csv")
+async def import_suppressions(file: UploadFile = File(...), db: Session = Depends(get_db)):
+    return suppression.import_csv(db, await file.read())
+
+
+@router.delete("/{suppression_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_suppression(suppression_id: int, db: Session = Depends(get_db)):
+    entry = db.get(models.Suppression, suppression_id)
+    if not entry:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Suppression not found")
+    suppression.unsuppress(db, entry)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
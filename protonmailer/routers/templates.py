@@ -45,8 +45,11 @@ def update_template(
     if not template:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Template not found")
 
-    for field, value in template_update.dict(exclude_unset=True).items():
+    update_data = template_update.dict(exclude_unset=True)
+    for field, value in update_data.items():
         setattr(template, field, value)
+    if update_data:
+        template.version = (template.version or 1) + 1
 
     db.add(template)
     db.commit()
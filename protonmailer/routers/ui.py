@@ -1,15 +1,29 @@
-import calendar
 import json
-from datetime import datetime, timedelta
+from datetime import datetime
 
-from fastapi import APIRouter, Depends, Form, Request, status
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, Form, HTTPException, Request, status
+from fastapi.responses import FileResponse, HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
+from starlette.datastructures import UploadFile
 
 from protonmailer import models
+from protonmailer.config import get_settings
 from protonmailer.dependencies import get_db
+from protonmailer.models.queued_email import TIMELINE_STAGES
+from protonmailer.services import delivery_stats, profiler, suppression
+from protonmailer.services.attachment_store import store_attachment
 from protonmailer.services.auth_service import login_user, logout_user, require_login
+from protonmailer.services.compose_service import (
+    create_enqueue_job,
+    enqueue_compose,
+    run_enqueue_job,
+)
+from protonmailer.services.sequence_service import (
+    advance_enrollment,
+    cancel_enrollment,
+    load_sequence_steps,
+)
 
 router = APIRouter(prefix="/ui", tags=["ui"])
 templates = Jinja2Templates(directory="templates")
@@ -21,72 +35,12 @@ def _split_addresses(raw: str | None) -> list[str]:
     return [part.strip() for part in raw.replace(";", ",").split(",") if part.strip()]
 
 
-def _add_months(base: datetime, months: int, day: int) -> datetime:
-    month_index = base.month - 1 + months
-    year = base.year + month_index // 12
-    month = month_index % 12 + 1
-    last_day = calendar.monthrange(year, month)[1]
-    target_day = min(max(day, 1), last_day)
-    return base.replace(year=year, month=month, day=target_day)
-
-
-def _calculate_step_time(previous: datetime, step: dict) -> datetime:
-    offset_type = step.get("offset_type") or "immediate"
-    if offset_type == "days":
-        try:
-            days = int(step.get("offset_value") or 0)
-        except (TypeError, ValueError):
-            days = 0
-        return previous + timedelta(days=days)
-
-    if offset_type == "monthly":
-        try:
-            day_of_month = int(step.get("day_of_month") or previous.day)
-        except (TypeError, ValueError):
-            day_of_month = previous.day
-        try:
-            month_interval = int(step.get("month_interval") or 1)
-        except (TypeError, ValueError):
-            month_interval = 1
-        return _add_months(previous, month_interval, day_of_month)
-
-    return previous
-
-
-def _load_sequence_steps(payload: str | None, fallback_subject: str, fallback_body: str) -> list[dict]:
+def _positive_int(raw: object) -> int | None:
     try:
-        raw_steps = json.loads(payload or "[]")
-    except json.JSONDecodeError:
-        raw_steps = []
-
-    steps: list[dict] = []
-    for step in raw_steps:
-        subject = step.get("subject") or fallback_subject
-        body = step.get("body") or fallback_body
-        if not subject or not body:
-            continue
-        steps.append(
-            {
-                "subject": subject,
-                "body": body,
-                "offset_type": step.get("offset_type") or "immediate",
-                "offset_value": step.get("offset_value"),
-                "day_of_month": step.get("day_of_month"),
-                "month_interval": step.get("month_interval"),
-            }
-        )
-
-    if not steps:
-        steps.append(
-            {
-                "subject": fallback_subject,
-                "body": fallback_body,
-                "offset_type": "immediate",
-                "offset_value": 0,
-            }
-        )
-
-    return steps
+        value = int(str(raw or "").strip())
+    except ValueError:
+        return None
+    return value if value > 0 else None
 
 
 def render_dashboard(request: Request, db: Session):
@@ -94,7 +48,8 @@ def render_dashboard(request: Request, db: Session):
     contacts_count = db.query(models.Contact).count()
     campaigns_count = db.query(models.Campaign).count()
     queued_count = db.query(models.QueuedEmail).filter(models.QueuedEmail.status == "queued").count()
-    sent_count = db.query(models.QueuedEmail).filter(models.QueuedEmail.status == "sent").count()
+    # From the rollup, so sent mail still counts after the retention purge.
+    sent_count = delivery_stats.total_sent(db)
 
     return templates.TemplateResponse(
         "dashboard.html",
@@ -260,6 +215,87 @@ async def contact_delete(contact_id: int, request: Request, db: Session = Depend
     return RedirectResponse(request.url_for("contacts_list"), status_code=303)
 
 
+@router.get(
+    "/suppressions",
+    response_class=HTMLResponse,
+    name="suppressions_list",
+    dependencies=[Depends(require_login)],
+)
+def suppressions_list(request: Request, q: str = "", db: Session = Depends(get_db)):
+    query = db.query(models.Suppression)
+    if q.strip():
+        query = query.filter(models.Suppression.email.contains(suppression.normalize(q)))
+    return templates.TemplateResponse(
+        "suppressions_list.html",
+        {
+            "request": request,
+            "q": q,
+            "suppressions": query.order_by(models.Suppression.id.desc()).limit(200).all(),
+            "total": db.query(models.Suppression).count(),
+            "reasons": suppression.REASONS,
+            "imported": request.query_params.get("imported"),
+        },
+    )
+
+
+@router.post(
+    "/suppressions",
+    response_class=HTMLResponse,
+    name="suppression_create",
+    dependencies=[Depends(require_login)],
+)
+async def suppression_create(request: Request, db: Session = Depends(get_db)):
+    form = await request.form()
+    email = (form.get("email") or "").strip()
+    reason = form.get("reason") or "manual"
+    note = (form.get("note") or "").strip() or None
+
+    if "@" not in email or reason not in suppression.REASONS:
+        return templates.TemplateResponse(
+            "error.html",
+            {"request": request, "message": "Invalid email or reason"},
+            status_code=400,
+        )
+
+    suppression.suppress(db, [email], reason, note)
+    return RedirectResponse(request.url_for("suppressions_list"), status_code=303)
+
+
+@router.post(
+    "/suppressions/import",
+    response_class=HTMLResponse,
+    name="suppressions_import",
+    dependencies=[Depends(require_login)],
+)
+async def suppressions_import(request: Request, db: Session = Depends(get_db)):
+    form = await request.form()
+    upload = form.get("file")
+    if not isinstance(upload, UploadFile) or not upload.filename:
+        return templates.TemplateResponse(
+            "error.html",
+            {"request": request, "message": "Choose a CSV file to import"},
+            status_code=400,
+        )
+
+    result = suppression.import_csv(db, await upload.read())
+    summary = f"{result['created']} added, {result['existing']} already listed, {result['failed']} invalid"
+    url = request.url_for("suppressions_list").include_query_params(imported=summary)
+    return RedirectResponse(url, status_code=303)
+
+
+@router.post(
+    "/suppressions/{suppression_id}/delete",
+    response_class=HTMLResponse,
+    name="suppression_delete",
+    dependencies=[Depends(require_login)],
+)
+def suppression_delete(suppression_id: int, request: Request, db: Session = Depends(get_db)):
+    entry = db.get(models.Suppression, suppression_id)
+    if entry:
+        suppression.unsuppress(db, entry)
+    return RedirectResponse(request.url_for("suppressions_list"), status_code=303)
+
+
 @router.get(
     "/campaigns",
     response_class=HTMLResponse,
@@ -308,17 +344,23 @@ async def campaign_create(request: Request, db: Session = Depends(get_db)):
     target_tags = form.get("target_tags") or ""
     schedule_type = form.get("schedule_type") or "one_time"
     active = form.get("active") == "on"
+    render_mode = "lazy" if form.get("render_mode") == "lazy" else "eager"
+    audience_mode = "incremental" if form.get("audience_mode") == "incremental" else "full"
 
     run_date = form.get("run_date") or ""
     run_time = form.get("run_time") or ""
     freq = form.get("freq") or "once"
     day_of_week = form.get("day_of_week") or None
+    send_window_minutes = _positive_int(form.get("send_window_minutes"))
+    send_rate_per_hour = _positive_int(form.get("send_rate_per_hour"))
 
     schedule_config = {
         "freq": freq,
         "run_date": run_date,
         "run_time": run_time,
         "day_of_week": day_of_week,
+        "send_window_minutes": send_window_minutes,
+        "send_rate_per_hour": send_rate_per_hour,
     }
 
     campaign = models.Campaign(
@@ -329,6 +371,8 @@ async def campaign_create(request: Request, db: Session = Depends(get_db)):
         schedule_type=schedule_type,
         schedule_config=json.dumps(schedule_config),
         active=active,
+        render_mode=render_mode,
+        audience_mode=audience_mode,
     )
     db.add(campaign)
     db.commit()
@@ -370,6 +414,35 @@ async def campaign_edit(campaign_id: int, request: Request, db: Session = Depend
     )
 
 
+@router.get(
+    "/campaigns/{campaign_id}/stats",
+    response_class=HTMLResponse,
+    name="campaign_stats",
+    dependencies=[Depends(require_login)],
+)
+def campaign_stats(
+    campaign_id: int, request: Request, days: int = 30, db: Session = Depends(get_db)
+):
+    campaign = db.query(models.Campaign).filter(models.Campaign.id == campaign_id).first()
+    if not campaign:
+        return templates.TemplateResponse(
+            "error.html",
+            {"request": request, "message": "Campaign not found"},
+            status_code=404,
+        )
+    accounts = {account.id: account for account in db.query(models.Account).all()}
+    return templates.TemplateResponse(
+        "campaign_stats.html",
+        {
+            "request": request,
+            "campaign": campaign,
+            "accounts": accounts,
+            "days": max(days, 1),
+            "stats": delivery_stats.campaign_stats(db, campaign_id, max(days, 1)),
+        },
+    )
+
+
 @router.post(
     "/campaigns/{campaign_id}/edit",
     response_class=HTMLResponse,
@@ -384,17 +457,23 @@ async def campaign_update(campaign_id: int, request: Request, db: Session = Depe
     target_tags = form.get("target_tags") or ""
     schedule_type = form.get("schedule_type") or "one_time"
     active = form.get("active") == "on"
+    render_mode = "lazy" if form.get("render_mode") == "lazy" else "eager"
+    audience_mode = "incremental" if form.get("audience_mode") == "incremental" else "full"
 
     run_date = form.get("run_date") or ""
     run_time = form.get("run_time") or ""
     freq = form.get("freq") or "once"
     day_of_week = form.get("day_of_week") or None
+    send_window_minutes = _positive_int(form.get("send_window_minutes"))
+    send_rate_per_hour = _positive_int(form.get("send_rate_per_hour"))
 
     schedule_config = {
         "freq": freq,
         "run_date": run_date,
         "run_time": run_time,
         "day_of_week": day_of_week,
+        "send_window_minutes": send_window_minutes,
+        "send_rate_per_hour": send_rate_per_hour,
     }
 
     campaign = db.query(models.Campaign).filter(models.Campaign.id == campaign_id).first()
@@ -412,6 +491,8 @@ async def campaign_update(campaign_id: int, request: Request, db: Session = Depe
     campaign.schedule_type = schedule_type
     campaign.schedule_config = json.dumps(schedule_config)
     campaign.active = active
+    campaign.render_mode = render_mode
+    campaign.audience_mode = audience_mode
     db.commit()
 
     return RedirectResponse(request.url_for("campaigns_list"), status_code=303)
@@ -454,12 +535,14 @@ async def campaign_deactivate(campaign_id: int, request: Request, db: Session =
 def queue_list(request: Request, db: Session = Depends(get_db)):
     emails = (
         db.query(models.QueuedEmail)
+        .options(selectinload(models.QueuedEmail.enrollment))
         .order_by(models.QueuedEmail.created_at.desc())
         .limit(200)
         .all()
     )
     return templates.TemplateResponse(
-        "queue_list.html", {"request": request, "emails": emails}
+        "queue_list.html",
+        {"request": request, "emails": emails, "timeline_stages": TIMELINE_STAGES},
     )
 
 
@@ -473,6 +556,23 @@ def queue_cancel(email_id: int, request: Request, db: Session = Depends(get_db))
     qe = db.query(models.QueuedEmail).filter(models.QueuedEmail.id == email_id).first()
     if qe and qe.status == "queued":
         qe.status = "cancelled"
+        delivery_stats.record_outcome(db, qe)
+        # Skipping one step of a sequence still lets the later steps go out.
+        advance_enrollment(db, qe)
+        db.commit()
+    return RedirectResponse(request.url_for("queue_list"), status_code=303)
+
+
+@router.post(
+    "/enrollments/{enrollment_id}/cancel",
+    response_class=HTMLResponse,
+    name="enrollment_cancel",
+    dependencies=[Depends(require_login)],
+)
+def enrollment_cancel(enrollment_id: int, request: Request, db: Session = Depends(get_db)):
+    enrollment = db.get(models.SequenceEnrollment, enrollment_id)
+    if enrollment and enrollment.status == "active":
+        cancel_enrollment(db, enrollment)
         db.commit()
     return RedirectResponse(request.url_for("queue_list"), status_code=303)
 
@@ -486,9 +586,13 @@ def queue_cancel(email_id: int, request: Request, db: Session = Depends(get_db))
 def queue_retry(email_id: int, request: Request, db: Session = Depends(get_db)):
     qe = db.query(models.QueuedEmail).filter(models.QueuedEmail.id == email_id).first()
     if qe and qe.status == "failed":
+        delivery_stats.retract_outcome(db, qe)
         qe.status = "queued"
         qe.last_error = None
         qe.scheduled_for = datetime.utcnow()
+        qe.attempts = 0
+        qe.throttle_deferrals = 0
+        qe.next_attempt_at = None
         db.commit()
     return RedirectResponse(request.url_for("queue_list"), status_code=303)
 
@@ -518,7 +622,9 @@ async def compose_email(request: Request, db: Session = Depends(get_db)):
     response_class=HTMLResponse,
     dependencies=[Depends(require_login)],
 )
-async def submit_compose_email(request: Request, db: Session = Depends(get_db)):
+async def submit_compose_email(
+    request: Request, background_tasks: BackgroundTasks, db: Session = Depends(get_db)
+):
     form = await request.form()
     account_id = int(form.get("account_id"))
     subject = form.get("subject") or ""
@@ -530,6 +636,9 @@ async def submit_compose_email(request: Request, db: Session = Depends(get_db)):
     sequence_payload = form.get("sequence_payload") or "[]"
     manual_to = form.get("to_manual") or ""
     selected_contacts = form.getlist("to_contacts")
+    uploads = [
+        item for item in form.getlist("attachments") if isinstance(item, UploadFile) and item.filename
+    ]
 
     account = db.query(models.Account).filter(models.Account.id == account_id).first()
     if account is None:
@@ -590,43 +699,110 @@ async def submit_compose_email(request: Request, db: Session = Depends(get_db)):
             status_code=400,
         )
 
-    steps = _load_sequence_steps(sequence_payload, subject, body)
-
-    from_address = account.email_address
-
-    created_count = 0
-    current_send_time = scheduled_for
-    for index, step in enumerate(steps, start=1):
-        if step.get("offset_type") != "immediate":
-            current_send_time = _calculate_step_time(current_send_time, step)
-
-        for addr in to_addresses:
-            qe = models.QueuedEmail(
-                campaign_id=None,
-                account_id=account.id,
-                from_address=from_address,
-                to_address=addr,
-                subject=step.get("subject") or subject,
-                body_html=step.get("body") or body,
-                body_text=None,
-                scheduled_for=current_send_time,
-                status="queued",
-                source="manual",
-                metadata_json=json.dumps(
-                    {
-                        "sequence_step": index,
-                        "offset_type": step.get("offset_type"),
-                        "offset_value": step.get("offset_value"),
-                        "month_interval": step.get("month_interval"),
-                        "day_of_month": step.get("day_of_month"),
-                    }
-                ),
-            )
-            db.add(qe)
-            created_count += 1
+    to_addresses, _ = suppression.filter_addresses(to_addresses)
+    if not to_addresses:
+        return templates.TemplateResponse(
+            "error.html",
+            {"request": request, "message": "All selected recipients are suppressed"},
+            status_code=400,
+        )
+
+    steps = load_sequence_steps(sequence_payload, subject, body)
 
+    attachments = [
+        store_attachment(db, await upload.read(), upload.filename, upload.content_type)
+        for upload in uploads
+    ]
+
+    if len(to_addresses) > get_settings().COMPOSE_BACKGROUND_THRESHOLD:
+        job = create_enqueue_job(db, account, steps, to_addresses, scheduled_for, attachments)
+        db.commit()
+        background_tasks.add_task(run_enqueue_job, job.id)
+        return RedirectResponse(request.url_for("job_progress", job_id=job.id), status_code=303)
+
+    enqueue_compose(db, account, steps, to_addresses, scheduled_for, attachments)
     db.commit()
 
     url = request.url_for("queue_list")
     response = RedirectResponse(url, status_code=303)
     return response
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_class=HTMLResponse,
+    name="job_progress",
+    dependencies=[Depends(require_login)],
+)
+def job_progress(job_id: int, request: Request, db: Session = Depends(get_db)):
+    job = db.get(models.EnqueueJob, job_id)
+    if job is None:
+        return templates.TemplateResponse(
+            "error.html",
+            {"request": request, "message": "Job not found"},
+            status_code=404,
+        )
+    return templates.TemplateResponse("job_progress.html", {"request": request, "job": job})
+
+
+@router.get(
+    "/profiles",
+    response_class=HTMLResponse,
+    name="profiles_list",
+    dependencies=[Depends(require_login)],
+)
+def profiles_list(request: Request):
+    return templates.TemplateResponse(
+        "profiles_list.html",
+        {
+            "request": request,
+            "profiles": profiler.list_profiles(),
+            "armed": profiler.armed(),
+            "jobs": profiler.jobs(),
+            "phases": profiler.PHASES,
+        },
+    )
+
+
+@router.post(
+    "/profiles/arm",
+    response_class=HTMLResponse,
+    name="profiles_arm",
+    dependencies=[Depends(require_login)],
+)
+def profiles_arm(request: Request, job: str = Form(...), ticks: int = Form(1)):
+    if job in profiler.jobs():
+        profiler.arm(job, max(ticks, 0))
+    return RedirectResponse(request.url_for("profiles_list"), status_code=303)
+
+
+@router.get(
+    "/profiles/{name}",
+    response_class=HTMLResponse,
+    name="profile_detail",
+    dependencies=[Depends(require_login)],
+)
+def profile_detail(name: str, request: Request):
+    profile = profiler.load_profile(name)
+    if profile is None:
+        return templates.TemplateResponse(
+            "error.html",
+            {"request": request, "message": "Profile not found"},
+            status_code=404,
+        )
+    return templates.TemplateResponse(
+        "profile_detail.html",
+        {"request": request, "profile": profile, "phases": profiler.PHASES},
+    )
+
+
+@router.get(
+    "/profiles/{name}/download",
+    name="profile_download",
+    dependencies=[Depends(require_login)],
+)
+def profile_download(name: str):
+    path = profiler.profile_stats_path(name)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
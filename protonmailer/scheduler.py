@@ -1,71 +1,485 @@
+import json
 import logging
-from datetime import datetime, timezone
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
 from typing import Sequence
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from fastapi import FastAPI
+from sqlalchemy import exists, or_
 from sqlalchemy.orm import Session
 
+from protonmailer.config import get_settings
 from protonmailer.database import SessionLocal
-from protonmailer.models import Account, Campaign, Contact, QueuedEmail, Template
-from protonmailer.services.email_service import send_email
+from protonmailer.logging_config import SAMPLED
+from protonmailer.models import (
+    Account,
+    ArchivedEmail,
+    Attachment,
+    Campaign,
+    CampaignRun,
+    Contact,
+    QueuedEmail,
+    Template,
+)
+from protonmailer.models.attachment import queued_email_attachments
+from protonmailer.models.queued_email import PRIORITY_TRANSACTIONAL, TIMELINE_STAGES
+from protonmailer.services import health, metrics, profiler, sql_stats, suppression
+from protonmailer.services.body_store import intern_body
+from protonmailer.services.circuit_breaker import circuit_breakers
+from protonmailer.services.delivery_stats import record_outcome
+from protonmailer.services.compose_service import resume_enqueue_jobs
+from protonmailer.services.email_service import (
+    CONNECTION,
+    THROTTLED,
+    build_message_bytes,
+    is_transient_error,
+    send_email,
+)
+from protonmailer.services.rate_limiter import rate_limiter
+from protonmailer.services.render_pool import render_contexts
+from protonmailer.services.retention import purge_expired
+from protonmailer.services.sequence_service import record_step_outcome
 from protonmailer.services.template_service import render_template
 
 logger = logging.getLogger(__name__)
 scheduler = AsyncIOScheduler()
 
 
+def _weighted_interleave(
+    lanes: list[tuple[Sequence[QueuedEmail], int]], limit: int
+) -> list[QueuedEmail]:
+    """Merge lanes round-robin, taking ``weight`` rows from each lane per round."""
+
+    positions = [0] * len(lanes)
+    merged: list[QueuedEmail] = []
+    while len(merged) < limit:
+        progressed = False
+        for index, (rows, weight) in enumerate(lanes):
+            take = rows[positions[index] : positions[index] + max(weight, 1)]
+            positions[index] += len(take)
+            merged.extend(take)
+            progressed = progressed or bool(take)
+        if not progressed:
+            break
+    return merged[:limit]
+
+
 def _get_due_emails(session: Session, now: datetime) -> Sequence[QueuedEmail]:
-    return (
-        session.query(QueuedEmail)
-        .filter(QueuedEmail.status == "queued", QueuedEmail.scheduled_for <= now)
-        .all()
+    settings = get_settings()
+    due = session.query(QueuedEmail).filter(
+        QueuedEmail.status == "queued",
+        QueuedEmail.scheduled_for <= now,
+        or_(QueuedEmail.next_attempt_at.is_(None), QueuedEmail.next_attempt_at <= now),
+    )
+    ordering = (QueuedEmail.priority.desc(), QueuedEmail.scheduled_for, QueuedEmail.id)
+    limit = settings.SEND_BATCH_SIZE
+    transactional = (
+        due.filter(QueuedEmail.priority >= PRIORITY_TRANSACTIONAL).order_by(*ordering).limit(limit).all()
     )
+    bulk = due.filter(QueuedEmail.priority < PRIORITY_TRANSACTIONAL).order_by(*ordering).limit(limit).all()
+    return _weighted_interleave(
+        [
+            (transactional, settings.TRANSACTIONAL_LANE_WEIGHT),
+            (bulk, settings.BULK_LANE_WEIGHT),
+        ],
+        limit,
+    )
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff with "equal jitter": half fixed, half random."""
+
+    settings = get_settings()
+    ceiling = min(settings.RETRY_MAX_SECONDS, settings.RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0))
+    return timedelta(seconds=ceiling / 2 + random.uniform(0, ceiling / 2))
+
+
+def _commit(session: Session) -> None:
+    with profiler.phase("commit"):
+        session.commit()
+
+
+def _reap_expired_leases(session: Session, now: datetime) -> int:
+    """Return rows whose "sending" lease has expired back to the queue.
+
+    A row only stays in "sending" past its lease if the process died between
+    claiming it and recording the outcome, so it is safe to hand it out again.
+    """
+
+    settings = get_settings()
+    cutoff = now - timedelta(seconds=settings.SEND_LEASE_SECONDS)
+    expired = session.query(QueuedEmail).filter(
+        QueuedEmail.status == "sending",
+        or_(QueuedEmail.claimed_at.is_(None), QueuedEmail.claimed_at < cutoff),
+    )
+    with profiler.phase("query"):
+        # A row that keeps dying mid-send is given up on like any other exhausted retry.
+        exhausted = expired.filter(QueuedEmail.attempts >= settings.MAX_SEND_ATTEMPTS).all()
+        for email in exhausted:
+            email.status = "failed"
+            email.last_error = "Send lease expired too many times"
+            record_outcome(session, email)
+        session.flush()
+        reaped = expired.update({"status": "queued", "claimed_at": None}, synchronize_session=False)
+    _commit(session)
+    if reaped or exhausted:
+        logger.warning(
+            "Recovered expired send leases: %s requeued, %s failed", reaped, len(exhausted)
+        )
+    return reaped
+
+
+def _wait_for_send_slot(account: Account) -> float:
+    """Block briefly for a rate-limit token; return the remaining wait if too long."""
+
+    wait = rate_limiter.acquire(account)
+    if 0 < wait <= get_settings().RATE_LIMIT_MAX_WAIT_SECONDS:
+        time.sleep(wait)
+        wait = rate_limiter.acquire(account)
+    return wait
+
+
+def _recipients(email: QueuedEmail) -> list[str]:
+    return [addr.strip() for addr in email.to_address.split(",") if addr.strip()] or [
+        email.to_address
+    ]
+
+
+def _load_attachments(session: Session, emails: Sequence[QueuedEmail]) -> dict[int, list[Attachment]]:
+    """Every email's attachments in one query.
+
+    Reading ``email.attachments`` in the send loop would lazy-load them per row,
+    and again after each commit expires the rows.
+    """
+
+    attachments: dict[int, list[Attachment]] = {email.id: [] for email in emails}
+    if not attachments:
+        return attachments
+    rows = (
+        session.query(queued_email_attachments.c.queued_email_id, Attachment)
+        .join(Attachment, Attachment.id == queued_email_attachments.c.attachment_id)
+        .filter(queued_email_attachments.c.queued_email_id.in_(attachments))
+    )
+    for email_id, attachment in rows:
+        attachments[email_id].append(attachment)
+    return attachments
+
+
+def _load_accounts(session: Session, emails: Sequence[QueuedEmail]) -> dict[int, Account]:
+    account_ids = {email.account_id for email in emails}
+    if not account_ids:
+        return {}
+    return {
+        account.id: account
+        for account in session.query(Account).filter(Account.id.in_(account_ids)).all()
+    }
+
+
+def _lazy_sources(
+    session: Session, emails: Sequence[QueuedEmail]
+) -> dict[int, tuple[Template, Contact] | str]:
+    """Load what the lazily-enqueued campaign rows of a batch are rendered from.
+
+    Returns, per email id, either the (template, contact) pair or an error
+    message. The latest template wins: a row enqueued before its template was
+    edited is rendered with the current version, and a warning per template
+    says how many rows in the batch were affected.
+    """
+
+    lazy = [email for email in emails if email.mime_payload is None and email.needs_render]
+    if not lazy:
+        return {}
+
+    campaigns = {
+        campaign.id: campaign
+        for campaign in session.query(Campaign).filter(
+            Campaign.id.in_({email.campaign_id for email in lazy})
+        )
+    }
+    template_ids = {campaign.template_id for campaign in campaigns.values()}
+    templates = {
+        template.id: template
+        for template in session.query(Template).filter(Template.id.in_(template_ids))
+    }
+    contacts = {
+        contact.id: contact
+        for contact in session.query(Contact).filter(
+            Contact.id.in_({email.contact_id for email in lazy})
+        )
+    }
+
+    sources: dict[int, tuple[Template, Contact] | str] = {}
+    outdated: Counter[int] = Counter()
+    for email in lazy:
+        campaign = campaigns.get(email.campaign_id)
+        template = templates.get(campaign.template_id) if campaign else None
+        contact = contacts.get(email.contact_id)
+        if template is None or contact is None:
+            sources[email.id] = "Template or contact no longer exists"
+            continue
+        if email.template_version != template.version:
+            outdated[template.id] += 1
+        sources[email.id] = (template, contact)
+    for template_id, count in outdated.items():
+        logger.warning(
+            "%s queued emails were enqueued for an older version of template %s; "
+            "rendering version %s",
+            count,
+            template_id,
+            templates[template_id].version,
+        )
+    return sources
+
+
+def _fail_unsendable(session: Session, email: QueuedEmail, error: str) -> None:
+    logger.warning("Queued email %s cannot be sent: %s", email.id, error)
+    email.status = "failed"
+    email.last_error = error
+    record_step_outcome(session, email)
+    record_outcome(session, email)
+
+
+def _prepare_payload(
+    email: QueuedEmail,
+    account: Account,
+    has_attachments: bool,
+    sources: dict[int, tuple[Template, Contact] | str],
+    stages: dict[str, float],
+) -> str | None:
+    """Build ``email``'s wire form unless an earlier attempt already stored it.
+
+    Called for each row just before it is claimed, so rows that are cancelled
+    or held back this tick are not serialized. Lazy rows are rendered first;
+    only their subject is written back, the body goes straight into the MIME
+    payload. Returns an error message if the row cannot be sent (say, a header
+    with a line break in it) and records render/serialize seconds in ``stages``.
+    """
+
+    if email.mime_payload is not None:
+        return None
+
+    body_html, body_text = email.body_html, email.body_text
+    source = sources.get(email.id)
+    if isinstance(source, str):
+        return source
+    if source is not None:
+        template, contact = source
+        started = time.perf_counter()
+        try:
+            with profiler.phase("render"):
+                email.subject, body_html = render_template(template, _build_contact_context(contact))
+        except Exception as exc:
+            return f"Could not render template: {exc}"
+        body_text = template.body_text
+        stages["render"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    try:
+        with profiler.phase("serialize"):
+            email.mime_payload = build_message_bytes(
+                account.email_address,
+                _recipients(email),
+                email.subject,
+                body_html,
+                body_text,
+                has_attachments=has_attachments,
+            )
+    except Exception as exc:
+        return f"Could not build message: {exc}"
+    stages["serialize"] = time.perf_counter() - started
+    return None
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _due_at(email: QueuedEmail) -> datetime:
+    """When the row last became eligible to send (enqueue, schedule or retry time)."""
 
+    candidates = [email.created_at, email.scheduled_for, email.next_attempt_at]
+    return max(_as_utc(value) for value in candidates if value is not None)
 
+
+def _timeline_json(attempt: int, stages: dict[str, float]) -> str:
+    timeline: dict[str, float] = {"attempt": attempt}
+    for stage in TIMELINE_STAGES:
+        if stage in stages:
+            timeline[stage] = round(stages[stage] * 1000, 1)
+    return json.dumps(timeline, separators=(",", ":"))
+
+
+def _record_outcome(
+    email: QueuedEmail, account: Account, success: bool, error: str | None
+) -> None:
+    error_category = getattr(error, "category", None)
+    if error_category == CONNECTION:
+        circuit_breakers.record_failure(account, error)
+    elif success or error_category is not None:
+        # Any SMTP reply, even a rejection, proves the endpoint is reachable.
+        circuit_breakers.record_success(account)
+
+    if success:
+        rate_limiter.record_success(account)
+        email.status = "sent"
+        email.sent_at = datetime.now(timezone.utc)
+        email.last_error = None
+        email.next_attempt_at = None
+        email.mime_payload = None
+        metrics.emails_sent.inc(account=account.id)
+        metrics.observe_sent(email)
+        logger.info("Queued email %s sent successfully", email.id, extra=SAMPLED)
+        return
+
+    metrics.email_failures.inc(account=account.id, category=error_category or "unknown")
+    settings = get_settings()
+    if error_category == THROTTLED:
+        pause = rate_limiter.record_throttled(account)
+    if error_category == THROTTLED and email.throttle_deferrals < settings.MAX_THROTTLE_DEFERRALS:
+        # The server asked us to slow down; that is not the message's fault,
+        # so defer it without spending one of its attempts. Past the cap the
+        # reply counts as an ordinary transient failure, so a server that
+        # never stops throttling this message eventually fails it.
+        email.status = "queued"
+        email.attempts -= 1
+        email.throttle_deferrals += 1
+        email.last_error = error
+        email.next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=pause)
+        logger.warning(
+            "Queued email %s deferred after throttling reply: %s", email.id, error, extra=SAMPLED
+        )
+    elif is_transient_error(error) and email.attempts < settings.MAX_SEND_ATTEMPTS:
+        email.status = "queued"
+        email.last_error = error
+        email.next_attempt_at = datetime.now(timezone.utc) + _retry_delay(email.attempts)
+        logger.warning(
+            "Transient failure sending queued email %s (attempt %s), retrying at %s: %s",
+            email.id,
+            email.attempts,
+            email.next_attempt_at.isoformat(),
+            error,
+            extra=SAMPLED,
+        )
+    else:
+        email.status = "failed"
+        email.last_error = error
+        email.mime_payload = None
+        logger.error("Failed to send queued email %s: %s", email.id, error)
+
+
+@health.heartbeat("process_queued_emails")
+@metrics.scheduler_tick_seconds.time(job="process_queued_emails")
+@sql_stats.track("process_queued_emails")
+@profiler.profiled("process_queued_emails")
 def process_queued_emails() -> None:
     session = SessionLocal()
     now = datetime.now(timezone.utc)
+    started = time.perf_counter()
+    # Per-tick totals, logged once instead of a line per message.
+    outcomes: Counter[str] = Counter()
     try:
-        queued_emails = _get_due_emails(session, now)
+        _reap_expired_leases(session, now)
+        with profiler.phase("query"):
+            queued_emails = _get_due_emails(session, now)
+            accounts = _load_accounts(session, queued_emails)
+            sources = _lazy_sources(session, queued_emails)
+            attachments = _load_attachments(session, queued_emails)
         for email in queued_emails:
-            logger.info("Processing queued email %s", email.id)
-            email.status = "sending"
-            session.commit()
-            session.refresh(email)
+            if all(suppression.is_suppressed(address) for address in _recipients(email)):
+                # Suppressed after this row was queued.
+                email.status = "cancelled"
+                email.last_error = "Recipient is suppressed"
+                if email.enrollment is not None:
+                    email.enrollment.status = "cancelled"
+                record_outcome(session, email)
+                _commit(session)
+                outcomes["suppressed"] += 1
+                continue
 
-            account = session.query(Account).filter(Account.id == email.account_id).first()
+            account = accounts.get(email.account_id)
             if not account:
                 email.status = "failed"
                 email.last_error = "Account not found"
-                session.commit()
+                record_outcome(session, email)
+                _commit(session)
+                outcomes["failed"] += 1
+                continue
+
+            if not circuit_breakers.allow(account):
+                # The endpoint is known to be down: hold the row back until the
+                # breaker lets a probe through, so it does not keep taking a
+                # place in every tick's batch ahead of other accounts' mail.
+                wait = circuit_breakers.retry_in(account)
+                email.next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=wait)
+                _commit(session)
+                outcomes["circuit_open"] += 1
                 continue
 
-            to_addresses = [addr.strip() for addr in email.to_address.split(",") if addr.strip()]
+            wait = _wait_for_send_slot(account)
+            if wait > 0:
+                # Over the account's rate limit: leave the row queued for later.
+                email.next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=wait)
+                _commit(session)
+                outcomes["rate_limited"] += 1
+                continue
+
+            stages: dict[str, float] = {}
+            problem = _prepare_payload(email, account, bool(attachments[email.id]), sources, stages)
+            if problem:
+                _fail_unsendable(session, email, problem)
+                _commit(session)
+                outcomes["failed"] += 1
+                continue
+
+            logger.debug("Processing queued email %s", email.id)
+            claim_started = time.perf_counter()
+            email.status = "sending"
+            email.claimed_at = datetime.now(timezone.utc)
+            email.attempts = (email.attempts or 0) + 1
+            stages["queued"] = max((email.claimed_at - _due_at(email)).total_seconds(), 0.0)
+            _commit(session)
+            stages["claim"] = time.perf_counter() - claim_started
+
             try:
-                success, error = send_email(
-                    account=account,
-                    to_addresses=to_addresses or email.to_address,
-                    subject=email.subject,
-                    body_html=email.body_html,
-                    body_text=email.body_text,
-                )
+                with profiler.phase("send"):
+                    success, error = send_email(
+                        account=account,
+                        to_addresses=_recipients(email),
+                        subject=email.subject,
+                        body_html=email.body_html,
+                        body_text=email.body_text,
+                        raw_message=email.mime_payload,
+                        attachments=attachments[email.id],
+                        timings=stages,
+                    )
             except Exception as exc:  # pragma: no cover - defensive catch
                 logger.exception("Unexpected error while sending email %s", email.id)
                 success = False
                 error = str(exc)
 
-            if success:
-                email.status = "sent"
-                email.sent_at = datetime.now(timezone.utc)
-                email.last_error = None
-                logger.info("Queued email %s sent successfully", email.id)
-            else:
-                email.status = "failed"
-                email.last_error = error
-                logger.error("Failed to send queued email %s: %s", email.id, error)
-
-            session.commit()
+            email.timeline_json = _timeline_json(email.attempts, stages)
+            _record_outcome(email, account, success, error)
+            record_step_outcome(session, email)
+            record_outcome(session, email)
+            bounced = suppression.suppress_hard_bounce(session, email, error)
+            # Read before the commit expires the row, which would cost a reload.
+            outcomes["retrying" if email.status == "queued" else email.status] += 1
+            _commit(session)
+            if bounced:
+                suppression.remember([bounced])
+
+        if queued_emails:
+            elapsed = time.perf_counter() - started
+            logger.info(
+                "Send tick handled %s emails in %.2fs: %s",
+                len(queued_emails),
+                elapsed,
+                ", ".join(f"{count} {outcome}" for outcome, count in sorted(outcomes.items())),
+                extra={"batch": dict(outcomes), "duration_seconds": round(elapsed, 3)},
+            )
     finally:
         session.close()
 
@@ -132,48 +546,204 @@ def _build_contact_context(contact: Contact) -> dict[str, str | None]:
     }
 
 
+def _enqueued_contact_ids(session: Session, run: CampaignRun, contact_ids: list[int]) -> set[int]:
+    rows = session.query(QueuedEmail.contact_id).filter(
+        QueuedEmail.campaign_id == run.campaign_id,
+        QueuedEmail.run_id == run.id,
+        QueuedEmail.contact_id.in_(contact_ids),
+    )
+    return {contact_id for (contact_id,) in rows}
+
+
+def _send_spacing(campaign: Campaign, run: CampaignRun) -> timedelta | None:
+    """Gap between consecutive ``scheduled_for`` times in a run, if it is spread.
+
+    ``send_window_minutes`` divides the window evenly across the run's audience;
+    ``send_rate_per_hour`` sets a minimum gap. With both, the wider gap wins so
+    the rate cap holds even if the window overruns.
+    """
+
+    config = campaign.schedule_config or {}
+    if isinstance(config, str):
+        config = json.loads(config or "{}")
+    gaps = []
+    window = config.get("send_window_minutes")
+    if window and run.total_contacts:
+        gaps.append(window * 60 / run.total_contacts)
+    rate = config.get("send_rate_per_hour")
+    if rate:
+        gaps.append(3600 / rate)
+    return timedelta(seconds=max(gaps)) if gaps else None
+
+
+def _enqueue_campaign_emails(
+    session: Session,
+    run: CampaignRun,
+    campaign: Campaign,
+    account: Account,
+    template: Template,
+    contacts: Sequence[Contact],
+    now: datetime,
+) -> None:
+    """Enqueue ``contacts`` (in id order) for ``run``, committing chunk by chunk.
+
+    Each commit stores the chunk's rows together with the advanced cursor, so a
+    crash loses at most the chunk in flight and a resumed run picks up after the
+    last committed contact. Contacts already enqueued for the run are skipped,
+    and the unique (campaign_id, run_id, contact_id) index backs that up.
+
+    When the campaign sets a send window or rate, the n-th contact of the run
+    is scheduled ``n * spacing`` after the run started, so resuming keeps the
+    original timetable.
+    """
+
+    spacing = _send_spacing(campaign, run)
+    position = run.enqueued_count + run.skipped_count
+
+    def queued_email(contact: Contact, scheduled_for: datetime) -> QueuedEmail:
+        return QueuedEmail(
+            campaign_id=campaign.id,
+            run_id=run.id,
+            contact_id=contact.id,
+            template_version=template.version,
+            account_id=campaign.account_id,
+            from_address=account.email_address,
+            to_address=contact.email,
+            subject="",
+            scheduled_for=scheduled_for,
+            status="queued",
+            source="campaign",
+        )
+
+    by_id = {contact.id: contact for contact in contacts}
+    if campaign.render_mode == "lazy":
+        size = max(get_settings().RENDER_CHUNK_SIZE, 1)
+        chunks = (
+            [(contact.id, None, None) for contact in contacts[offset : offset + size]]
+            for offset in range(0, len(contacts), size)
+        )
+    else:
+        items = [(contact.id, _build_contact_context(contact)) for contact in contacts]
+        chunks = profiler.phase_iter(
+            "render", render_contexts(template.subject or "", template.body_html or "", items)
+        )
+
+    for chunk in chunks:
+        with profiler.phase("query"):
+            already = _enqueued_contact_ids(session, run, [contact_id for contact_id, _, _ in chunk])
+        rows = []
+        for contact_id, subject, body_html in chunk:
+            scheduled_for = run.started_at + position * spacing if spacing else now
+            position += 1
+            if contact_id in already:
+                continue
+            email = queued_email(by_id[contact_id], scheduled_for)
+            if body_html is not None:
+                email.subject = subject
+                email.body = intern_body(session, body_html, template.body_text)
+            rows.append(email)
+        session.add_all(rows)
+        run.cursor = chunk[-1][0]
+        run.enqueued_count += len(rows)
+        run.skipped_count += len(already)
+        _commit(session)
+
+
+def _campaign_audience(session: Session, campaign: Campaign, run: CampaignRun) -> list[Contact]:
+    """Matching contacts still to be enqueued for ``run``, in id order.
+
+    Incremental runs read only the delta through the ``tags_updated_at`` index
+    and leave out contacts this campaign has already mailed, archived rows included.
+    Suppressed addresses are always left out.
+    """
+
+    query = session.query(Contact).filter(Contact.id > run.cursor)
+    if campaign.audience_mode == "incremental":
+        if run.audience_since is not None:
+            query = query.filter(Contact.tags_updated_at > run.audience_since)
+        query = query.filter(
+            ~exists().where(
+                QueuedEmail.campaign_id == campaign.id, QueuedEmail.contact_id == Contact.id
+            ),
+            # Rows moved out by the retention purge still count as mailed.
+            ~exists().where(
+                ArchivedEmail.campaign_id == campaign.id, ArchivedEmail.contact_id == Contact.id
+            ),
+        )
+    target_tags = _tags_list(campaign.target_tags)
+    suppressed = suppression.suppressed_addresses()
+    return [
+        contact
+        for contact in query.order_by(Contact.id)
+        if _contact_matches(contact, target_tags)
+        and suppression.normalize(contact.email) not in suppressed
+    ]
+
+
+def _unfinished_run(session: Session, campaign: Campaign) -> CampaignRun | None:
+    return (
+        session.query(CampaignRun)
+        .filter(CampaignRun.campaign_id == campaign.id, CampaignRun.status == "running")
+        .order_by(CampaignRun.id.desc())
+        .first()
+    )
+
+
+@health.heartbeat("run_campaigns")
+@metrics.scheduler_tick_seconds.time(job="run_campaigns")
+@sql_stats.track("run_campaigns")
+@profiler.profiled("run_campaigns")
 def run_campaigns() -> None:
     session = SessionLocal()
     now = datetime.now(timezone.utc)
     try:
-        campaigns = session.query(Campaign).filter(Campaign.active.is_(True)).all()
+        with profiler.phase("query"):
+            campaigns = session.query(Campaign).filter(Campaign.active.is_(True)).all()
         for campaign in campaigns:
-            if not _should_run_campaign(campaign, now):
+            run = _unfinished_run(session, campaign)
+            if run is None and not _should_run_campaign(campaign, now):
                 continue
 
-            logger.info("Running campaign %s", campaign.id)
             account = session.query(Account).filter(Account.id == campaign.account_id).first()
             template = session.query(Template).filter(Template.id == campaign.template_id).first()
             if not account or not template:
                 logger.error("Campaign %s skipped due to missing account or template", campaign.id)
                 campaign.last_run_at = now
-                session.commit()
+                if run is not None:
+                    run.status = "failed"
+                    run.finished_at = now
+                _commit(session)
                 continue
 
-            target_tags = _tags_list(campaign.target_tags)
-            contacts = session.query(Contact).all()
-            for contact in contacts:
-                if not _contact_matches(contact, target_tags):
-                    continue
-
-                context = _build_contact_context(contact)
-                subject, body_html = render_template(template, context)
-                queued_email = QueuedEmail(
-                    campaign_id=campaign.id,
-                    account_id=campaign.account_id,
-                    from_address=account.email_address,
-                    to_address=contact.email,
-                    subject=subject,
-                    body_html=body_html,
-                    body_text=template.body_text,
-                    scheduled_for=now,
-                    status="queued",
+            if run is None:
+                logger.info("Running campaign %s", campaign.id)
+                run = CampaignRun(campaign_id=campaign.id, status="running", started_at=now)
+                if campaign.audience_mode == "incremental":
+                    run.audience_since = campaign.last_run_at
+                session.add(run)
+                # Recorded up front: from here on the run row, not the schedule,
+                # decides whether this campaign still has work to do.
+                campaign.last_run_at = now
+                _commit(session)
+            else:
+                logger.info(
+                    "Resuming campaign %s run %s after contact %s", campaign.id, run.id, run.cursor
                 )
-                session.add(queued_email)
 
-            campaign.last_run_at = now
-            session.commit()
-            logger.info("Campaign %s enqueued emails at %s", campaign.id, now.isoformat())
+            run_started = time.perf_counter()
+            with profiler.phase("query"):
+                contacts = _campaign_audience(session, campaign, run)
+            if run.total_contacts is None:
+                run.total_contacts = len(contacts)
+            _enqueue_campaign_emails(session, run, campaign, account, template, contacts, now)
+
+            run.status = "completed"
+            run.finished_at = datetime.now(timezone.utc)
+            _commit(session)
+            metrics.campaign_run_seconds.observe(time.perf_counter() - run_started, campaign=campaign.id)
+            logger.info(
+                "Campaign %s run %s enqueued %s emails", campaign.id, run.id, run.enqueued_count
+            )
     except Exception:  # pragma: no cover - defensive catch
         logger.exception("Unexpected error while running campaigns")
     finally:
@@ -198,6 +768,19 @@ def start_scheduler(app: FastAPI) -> None:
         id="run_campaigns",
         replace_existing=True,
     )
+    scheduler.add_job(
+        purge_expired,
+        "interval",
+        hours=get_settings().RETENTION_INTERVAL_HOURS,
+        id="purge_expired",
+        replace_existing=True,
+    )
+    # One-off: pick up compose jobs that a restart interrupted.
+    scheduler.add_job(resume_enqueue_jobs, id="resume_enqueue_jobs", replace_existing=True)
+    ticks = get_settings().PROFILE_TICKS
+    if ticks > 0:
+        for job in profiler.jobs():
+            profiler.arm(job, ticks)
     scheduler.start()
     app.state.scheduler = scheduler
     logger.info("Scheduler started with campaign runner and queued email processor")
@@ -1,14 +1,29 @@
 from protonmailer.schemas.account import AccountBase, AccountCreate, AccountRead, AccountUpdate
+from protonmailer.schemas.attachment import AttachmentRead
 from protonmailer.schemas.campaign import (
+    AudienceMode,
     CampaignBase,
     CampaignCreate,
     CampaignRead,
+    CampaignRunRead,
+    CampaignStats,
     CampaignUpdate,
+    DeliveryStatRead,
+    RenderMode,
     ScheduleConfig,
     ScheduleType,
 )
 from protonmailer.schemas.contact import ContactBase, ContactCreate, ContactRead, ContactUpdate
 from protonmailer.schemas.queued_email import QueuedEmailRead, QueuedEmailStatus
+from protonmailer.schemas.status import (
+    CircuitBreakerStatus,
+    DatabaseHealth,
+    HealthDetails,
+    JobHealth,
+    QueueHealth,
+    RetentionReportRead,
+)
+from protonmailer.schemas.suppression import SuppressionCreate, SuppressionRead, SuppressionReason
 from protonmailer.schemas.template import TemplateBase, TemplateCreate, TemplateRead, TemplateUpdate
 
 __all__ = [
@@ -16,10 +31,16 @@ __all__ = [
     "AccountCreate",
     "AccountRead",
     "AccountUpdate",
+    "AttachmentRead",
+    "AudienceMode",
     "CampaignBase",
     "CampaignCreate",
     "CampaignRead",
+    "CampaignRunRead",
+    "CampaignStats",
     "CampaignUpdate",
+    "DeliveryStatRead",
+    "RenderMode",
     "ScheduleConfig",
     "ScheduleType",
     "ContactBase",
@@ -28,6 +49,15 @@ __all__ = [
     "ContactUpdate",
     "QueuedEmailRead",
     "QueuedEmailStatus",
+    "CircuitBreakerStatus",
+    "DatabaseHealth",
+    "HealthDetails",
+    "JobHealth",
+    "QueueHealth",
+    "RetentionReportRead",
+    "SuppressionCreate",
+    "SuppressionRead",
+    "SuppressionReason",
     "TemplateBase",
     "TemplateCreate",
     "TemplateRead",
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel, ConfigDict, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
 
 class AccountBase(BaseModel):
@@ -13,6 +13,8 @@ class AccountBase(BaseModel):
     smtp_password_encrypted: str
     use_ssl: bool = False
     use_tls: bool = True
+    max_per_second: Optional[float] = Field(default=None, gt=0)
+    max_per_hour: Optional[int] = Field(default=None, gt=0)
 
 
 class AccountCreate(AccountBase):
@@ -28,6 +30,8 @@ class AccountUpdate(BaseModel):
     smtp_password_encrypted: Optional[str] = None
     use_ssl: Optional[bool] = None
     use_tls: Optional[bool] = None
+    max_per_second: Optional[float] = Field(default=None, gt=0)
+    max_per_hour: Optional[int] = Field(default=None, gt=0)
 
 
 class AccountRead(AccountBase):
@@ -1,8 +1,8 @@
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 from typing import Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class ScheduleType(str, Enum):
@@ -10,6 +10,16 @@ class ScheduleType(str, Enum):
     RECURRING = "recurring"
 
 
+class RenderMode(str, Enum):
+    EAGER = "eager"
+    LAZY = "lazy"
+
+
+class AudienceMode(str, Enum):
+    FULL = "full"
+    INCREMENTAL = "incremental"
+
+
 class ScheduleConfig(BaseModel):
     freq: str
     hour: Optional[int] = None
@@ -17,6 +27,10 @@ class ScheduleConfig(BaseModel):
     day_of_week: Optional[str] = None
     day_of_month: Optional[int] = None
     timezone: Optional[str] = None
+    # Spread a run's emails over this many minutes instead of queueing them all at once...
+    send_window_minutes: Optional[int] = Field(default=None, gt=0)
+    # ...and/or never schedule them faster than this rate.
+    send_rate_per_hour: Optional[int] = Field(default=None, gt=0)
 
 
 class CampaignBase(BaseModel):
@@ -27,6 +41,8 @@ class CampaignBase(BaseModel):
     schedule_config: Optional[ScheduleConfig] = None
     target_tags: Optional[str] = None
     active: bool = True
+    render_mode: RenderMode = RenderMode.EAGER
+    audience_mode: AudienceMode = AudienceMode.FULL
 
 
 class CampaignCreate(CampaignBase):
@@ -41,6 +57,8 @@ class CampaignUpdate(BaseModel):
     schedule_config: Optional[ScheduleConfig] = None
     target_tags: Optional[str] = None
     active: Optional[bool] = None
+    render_mode: Optional[RenderMode] = None
+    audience_mode: Optional[AudienceMode] = None
 
 
 class CampaignRead(CampaignBase):
@@ -49,3 +67,39 @@ class CampaignRead(CampaignBase):
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class CampaignRunRead(BaseModel):
+    id: int
+    campaign_id: int
+    status: str
+    cursor: int
+    total_contacts: Optional[int] = None
+    audience_since: Optional[datetime] = None
+    enqueued_count: int
+    skipped_count: int
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class DeliveryStatRead(BaseModel):
+    day: date
+    account_id: int
+    sent_count: int
+    failed_count: int
+    cancelled_count: int
+    avg_latency_seconds: Optional[float] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class CampaignStats(BaseModel):
+    campaign_id: int
+    since: date
+    sent_count: int
+    failed_count: int
+    cancelled_count: int
+    avg_latency_seconds: Optional[float] = None
+    days: list[DeliveryStatRead]
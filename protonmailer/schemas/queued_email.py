@@ -16,6 +16,9 @@ class QueuedEmailStatus(str, Enum):
 class QueuedEmailRead(BaseModel):
     id: int
     campaign_id: Optional[int] = None
+    contact_id: Optional[int] = None
+    enrollment_id: Optional[int] = None
+    template_version: Optional[int] = None
     account_id: int
     from_address: EmailStr
     to_address: str
@@ -24,8 +27,14 @@ class QueuedEmailRead(BaseModel):
     body_text: Optional[str] = None
     scheduled_for: datetime
     status: QueuedEmailStatus
+    source: str = "manual"
+    priority: int = 0
     last_error: Optional[str] = None
+    attempts: int = 0
+    next_attempt_at: Optional[datetime] = None
+    claimed_at: Optional[datetime] = None
     sent_at: Optional[datetime] = None
+    timeline: dict[str, float] = {}
     created_at: datetime
     updated_at: datetime
 
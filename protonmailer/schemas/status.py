@@ -0,0 +1,57 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class CircuitBreakerStatus(BaseModel):
+    smtp_host: str
+    smtp_port: int
+    smtp_username: str
+    state: str
+    consecutive_failures: int
+    opened_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+
+class RetentionReportRead(BaseModel):
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    archived: dict[str, int]
+    archive_rows_deleted: int
+    bodies_deleted: int
+    attachments_deleted: int
+    payload_bytes: int
+    database_bytes_reclaimed: Optional[int] = None
+
+
+class JobHealth(BaseModel):
+    job: str
+    last_success_at: datetime
+    last_duration_seconds: float
+    seconds_since_success: float
+    stale: bool
+
+
+class QueueHealth(BaseModel):
+    backlog: int
+    oldest_due_age_seconds: float
+    sending: int
+    stuck_sending: int
+
+
+class DatabaseHealth(BaseModel):
+    ok: bool
+    latency_ms: Optional[float] = None
+    error: Optional[str] = None
+
+
+class HealthDetails(BaseModel):
+    status: str
+    scheduler_running: bool
+    # When the cached queue/database figures were read.
+    checked_at: datetime
+    jobs: list[JobHealth]
+    queue: Optional[QueueHealth] = None
+    database: DatabaseHealth
+    circuit_breakers: list[CircuitBreakerStatus]
@@ -0,0 +1,28 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, EmailStr
+
+
+class SuppressionReason(str, Enum):
+    UNSUBSCRIBE = "unsubscribe"
+    BOUNCE = "bounce"
+    COMPLAINT = "complaint"
+    MANUAL = "manual"
+
+
+class SuppressionCreate(BaseModel):
+    email: EmailStr
+    reason: SuppressionReason = SuppressionReason.MANUAL
+    note: Optional[str] = None
+
+
+class SuppressionRead(BaseModel):
+    id: int
+    email: str
+    reason: str
+    note: Optional[str] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
@@ -24,6 +24,7 @@ class TemplateUpdate(BaseModel):
 
 class TemplateRead(TemplateBase):
     id: int
+    version: int = 1
     created_at: datetime
     updated_at: datetime
 
@@ -0,0 +1,111 @@
+"""Content-addressed attachment storage.
+
+Each distinct file is written once under ``ATTACHMENT_DIR`` at a path derived
+from its SHA-256, next to a base64 rendition (76-character CRLF lines) that is
+produced the first time the file is sent and reused for every later message.
+The SMTP layer memory-maps that rendition straight into the DATA phase.
+"""
+
+import base64
+import hashlib
+import mmap
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from sqlalchemy.orm import Session
+
+from protonmailer.config import get_settings
+from protonmailer.models.attachment import Attachment
+
+# 57 raw bytes encode to exactly one 76-character base64 line.
+_RAW_LINE = 57
+_RAW_CHUNK = _RAW_LINE * 1024
+
+
+def _root() -> Path:
+    return Path(get_settings().ATTACHMENT_DIR)
+
+
+def blob_path(sha256: str) -> Path:
+    return _root() / sha256[:2] / sha256
+
+
+def encoded_path(sha256: str) -> Path:
+    return _root() / sha256[:2] / f"{sha256}.b64"
+
+
+def _write_atomically(path: Path, chunks: Iterator[bytes]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            for chunk in chunks:
+                handle.write(chunk)
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+def store_attachment(
+    session: Session, data: bytes, filename: str, content_type: str | None = None
+) -> Attachment:
+    """Return the Attachment for ``data``, writing it to disk only if it is new."""
+
+    sha256 = hashlib.sha256(data).hexdigest()
+    attachment = session.query(Attachment).filter(Attachment.sha256 == sha256).first()
+    if attachment is not None:
+        return attachment
+
+    path = blob_path(sha256)
+    if not path.exists():
+        _write_atomically(path, iter([data]))
+
+    attachment = Attachment(
+        sha256=sha256,
+        filename=filename or sha256,
+        content_type=content_type or "application/octet-stream",
+        size=len(data),
+    )
+    session.add(attachment)
+    session.flush()
+    return attachment
+
+
+def _encode_lines(source: Path) -> Iterator[bytes]:
+    with source.open("rb") as handle:
+        while chunk := handle.read(_RAW_CHUNK):
+            encoded = base64.b64encode(chunk)
+            yield b"".join(
+                encoded[offset : offset + 76] + b"\r\n" for offset in range(0, len(encoded), 76)
+            )
+
+
+def ensure_encoded(attachment: Attachment) -> Path:
+    """Base64-encode the attachment on first use and return the cached rendition."""
+
+    path = encoded_path(attachment.sha256)
+    if not path.exists():
+        _write_atomically(path, _encode_lines(blob_path(attachment.sha256)))
+    return path
+
+
+@contextmanager
+def open_encoded(attachment: Attachment) -> Iterator[bytes | mmap.mmap]:
+    """Yield the base64 rendition as a read-only memory map (or ``b""`` if empty)."""
+
+    path = ensure_encoded(attachment)
+    with path.open("rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def delete_attachment_files(sha256: str) -> None:
+    for path in (blob_path(sha256), encoded_path(sha256)):
+        path.unlink(missing_ok=True)
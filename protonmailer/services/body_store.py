@@ -0,0 +1,115 @@
+"""Deduplicated, compressed storage for queued email bodies.
+
+Enqueue paths call ``intern_body`` instead of writing ``body_html`` inline, so
+a compose to N recipients stores one compressed copy rather than N, and even
+unique campaign bodies shrink to a fraction of their size.
+"""
+
+import hashlib
+import logging
+import zlib
+
+from sqlalchemy.orm import Session
+
+from protonmailer.models.email_body import EmailBody
+from protonmailer.models.queued_email import QueuedEmail
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_LEVEL = 6
+_SESSION_CACHE_KEY = "email_bodies"
+
+
+def _digest(body_html: str, body_text: str | None) -> str:
+    hasher = hashlib.sha256(body_html.encode("utf-8"))
+    if body_text is not None:
+        hasher.update(b"\0")
+        hasher.update(body_text.encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def intern_body(
+    session: Session,
+    body_html: str,
+    body_text: str | None = None,
+    query_existing: bool = True,
+) -> EmailBody:
+    """Return the stored body for this content, creating it if needed.
+
+    Lookups are memoised on the session so bulk enqueues hit the database at
+    most once per distinct body. New bodies are inserted on the next flush.
+    Pass ``query_existing=False`` when ``_prefetch`` already loaded the batch.
+    """
+
+    cache = _session_cache(session)
+    sha256 = _digest(body_html, body_text)
+    body = cache.get(sha256)
+    if body is None and query_existing:
+        body = session.query(EmailBody).filter(EmailBody.sha256 == sha256).first()
+    if body is None:
+        html_bytes = body_html.encode("utf-8")
+        text_bytes = body_text.encode("utf-8") if body_text is not None else None
+        html_data = zlib.compress(html_bytes, COMPRESSION_LEVEL)
+        text_data = zlib.compress(text_bytes, COMPRESSION_LEVEL) if text_bytes is not None else None
+        body = EmailBody(
+            sha256=sha256,
+            compression="zlib",
+            html_data=html_data,
+            text_data=text_data,
+            raw_size=len(html_bytes) + len(text_bytes or b""),
+            stored_size=len(html_data) + len(text_data or b""),
+        )
+        session.add(body)
+    cache[sha256] = body
+    return body
+
+
+def _session_cache(session: Session) -> dict[str, EmailBody]:
+    return session.info.setdefault(_SESSION_CACHE_KEY, {})
+
+
+def _prefetch(session: Session, digests: set[str]) -> None:
+    cache = _session_cache(session)
+    missing = digests.difference(cache)
+    if missing:
+        for body in session.query(EmailBody).filter(EmailBody.sha256.in_(missing)):
+            cache[body.sha256] = body
+
+
+def migrate_inline_bodies(session: Session, batch_size: int = 500) -> dict[str, int]:
+    """Move bodies still stored inline on queued_emails into the body store.
+
+    Works in id-ordered batches, committing after each, so it can be
+    interrupted and resumed. Returns row and byte counts for reporting.
+    """
+
+    stats = {"rows": 0, "inline_bytes": 0}
+    last_id = 0
+    while True:
+        rows = (
+            session.query(QueuedEmail)
+            .filter(QueuedEmail.body_id.is_(None), QueuedEmail.id > last_id)
+            .order_by(QueuedEmail.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        _prefetch(session, {_digest(email._body_html or "", email._body_text) for email in rows})
+        for email in rows:
+            html, text = email._body_html or "", email._body_text
+            stats["inline_bytes"] += len(html.encode("utf-8")) + len((text or "").encode("utf-8"))
+            email.body = intern_body(session, html, text, query_existing=False)
+            email._body_html = ""
+            email._body_text = None
+            stats["rows"] += 1
+        last_id = rows[-1].id
+        session.commit()
+
+    if stats["rows"]:
+        logger.info(
+            "Moved %s inline email bodies (%s bytes) into the body store",
+            stats["rows"],
+            stats["inline_bytes"],
+        )
+    return stats
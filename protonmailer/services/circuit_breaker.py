@@ -0,0 +1,117 @@
+"""Circuit breakers for SMTP endpoints.
+
+A breaker is keyed by (smtp_host, smtp_port, smtp_username). After
+``CIRCUIT_FAILURE_THRESHOLD`` consecutive connection failures it opens and the
+send worker skips that endpoint's rows instead of waiting out a connect timeout
+for each of them. Once ``CIRCUIT_RESET_SECONDS`` have passed it goes half-open
+and lets a single probe through; the probe's outcome closes or re-opens it.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from protonmailer.config import get_settings
+from protonmailer.models.account import Account
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+BreakerKey = tuple[str, int, str]
+
+
+@dataclass
+class CircuitBreaker:
+    key: BreakerKey
+    state: str = CLOSED
+    consecutive_failures: int = 0
+    opened_at: float | None = None
+    probe_started_at: float | None = None
+    last_error: str | None = None
+
+
+def breaker_key(account: Account) -> BreakerKey:
+    return (account.smtp_host, account.smtp_port, account.smtp_username)
+
+
+class CircuitBreakerRegistry:
+    def __init__(self, clock: Callable[[], float] = time.time) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._breakers: dict[BreakerKey, CircuitBreaker] = {}
+
+    def _breaker(self, account: Account) -> CircuitBreaker:
+        key = breaker_key(account)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(key=key)
+            self._breakers[key] = breaker
+        return breaker
+
+    def allow(self, account: Account) -> bool:
+        """Whether a send to ``account``'s endpoint may be attempted now."""
+
+        reset_seconds = get_settings().CIRCUIT_RESET_SECONDS
+        with self._lock:
+            breaker = self._breaker(account)
+            if breaker.state == CLOSED:
+                return True
+
+            now = self._clock()
+            if breaker.state == OPEN and now - (breaker.opened_at or 0) < reset_seconds:
+                return False
+
+            # Half-open: one probe at a time. A probe that never reports back
+            # (e.g. it was deferred by the rate limiter) expires after a window.
+            if breaker.probe_started_at is not None and now - breaker.probe_started_at < reset_seconds:
+                return False
+            breaker.state = HALF_OPEN
+            breaker.probe_started_at = now
+            return True
+
+    def retry_in(self, account: Account) -> float:
+        """Seconds until ``allow`` may let a send to ``account``'s endpoint through again."""
+
+        reset_seconds = get_settings().CIRCUIT_RESET_SECONDS
+        with self._lock:
+            breaker = self._breaker(account)
+            started = breaker.probe_started_at if breaker.state == HALF_OPEN else breaker.opened_at
+            if breaker.state == CLOSED or started is None:
+                return 0.0
+            return max(started + reset_seconds - self._clock(), 0.0)
+
+    def record_success(self, account: Account) -> None:
+        with self._lock:
+            breaker = self._breaker(account)
+            breaker.state = CLOSED
+            breaker.consecutive_failures = 0
+            breaker.opened_at = None
+            breaker.probe_started_at = None
+
+    def record_failure(self, account: Account, error: str | None = None) -> None:
+        threshold = get_settings().CIRCUIT_FAILURE_THRESHOLD
+        with self._lock:
+            breaker = self._breaker(account)
+            breaker.consecutive_failures += 1
+            breaker.last_error = error
+            if breaker.state == HALF_OPEN or breaker.consecutive_failures >= threshold:
+                breaker.state = OPEN
+                breaker.opened_at = self._clock()
+                breaker.probe_started_at = None
+
+    def state(self, account: Account) -> str:
+        with self._lock:
+            return self._breaker(account).state
+
+    def snapshot(self) -> list[CircuitBreaker]:
+        with self._lock:
+            return [CircuitBreaker(**vars(breaker)) for breaker in self._breakers.values()]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._breakers.clear()
+
+
+circuit_breakers = CircuitBreakerRegistry()
@@ -0,0 +1,165 @@
+"""Enqueueing compose submissions, inline or as a background job.
+
+Small submissions are enqueued inside the request. Above
+``COMPOSE_BACKGROUND_THRESHOLD`` recipients the handler only records an
+``EnqueueJob`` and ``run_enqueue_job`` inserts the rows afterwards in
+``COMPOSE_CHUNK_SIZE`` batches, committing progress after each one.
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Iterable
+
+from sqlalchemy.orm import Session
+
+from protonmailer import database
+from protonmailer.config import get_settings
+from protonmailer.models.account import Account
+from protonmailer.models.attachment import Attachment
+from protonmailer.models.enqueue_job import EnqueueJob
+from protonmailer.models.sequence import Sequence
+from protonmailer.services import suppression
+from protonmailer.services.sequence_service import (
+    calculate_step_time,
+    create_sequence,
+    enroll,
+    step_email,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_compose(
+    session: Session,
+    account: Account,
+    steps: list[dict],
+    to_addresses: list[str],
+    scheduled_for: datetime,
+    attachments: Iterable[Attachment] = (),
+    sequence: Sequence | None = None,
+) -> int:
+    """Add the emails for ``to_addresses`` to the session; returns how many recipients.
+
+    Suppressed recipients are skipped but still counted, so the return value
+    stays a position in ``to_addresses`` for background jobs. Multi-step
+    submissions are enrolled in ``sequence`` when given, otherwise in a new one.
+    """
+
+    attachments = list(attachments)
+    allowed, suppressed = suppression.filter_addresses(to_addresses)
+    if suppressed:
+        logger.info("Skipped %s suppressed recipients", len(suppressed))
+    if not allowed:
+        return len(to_addresses)
+    if len(steps) > 1:
+        enroll(session, account, steps, allowed, scheduled_for, attachments, sequence)
+    else:
+        send_time = calculate_step_time(scheduled_for, steps[0])
+        for address in allowed:
+            session.add(
+                step_email(
+                    session, account.id, account.email_address, address, steps, 1, send_time, attachments
+                )
+            )
+    return len(to_addresses)
+
+
+def create_enqueue_job(
+    session: Session,
+    account: Account,
+    steps: list[dict],
+    to_addresses: list[str],
+    scheduled_for: datetime,
+    attachments: Iterable[Attachment] = (),
+) -> EnqueueJob:
+    job = EnqueueJob(
+        account_id=account.id,
+        status="pending",
+        payload={
+            "to_addresses": to_addresses,
+            "steps": steps,
+            "scheduled_for": scheduled_for.isoformat(),
+            "attachment_ids": [attachment.id for attachment in attachments],
+        },
+        total=len(to_addresses),
+    )
+    session.add(job)
+    return job
+
+
+def run_enqueue_job(job_id: int) -> None:
+    """Insert a job's remaining rows chunk by chunk in a session of its own."""
+
+    session = database.SessionLocal()
+    try:
+        job = session.get(EnqueueJob, job_id)
+        if job is None or job.status == "completed":
+            return
+        job.status = "running"
+        session.commit()
+
+        account = session.get(Account, job.account_id)
+        if account is None:
+            job.status = "failed"
+            job.error = "Account not found"
+            job.finished_at = datetime.now(timezone.utc)
+            session.commit()
+            return
+
+        payload = job.payload
+        attachment_ids = payload.get("attachment_ids") or []
+        attachments = (
+            session.query(Attachment).filter(Attachment.id.in_(attachment_ids)).all()
+            if attachment_ids
+            else []
+        )
+        scheduled_for = datetime.fromisoformat(payload["scheduled_for"])
+        addresses = payload["to_addresses"]
+        steps = payload["steps"]
+        # Every chunk of a multi-step job enrolls into the same sequence; its id
+        # is kept in the payload so a resumed job finds it again.
+        sequence_id = payload.get("sequence_id")
+        sequence = session.get(Sequence, sequence_id) if sequence_id else None
+        if sequence is None and len(steps) > 1:
+            sequence = create_sequence(session, account, steps)
+            session.flush()
+            job.payload = {**payload, "sequence_id": sequence.id}
+            session.commit()
+        chunk_size = max(get_settings().COMPOSE_CHUNK_SIZE, 1)
+        while job.enqueued_count < len(addresses):
+            chunk = addresses[job.enqueued_count : job.enqueued_count + chunk_size]
+            job.enqueued_count += enqueue_compose(
+                session, account, steps, chunk, scheduled_for, attachments, sequence
+            )
+            session.commit()
+
+        job.status = "completed"
+        job.finished_at = datetime.now(timezone.utc)
+        session.commit()
+        logger.info("Enqueue job %s enqueued %s recipients", job.id, job.enqueued_count)
+    except Exception as exc:
+        logger.exception("Enqueue job %s failed", job_id)
+        session.rollback()
+        job = session.get(EnqueueJob, job_id)
+        if job is not None:
+            job.status = "failed"
+            job.error = str(exc)
+            job.finished_at = datetime.now(timezone.utc)
+            session.commit()
+    finally:
+        session.close()
+
+
+def resume_enqueue_jobs() -> None:
+    """Finish jobs interrupted by a restart (they resume after their last chunk)."""
+
+    with database.SessionLocal() as session:
+        job_ids = [
+            job_id
+            for (job_id,) in session.query(EnqueueJob.id).filter(
+                EnqueueJob.status.in_(["pending", "running"])
+            )
+        ]
+    for job_id in job_ids:
+        logger.info("Resuming enqueue job %s", job_id)
+        run_enqueue_job(job_id)
@@ -0,0 +1,130 @@
+"""Delivery rollup per (campaign, account, UTC day).
+
+Whenever a queued email reaches a final state (sent, failed or cancelled),
+``record_outcome`` adds it to its ``delivery_stats`` row in the same
+transaction, using one UPDATE or, for the first outcome of the day, an INSERT.
+Campaign analytics read these rows instead of scanning ``queued_emails``, so
+they stay cheap as the queue grows and keep working after the retention purge.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from protonmailer.models.delivery_stat import DeliveryStat
+from protonmailer.models.queued_email import QueuedEmail
+
+# Final queue statuses and the rollup column each one counts towards.
+OUTCOME_COLUMNS = {"sent": "sent_count", "failed": "failed_count", "cancelled": "cancelled_count"}
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _latency_seconds(email: QueuedEmail) -> float:
+    """Seconds from when the email first became due to when it was delivered."""
+
+    due = max(_as_utc(value) for value in (email.created_at, email.scheduled_for) if value is not None)
+    return max((_as_utc(email.sent_at) - due).total_seconds(), 0.0)
+
+
+def _bump(
+    session: Session,
+    campaign_id: int | None,
+    account_id: int,
+    day: date,
+    column: str,
+    count: int,
+    latency_seconds: float = 0.0,
+) -> None:
+    campaign_filter = (
+        DeliveryStat.campaign_id.is_(None)
+        if campaign_id is None
+        else DeliveryStat.campaign_id == campaign_id
+    )
+    result = session.execute(
+        update(DeliveryStat)
+        .where(campaign_filter, DeliveryStat.account_id == account_id, DeliveryStat.day == day)
+        .values(
+            {
+                column: getattr(DeliveryStat, column) + count,
+                "latency_seconds_total": DeliveryStat.latency_seconds_total + latency_seconds,
+            }
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        return
+    session.add(
+        DeliveryStat(
+            campaign_id=campaign_id,
+            account_id=account_id,
+            day=day,
+            latency_seconds_total=latency_seconds,
+            **{column: count},
+        )
+    )
+    # Later bumps in this transaction must find the row through their UPDATE.
+    session.flush()
+
+
+def record_outcome(session: Session, email: QueuedEmail) -> None:
+    """Count ``email`` in the rollup if it just reached a final status.
+
+    Call once per transition; a row that is retried later is taken back out
+    with ``retract_outcome``.
+    """
+
+    column = OUTCOME_COLUMNS.get(email.status)
+    if column is None:
+        return
+    if email.status == "sent" and email.sent_at is not None:
+        _bump(
+            session,
+            email.campaign_id,
+            email.account_id,
+            _as_utc(email.sent_at).date(),
+            column,
+            1,
+            _latency_seconds(email),
+        )
+    else:
+        _bump(session, email.campaign_id, email.account_id, datetime.now(timezone.utc).date(), column, 1)
+
+
+def retract_outcome(session: Session, email: QueuedEmail) -> None:
+    """Undo ``record_outcome`` for a failed row that is being queued again."""
+
+    if email.status != "failed":
+        return
+    day = _as_utc(email.updated_at).date() if email.updated_at else datetime.now(timezone.utc).date()
+    _bump(session, email.campaign_id, email.account_id, day, "failed_count", -1)
+
+
+def campaign_stats(session: Session, campaign_id: int, days: int = 30) -> dict:
+    """Totals and per-day, per-account rows for the campaign's last ``days`` days."""
+
+    since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    rows = (
+        session.query(DeliveryStat)
+        .filter(DeliveryStat.campaign_id == campaign_id, DeliveryStat.day >= since)
+        .order_by(DeliveryStat.day.desc(), DeliveryStat.account_id)
+        .all()
+    )
+    sent = sum(row.sent_count for row in rows)
+    latency = sum(row.latency_seconds_total for row in rows)
+    return {
+        "campaign_id": campaign_id,
+        "since": since,
+        "sent_count": sent,
+        "failed_count": sum(row.failed_count for row in rows),
+        "cancelled_count": sum(row.cancelled_count for row in rows),
+        "avg_latency_seconds": latency / sent if sent else None,
+        "days": rows,
+    }
+
+
+def total_sent(session: Session) -> int:
+    return session.query(func.coalesce(func.sum(DeliveryStat.sent_count), 0)).scalar()
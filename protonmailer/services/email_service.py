@@ -1,52 +1,255 @@
+import io
 import logging
+import re
 import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from typing import List, Tuple, Union
+import time
+import uuid
+from contextlib import contextmanager
+from email.generator import BytesGenerator
+from email.message import EmailMessage
+from email.parser import BytesHeaderParser
+from email.policy import SMTP
+from email.utils import formatdate, make_msgid
+from typing import Iterator, List, Sequence, Tuple, Union
 
+from protonmailer.logging_config import SAMPLED
 from protonmailer.models.account import Account
+from protonmailer.models.attachment import Attachment
+from protonmailer.services import metrics
+from protonmailer.services.attachment_store import open_encoded
 
 logger = logging.getLogger(__name__)
 
+TRANSIENT = "transient"
+CONNECTION = "connection"
+THROTTLED = "throttled"
+PERMANENT = "permanent"
+
+# Replies servers use to ask the client to slow down rather than to give up.
+THROTTLE_CODES = {421, 451}
+
+# Neither sendmail nor the streamed path negotiates 8BITMIME, so non-ASCII
+# parts must be quoted-printable or base64 rather than raw 8bit.
+_POLICY = SMTP.clone(cte_type="7bit")
+
+
+class SendError(str):
+    """Error message returned by ``send_email``, tagged with a failure category.
+
+    It behaves like the plain string callers have always received, so it can be
+    logged or stored as-is, while the scheduler can inspect ``category`` to decide
+    whether the send is worth retrying.
+    """
+
+    category: str
+    code: int | None
+
+    def __new__(cls, message: str, category: str = PERMANENT, code: int | None = None):
+        error = super().__new__(cls, message)
+        error.category = category
+        error.code = code
+        return error
+
+    @property
+    def transient(self) -> bool:
+        return self.category != PERMANENT
+
+
+def is_transient_error(error: str | None) -> bool:
+    return bool(getattr(error, "transient", False))
+
+
+def _category_for_code(code: int | None) -> str:
+    if code in THROTTLE_CODES:
+        return THROTTLED
+    if code is not None and 400 <= code < 500:
+        return TRANSIENT
+    return PERMANENT
+
+
+def classify_exception(exc: BaseException) -> SendError:
+    """Map an SMTP/socket exception onto a categorised ``SendError``."""
+
+    message = str(exc)
+    if isinstance(exc, smtplib.SMTPConnectError):
+        category = THROTTLED if exc.smtp_code in THROTTLE_CODES else CONNECTION
+        return SendError(message, category, exc.smtp_code)
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in exc.recipients.values()]
+        all_transient = bool(codes) and all(_category_for_code(code) != PERMANENT for code in codes)
+        return SendError(message, TRANSIENT if all_transient else PERMANENT, codes[0] if codes else None)
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return SendError(message, _category_for_code(exc.smtp_code), exc.smtp_code)
+    if isinstance(exc, smtplib.SMTPServerDisconnected):
+        return SendError(message, CONNECTION)
+    if isinstance(exc, smtplib.SMTPException):
+        return SendError(message, PERMANENT)
+    # Refused/reset connections, DNS failures and socket timeouts are all OSErrors.
+    if isinstance(exc, OSError):
+        return SendError(message, CONNECTION)
+    return SendError(message, PERMANENT)
+
 
 def _build_message(
-    account: Account,
+    from_address: str,
     to_addresses: List[str],
     subject: str,
     body_html: str,
     body_text: str | None = None,
-) -> MIMEMultipart | MIMEText:
-    if body_text:
-        message = MIMEMultipart("alternative")
-        message.attach(MIMEText(body_text, "plain"))
-        message.attach(MIMEText(body_html, "html"))
-    else:
-        message = MIMEText(body_html, "html")
-
-    message["From"] = account.email_address
+) -> EmailMessage:
+    message = EmailMessage(policy=_POLICY)
+    message["From"] = from_address
     message["To"] = ", ".join(to_addresses)
     message["Subject"] = subject
+    message["Date"] = formatdate(localtime=False)
+    message["Message-ID"] = make_msgid(domain=from_address.rpartition("@")[2] or None)
+
+    if body_text:
+        message.set_content(body_text, subtype="plain")
+        message.add_alternative(body_html, subtype="html")
+    else:
+        message.set_content(body_html, subtype="html")
     return message
 
 
+def _flatten(message: EmailMessage) -> bytes:
+    buffer = io.BytesIO()
+    BytesGenerator(buffer, policy=_POLICY).flatten(message)
+    return buffer.getvalue()
+
+
+def build_message_bytes(
+    from_address: str,
+    to_addresses: list[str] | str,
+    subject: str,
+    body_html: str,
+    body_text: str | None = None,
+    has_attachments: bool = False,
+) -> bytes:
+    """Serialize a message to its final RFC 5322 wire form (CRLF line endings).
+
+    The result can be stored and handed to ``send_email`` as ``raw_message`` so
+    a retried send reuses the same bytes, including its Message-ID.
+
+    With ``has_attachments`` the message is a multipart/mixed *head*: everything
+    up to where the first attachment part begins. ``send_email`` streams the
+    attachments' cached base64 renditions and the closing boundary after it.
+    """
+
+    recipients = [to_addresses] if isinstance(to_addresses, str) else list(to_addresses)
+    message = _build_message(from_address, recipients, subject, body_html, body_text)
+    if not has_attachments:
+        return _flatten(message)
+
+    boundary = f"=_pm_{uuid.uuid4().hex}"
+    message.make_mixed(boundary=boundary)
+    flattened = _flatten(message)
+    return flattened[: flattened.rindex(f"--{boundary}--".encode())]
+
+
+def _attachment_part_header(attachment: Attachment) -> bytes:
+    part = EmailMessage(policy=_POLICY)
+    part["Content-Type"] = attachment.content_type
+    part.set_param("name", attachment.filename)
+    part["Content-Transfer-Encoding"] = "base64"
+    part.add_header("Content-Disposition", "attachment", filename=attachment.filename)
+    return part.as_bytes()
+
+
+def _send_streamed(
+    server: smtplib.SMTP,
+    from_address: str,
+    recipients: List[str],
+    head: bytes,
+    attachments: Sequence[Attachment],
+) -> None:
+    """Run MAIL/RCPT/DATA by hand so attachment bytes go from mmap to socket.
+
+    ``smtplib.SMTP.sendmail`` needs the whole message in memory; this writes the
+    stored head, then each attachment's pre-encoded base64 file, then the
+    closing boundary. Base64 lines never start with ".", so only the head needs
+    dot-stuffing.
+    """
+
+    boundary = BytesHeaderParser(policy=SMTP).parsebytes(head).get_boundary()
+    delimiter = f"--{boundary}".encode()
+
+    server.ehlo_or_helo_if_needed()
+    code, reply = server.mail(from_address)
+    if code != 250:
+        server.rset()
+        raise smtplib.SMTPSenderRefused(code, reply, from_address)
+
+    refused = {}
+    for recipient in recipients:
+        code, reply = server.rcpt(recipient)
+        if code not in (250, 251):
+            refused[recipient] = (code, reply)
+    if len(refused) == len(recipients):
+        server.rset()
+        raise smtplib.SMTPRecipientsRefused(refused)
+
+    code, reply = server.docmd("data")
+    if code != 354:
+        server.rset()
+        raise smtplib.SMTPDataError(code, reply)
+
+    server.send(re.sub(rb"(?m)^\.", b"..", head))
+    for attachment in attachments:
+        server.send(delimiter + b"\r\n" + _attachment_part_header(attachment))
+        with open_encoded(attachment) as encoded:
+            # An empty part still needs the CRLF that precedes the next delimiter.
+            server.send(encoded or b"\r\n")
+    server.send(delimiter + b"--\r\n.\r\n")
+
+    code, reply = server.getreply()
+    if code != 250:
+        raise smtplib.SMTPDataError(code, reply)
+
+
+@contextmanager
+def _stage(
+    histogram: metrics.Histogram, account_label: str, timings: dict | None, name: str
+) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        histogram.observe(elapsed, account=account_label)
+        if timings is not None:
+            timings[name] = elapsed
+
+
 def send_email(
     account: Account,
     to_addresses: list[str] | str,
     subject: str,
     body_html: str,
     body_text: str | None = None,
+    raw_message: bytes | None = None,
+    attachments: Sequence[Attachment] = (),
+    timings: dict[str, float] | None = None,
 ) -> Tuple[bool, str | None]:
     """
     Send an email using SMTP credentials stored on the Account.
 
-    Returns a tuple of (success, error_message).
+    When ``raw_message`` (see ``build_message_bytes``) is given it is sent as-is
+    and ``subject``/``body_*`` are only used for logging. With ``attachments``,
+    ``raw_message`` must be a head built with ``has_attachments=True``.
+
+    If ``timings`` is given, the seconds spent in the SMTP "connect", "auth"
+    and "data" stages are stored in it (only the stages that were reached).
+
+    Returns a tuple of (success, error_message). On failure the message is a
+    ``SendError`` whose ``category`` says whether a retry may succeed.
     """
 
     recipients: List[str] = (
         [to_addresses] if isinstance(to_addresses, str) else list(to_addresses)
     )
 
-    logger.info(
+    logger.debug(
         "Attempting to send email from %s via %s to %s with subject '%s'",
         account.email_address,
         account.smtp_host,
@@ -54,26 +257,42 @@ def send_email(
         subject,
     )
 
-    message = _build_message(account, recipients, subject, body_html, body_text)
+    if raw_message is None:
+        raw_message = build_message_bytes(
+            account.email_address,
+            recipients,
+            subject,
+            body_html,
+            body_text,
+            has_attachments=bool(attachments),
+        )
 
+    account_label = str(account.id)
     try:
-        if account.use_ssl:
-            smtp_client: Union[smtplib.SMTP, smtplib.SMTP_SSL] = smtplib.SMTP_SSL(
-                account.smtp_host, account.smtp_port
-            )
-        else:
-            smtp_client = smtplib.SMTP(account.smtp_host, account.smtp_port)
+        with _stage(metrics.smtp_connect_seconds, account_label, timings, "connect"):
+            if account.use_ssl:
+                smtp_client: Union[smtplib.SMTP, smtplib.SMTP_SSL] = smtplib.SMTP_SSL(
+                    account.smtp_host, account.smtp_port
+                )
+            else:
+                smtp_client = smtplib.SMTP(account.smtp_host, account.smtp_port)
 
         with smtp_client as server:
-            if not account.use_ssl and account.use_tls:
-                server.starttls()
-
-            server.login(account.smtp_username, account.smtp_password_encrypted)
-            server.sendmail(account.email_address, recipients, message.as_string())
+            with _stage(metrics.smtp_login_seconds, account_label, timings, "auth"):
+                if not account.use_ssl and account.use_tls:
+                    server.starttls()
+                server.login(account.smtp_username, account.smtp_password_encrypted)
+            with _stage(metrics.smtp_send_seconds, account_label, timings, "data"):
+                if attachments:
+                    _send_streamed(server, account.email_address, recipients, raw_message, attachments)
+                else:
+                    server.sendmail(account.email_address, recipients, raw_message)
 
-        logger.info("Email sent successfully to %s", recipients)
+        logger.debug("Email sent successfully to %s", recipients)
         return True, None
     except Exception as exc:  # noqa: BLE001
-        error_message = str(exc)
-        logger.error("Failed to send email to %s: %s", recipients, error_message)
-        return False, error_message
+        error = classify_exception(exc)
+        logger.error(
+            "Failed to send email to %s (%s): %s", recipients, error.category, error, extra=SAMPLED
+        )
+        return False, error
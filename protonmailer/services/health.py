@@ -0,0 +1,174 @@
+"""Operational health: scheduler heartbeats, queue backlog and database latency.
+
+Scheduler jobs report each completed tick through ``heartbeat``. Queue and
+database figures are read by ``database_stats`` at most once per
+``HEALTH_CACHE_SECONDS`` no matter how often the endpoint is polled, so load
+balancers and monitors can hit it freely.
+"""
+
+import functools
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, TypeVar
+
+from sqlalchemy import func, or_, text
+
+from protonmailer import database
+from protonmailer.config import get_settings
+from protonmailer.models.queued_email import QueuedEmail
+from protonmailer.services.circuit_breaker import OPEN, circuit_breakers
+
+T = TypeVar("T")
+
+_ticks: dict[str, dict] = {}
+_ticks_lock = threading.Lock()
+
+_cache: dict | None = None
+_cached_at = 0.0
+_cache_lock = threading.Lock()
+
+
+def heartbeat(job: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorate a scheduler job to record when its last tick completed."""
+
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs) -> T:
+            started = time.perf_counter()
+            result = func(*args, **kwargs)
+            with _ticks_lock:
+                _ticks[job] = {
+                    "last_success_at": datetime.now(timezone.utc),
+                    "last_duration_seconds": round(time.perf_counter() - started, 3),
+                }
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def job_ticks() -> list[dict]:
+    stale_after = get_settings().HEALTH_STALE_TICK_SECONDS
+    now = datetime.now(timezone.utc)
+    with _ticks_lock:
+        ticks = {job: dict(tick) for job, tick in _ticks.items()}
+    jobs = []
+    for job, tick in sorted(ticks.items()):
+        age = (now - tick["last_success_at"]).total_seconds()
+        jobs.append(
+            {"job": job, "seconds_since_success": round(age, 1), "stale": age > stale_after, **tick}
+        )
+    return jobs
+
+
+def breaker_statuses() -> list[dict]:
+    return [
+        {
+            "smtp_host": breaker.key[0],
+            "smtp_port": breaker.key[1],
+            "smtp_username": breaker.key[2],
+            "state": breaker.state,
+            "consecutive_failures": breaker.consecutive_failures,
+            "opened_at": (
+                datetime.fromtimestamp(breaker.opened_at, tz=timezone.utc)
+                if breaker.opened_at is not None
+                else None
+            ),
+            "last_error": breaker.last_error,
+        }
+        for breaker in circuit_breakers.snapshot()
+    ]
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _read_database_stats() -> dict:
+    now = datetime.now(timezone.utc)
+    stats: dict = {"checked_at": now}
+    session = database.SessionLocal()
+    try:
+        started = time.perf_counter()
+        session.execute(text("SELECT 1"))
+        stats["database"] = {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+        counts = dict(
+            session.query(QueuedEmail.status, func.count(QueuedEmail.id))
+            .filter(QueuedEmail.status.in_(["queued", "sending"]))
+            .group_by(QueuedEmail.status)
+            .all()
+        )
+        oldest_due = (
+            session.query(func.min(QueuedEmail.scheduled_for))
+            .filter(QueuedEmail.status == "queued", QueuedEmail.scheduled_for <= now)
+            .scalar()
+        )
+        lease_cutoff = now - timedelta(seconds=get_settings().SEND_LEASE_SECONDS)
+        stuck = (
+            session.query(func.count(QueuedEmail.id))
+            .filter(
+                QueuedEmail.status == "sending",
+                or_(QueuedEmail.claimed_at.is_(None), QueuedEmail.claimed_at < lease_cutoff),
+            )
+            .scalar()
+        )
+        stats["queue"] = {
+            "backlog": counts.get("queued", 0),
+            "oldest_due_age_seconds": (
+                round((now - _as_utc(oldest_due)).total_seconds(), 1) if oldest_due is not None else 0.0
+            ),
+            "sending": counts.get("sending", 0),
+            "stuck_sending": stuck,
+        }
+    except Exception as exc:  # noqa: BLE001 - reported, not raised
+        stats["database"] = {"ok": False, "latency_ms": None, "error": str(exc)}
+        stats["queue"] = None
+    finally:
+        session.close()
+    return stats
+
+
+def database_stats() -> dict:
+    """Queue and database figures, recomputed at most once per ``HEALTH_CACHE_SECONDS``."""
+
+    global _cache, _cached_at
+    ttl = get_settings().HEALTH_CACHE_SECONDS
+    with _cache_lock:
+        if _cache is None or time.monotonic() - _cached_at >= ttl:
+            _cache = _read_database_stats()
+            _cached_at = time.monotonic()
+        return _cache
+
+
+def health_details(scheduler_running: bool) -> dict:
+    stats = database_stats()
+    jobs = job_ticks()
+    breakers = breaker_statuses()
+    if not stats["database"]["ok"]:
+        status = "down"
+    elif (
+        not scheduler_running
+        or any(job["stale"] for job in jobs)
+        or any(breaker["state"] == OPEN for breaker in breakers)
+    ):
+        status = "degraded"
+    else:
+        status = "ok"
+    return {
+        "status": status,
+        "scheduler_running": scheduler_running,
+        "jobs": jobs,
+        "circuit_breakers": breakers,
+        **stats,
+    }
+
+
+def reset() -> None:
+    global _cache
+    with _ticks_lock:
+        _ticks.clear()
+    with _cache_lock:
+        _cache = None
@@ -0,0 +1,255 @@
+"""In-process metrics for the send pipeline, exposed in Prometheus text format.
+
+Instruments are plain module-level objects updated in place under a lock, so
+recording a sample costs a dict lookup and an addition. Queue gauges are
+computed from the database when ``/metrics`` is scraped rather than maintained
+on every state change.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterator
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from protonmailer.models.queued_email import QueuedEmail
+
+LabelValues = tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+LATENCY_BUCKETS = (1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0, 4 * 3600.0, 24 * 3600.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        self._values: dict[LabelValues, object] = {}
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict[str, object]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = dict(self._values)
+        lines = self._header()
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: object) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels: object) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+
+class _HistogramState:
+    __slots__ = ("buckets", "sum", "count")
+
+    def __init__(self, size: int) -> None:
+        self.buckets = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = _HistogramState(len(self.buckets))
+            state.buckets[index] += 1
+            state.sum += value
+            state.count += 1
+
+    @contextmanager
+    def time(self, **labels: object) -> Iterator[None]:
+        """Observe the wall time of the block (or decorated call), even if it raises."""
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: object) -> int:
+        state = self._values.get(self._key(labels))
+        return state.count if state else 0
+
+    def render(self) -> list[str]:
+        with self._lock:
+            snapshot = {
+                key: (list(state.buckets), state.sum, state.count) for key, state in self._values.items()
+            }
+        lines = self._header()
+        for key, (buckets, total, count) in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, hits in zip(self.buckets, buckets):
+                cumulative += hits
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+REGISTRY: list[_Metric] = []
+
+queue_emails = Gauge("protonmailer_queue_emails", "Queued emails by status.", ("status",))
+oldest_due_age = Gauge(
+    "protonmailer_oldest_due_email_age_seconds",
+    "Seconds the oldest due, still-queued email has been waiting past its scheduled time.",
+)
+enqueue_to_sent = Histogram(
+    "protonmailer_enqueue_to_sent_seconds",
+    "Time from enqueue to successful send.",
+    buckets=LATENCY_BUCKETS,
+)
+smtp_connect_seconds = Histogram(
+    "protonmailer_smtp_connect_seconds",
+    "SMTP connect duration, up to the greeting (including implicit TLS).",
+    ("account",),
+)
+smtp_login_seconds = Histogram(
+    "protonmailer_smtp_login_seconds", "SMTP STARTTLS (if used) and AUTH duration.", ("account",)
+)
+smtp_send_seconds = Histogram(
+    "protonmailer_smtp_send_seconds", "SMTP envelope and DATA duration.", ("account",)
+)
+emails_sent = Counter("protonmailer_emails_sent_total", "Emails sent successfully.", ("account",))
+email_failures = Counter(
+    "protonmailer_email_failures_total", "Failed send attempts.", ("account", "category")
+)
+campaign_run_seconds = Histogram(
+    "protonmailer_campaign_run_seconds",
+    "Duration of campaign runs (enqueueing, including rendering).",
+    ("campaign",),
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0),
+)
+scheduler_tick_seconds = Histogram(
+    "protonmailer_scheduler_tick_seconds", "Duration of scheduler job ticks.", ("job",)
+)
+sql_statements = Histogram(
+    "protonmailer_sql_statements",
+    "SQL statements executed per HTTP request or scheduler tick.",
+    ("scope",),
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000),
+)
+sql_seconds = Histogram(
+    "protonmailer_sql_seconds",
+    "Time spent executing SQL per HTTP request or scheduler tick.",
+    ("scope",),
+)
+sql_repeated_statements = Counter(
+    "protonmailer_sql_repeated_statements_total",
+    "Statements run at least SQL_REPEAT_THRESHOLD times within one request or tick (likely N+1).",
+    ("scope",),
+)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; everything is stored in UTC.
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def observe_sent(email: QueuedEmail) -> None:
+    if email.created_at is not None and email.sent_at is not None:
+        latency = (_as_utc(email.sent_at) - _as_utc(email.created_at)).total_seconds()
+        enqueue_to_sent.observe(max(latency, 0.0))
+
+
+def collect_queue_metrics(session: Session) -> None:
+    """Refresh the queue gauges from the database (called on scrape)."""
+
+    queue_emails.clear()
+    for status, count in session.query(QueuedEmail.status, func.count(QueuedEmail.id)).group_by(
+        QueuedEmail.status
+    ):
+        queue_emails.set(count, status=status)
+
+    now = datetime.now(timezone.utc)
+    oldest = (
+        session.query(func.min(QueuedEmail.scheduled_for))
+        .filter(QueuedEmail.status == "queued", QueuedEmail.scheduled_for <= now)
+        .scalar()
+    )
+    oldest_due_age.set((now - _as_utc(oldest)).total_seconds() if oldest is not None else 0.0)
+
+
+def render_metrics() -> str:
+    lines: list[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics() -> None:
+    for metric in REGISTRY:
+        metric.clear()
@@ -0,0 +1,243 @@
+"""Opt-in profiling of scheduler ticks.
+
+Arm a job for its next N ticks (``arm``, the ``PROFILE_TICKS`` setting or the
+Profiling page) and each of those ticks runs under ``cProfile``, while
+``phase`` blocks inside the job add up wall time for the query, render,
+serialize, send and commit steps. Every profiled tick writes two files to
+``PROFILE_DIR``: ``<job>-<stamp>.prof`` for pstats/snakeviz and
+``<job>-<stamp>.json`` with the phase breakdown and the top functions.
+
+Unarmed ticks cost a dict lookup per tick and a context variable read per
+phase. Work done in render-pool worker processes is not profiled; it shows up
+as time in the render phase.
+"""
+
+import cProfile
+import functools
+import json
+import pstats
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, TypeVar
+
+from protonmailer.config import get_settings
+
+PHASES = ("query", "render", "serialize", "send", "commit")
+TOP_FUNCTIONS = 30
+
+_PROFILE_NAME = re.compile(r"^[a-z_]+-\d{8}T\d{12}Z$")
+
+T = TypeVar("T")
+
+
+class _Tick:
+    __slots__ = ("seconds", "calls")
+
+    def __init__(self) -> None:
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.calls = dict.fromkeys(PHASES, 0)
+
+
+_current: ContextVar[_Tick | None] = ContextVar("profiler_tick", default=None)
+# Jobs wrapped by ``profiled``, in registration order.
+_jobs: list[str] = []
+_armed: dict[str, int] = {}
+_armed_lock = threading.Lock()
+# cProfile cannot profile two overlapping ticks (Python 3.12+ refuses a second
+# active profiler), so a tick that finds another one running is left unprofiled.
+_profiling = threading.Lock()
+
+
+def _root() -> Path:
+    return Path(get_settings().PROFILE_DIR)
+
+
+def jobs() -> list[str]:
+    return list(_jobs)
+
+
+def arm(job: str, ticks: int) -> None:
+    """Profile the next ``ticks`` runs of ``job`` (0 disarms it)."""
+
+    with _armed_lock:
+        if ticks > 0:
+            _armed[job] = ticks
+        else:
+            _armed.pop(job, None)
+
+
+def armed() -> dict[str, int]:
+    with _armed_lock:
+        return dict(_armed)
+
+
+def reset() -> None:
+    with _armed_lock:
+        _armed.clear()
+
+
+def _take(job: str) -> bool:
+    with _armed_lock:
+        remaining = _armed.get(job, 0)
+        if remaining <= 0:
+            return False
+        if remaining == 1:
+            del _armed[job]
+        else:
+            _armed[job] = remaining - 1
+        return True
+
+
+def _give_back(job: str) -> None:
+    with _armed_lock:
+        _armed[job] = _armed.get(job, 0) + 1
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Attribute the block's wall time to ``name`` when the tick is being profiled.
+
+    Phases are meant to be disjoint; nesting one inside another counts the
+    inner time twice.
+    """
+
+    tick = _current.get()
+    if tick is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        tick.seconds[name] += time.perf_counter() - started
+        tick.calls[name] += 1
+
+
+def phase_iter(name: str, items: Iterable[T]) -> Iterator[T]:
+    """Yield from ``items``, attributing the time spent producing each item to ``name``."""
+
+    iterator = iter(items)
+    while True:
+        with phase(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+def _top_functions(profile: cProfile.Profile) -> list[dict]:
+    stats = pstats.Stats(profile).stats
+    ranked = sorted(stats.items(), key=lambda entry: entry[1][3], reverse=True)
+    return [
+        {
+            "function": f"{filename}:{line}({name})",
+            "calls": calls,
+            "tottime": round(tottime, 6),
+            "cumtime": round(cumtime, 6),
+        }
+        for (filename, line, name), (_, calls, tottime, cumtime, _) in ranked[:TOP_FUNCTIONS]
+    ]
+
+
+def _write(job: str, started_at: datetime, duration: float, tick: _Tick, profile, error) -> str:
+    root = _root()
+    root.mkdir(parents=True, exist_ok=True)
+    name = f"{job}-{started_at.strftime('%Y%m%dT%H%M%S%fZ')}"
+    profile.dump_stats(root / f"{name}.prof")
+    phases = {
+        phase_name: {"seconds": round(tick.seconds[phase_name], 6), "calls": tick.calls[phase_name]}
+        for phase_name in PHASES
+    }
+    summary = {
+        "name": name,
+        "job": job,
+        "started_at": started_at.isoformat(),
+        "duration_seconds": round(duration, 6),
+        "phases": phases,
+        "other_seconds": round(max(duration - sum(tick.seconds.values()), 0.0), 6),
+        "error": error,
+        "top_functions": _top_functions(profile),
+    }
+    (root / f"{name}.json").write_text(json.dumps(summary, indent=2))
+    return name
+
+
+def profiled(job: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorate a scheduler job so armed ticks run under the profiler."""
+
+    if job not in _jobs:
+        _jobs.append(job)
+
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs) -> T:
+            if not _take(job):
+                return func(*args, **kwargs)
+            if not _profiling.acquire(blocking=False):
+                _give_back(job)
+                return func(*args, **kwargs)
+
+            tick = _Tick()
+            token = _current.set(tick)
+            profile = cProfile.Profile()
+            started_at = datetime.now(timezone.utc)
+            started = time.perf_counter()
+            error = None
+            try:
+                profile.enable()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    profile.disable()
+            except Exception as exc:
+                error = repr(exc)
+                raise
+            finally:
+                _current.reset(token)
+                _profiling.release()
+                _write(job, started_at, time.perf_counter() - started, tick, profile, error)
+
+        return wrapper
+
+    return decorator
+
+
+def list_profiles(limit: int = 50) -> list[dict]:
+    """Summaries of the most recent profiles, newest first (without top functions)."""
+
+    root = _root()
+    if not root.is_dir():
+        return []
+    summaries = []
+    for path in sorted(root.glob("*.json"), key=lambda path: path.stem.split("-", 1)[-1], reverse=True):
+        summary = load_profile(path.stem)
+        if summary is not None:
+            summary.pop("top_functions", None)
+            summaries.append(summary)
+        if len(summaries) >= limit:
+            break
+    return summaries
+
+
+def load_profile(name: str) -> dict | None:
+    if not _PROFILE_NAME.match(name):
+        return None
+    try:
+        return json.loads((_root() / f"{name}.json").read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def profile_stats_path(name: str) -> Path | None:
+    """Path of the raw ``.prof`` dump for ``name``, if it exists."""
+
+    if not _PROFILE_NAME.match(name):
+        return None
+    path = _root() / f"{name}.prof"
+    return path if path.is_file() else None
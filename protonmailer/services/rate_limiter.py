@@ -0,0 +1,128 @@
+"""In-process, per-account send rate limiting.
+
+Each Account may cap its throughput with ``max_per_second`` and/or
+``max_per_hour``. Both limits are enforced with token buckets, and throttling
+replies from the server (421/451) shrink the effective rate multiplicatively,
+recovering additively on each successful send.
+"""
+
+import threading
+import time
+from typing import Callable
+
+from protonmailer.config import get_settings
+from protonmailer.models.account import Account
+
+MIN_RATE_FACTOR = 0.05
+RATE_RECOVERY_STEP = 0.05
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float, now: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = now
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(now - self.updated_at, 0.0)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until one token is available (0 if one is available now)."""
+
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def set_rate(self, rate: float, now: float) -> None:
+        self._refill(now)
+        self.rate = rate
+
+
+class _AccountState:
+    def __init__(self, limits: tuple[float | None, int | None], now: float) -> None:
+        self.limits = limits
+        self.factor = 1.0
+        self.paused_until = 0.0
+        per_second, per_hour = limits
+        self.buckets: list[tuple[TokenBucket, float]] = []
+        if per_second:
+            self.buckets.append((TokenBucket(per_second, max(per_second, 1.0), now), per_second))
+        if per_hour:
+            self.buckets.append((TokenBucket(per_hour / 3600, float(per_hour), now), per_hour / 3600))
+
+    def apply_factor(self, now: float) -> None:
+        for bucket, base_rate in self.buckets:
+            bucket.set_rate(base_rate * self.factor, now)
+
+
+class AccountRateLimiter:
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._states: dict[int, _AccountState] = {}
+
+    def _state(self, account: Account, now: float) -> _AccountState:
+        limits = (account.max_per_second, account.max_per_hour)
+        state = self._states.get(account.id)
+        if state is None or state.limits != limits:
+            state = _AccountState(limits, now)
+            self._states[account.id] = state
+        return state
+
+    def acquire(self, account: Account) -> float:
+        """Take a send token for ``account``.
+
+        Returns 0 when the send may proceed, otherwise the number of seconds to
+        wait before trying again (no token is consumed in that case).
+        """
+
+        with self._lock:
+            now = self._clock()
+            state = self._state(account, now)
+            wait = max(state.paused_until - now, 0.0)
+            for bucket, _ in state.buckets:
+                wait = max(wait, bucket.wait_time(now))
+            if wait > 0:
+                return wait
+            for bucket, _ in state.buckets:
+                bucket.take(now)
+            return 0.0
+
+    def record_success(self, account: Account) -> None:
+        with self._lock:
+            now = self._clock()
+            state = self._state(account, now)
+            if state.factor < 1.0:
+                state.factor = min(1.0, state.factor + RATE_RECOVERY_STEP)
+                state.apply_factor(now)
+
+    def record_throttled(self, account: Account) -> float:
+        """Halve the account's rate and pause it; returns the pause in seconds."""
+
+        with self._lock:
+            now = self._clock()
+            state = self._state(account, now)
+            state.factor = max(MIN_RATE_FACTOR, state.factor / 2)
+            state.apply_factor(now)
+            pause = get_settings().THROTTLE_PAUSE_SECONDS / state.factor
+            state.paused_until = now + pause
+            return pause
+
+    def rate_factor(self, account_id: int) -> float:
+        state = self._states.get(account_id)
+        return state.factor if state else 1.0
+
+    def reset(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+
+rate_limiter = AccountRateLimiter()
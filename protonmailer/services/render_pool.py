@@ -0,0 +1,101 @@
+"""Campaign rendering across a process pool.
+
+Jinja rendering is CPU-bound and holds the GIL, so a large personalised
+campaign renders on a single core. ``render_contexts`` splits the audience into
+chunks and renders them in a ``ProcessPoolExecutor`` whose workers compile the
+campaign template once at start-up. Results come back chunk by chunk, in input
+order, so the caller can insert each chunk while later ones are still rendering;
+at most two chunks per worker are in flight, so a slow consumer holds back
+rendering instead of buffering the whole audience.
+
+Small audiences, or ``RENDER_WORKERS`` below 2, render inline in the calling
+process: starting workers costs more than it saves there.
+"""
+
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator
+
+import jinja2
+
+from protonmailer.config import get_settings
+from protonmailer.services.template_service import compile_template
+
+RenderItem = tuple[int, dict]
+RenderResult = tuple[int, str, str]
+
+# Compiled per worker by ``_init_worker``; unused in the parent process.
+_worker_templates: tuple[jinja2.Template, jinja2.Template] | None = None
+
+
+def _init_worker(subject_source: str, body_source: str) -> None:
+    global _worker_templates
+    _worker_templates = (compile_template(subject_source), compile_template(body_source))
+
+
+def _render(
+    templates: tuple[jinja2.Template, jinja2.Template], chunk: list[RenderItem]
+) -> list[RenderResult]:
+    subject_template, body_template = templates
+    return [
+        (key, subject_template.render(**context), body_template.render(**context))
+        for key, context in chunk
+    ]
+
+
+def _render_chunk(chunk: list[RenderItem]) -> list[RenderResult]:
+    return _render(_worker_templates, chunk)
+
+
+def _chunks(items: Iterable[RenderItem], size: int) -> Iterator[list[RenderItem]]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def render_contexts(
+    subject_source: str,
+    body_source: str,
+    items: list[RenderItem],
+    workers: int | None = None,
+) -> Iterator[list[RenderResult]]:
+    """Render ``(key, context)`` pairs, yielding ``(key, subject, body_html)`` chunks.
+
+    Chunks are yielded in input order. ``workers`` defaults to
+    ``RENDER_WORKERS``; the pool is only used for at least
+    ``RENDER_POOL_MIN_CONTACTS`` items.
+    """
+
+    settings = get_settings()
+    workers = settings.RENDER_WORKERS if workers is None else workers
+    chunks = _chunks(items, max(settings.RENDER_CHUNK_SIZE, 1))
+
+    if workers < 2 or len(items) < settings.RENDER_POOL_MIN_CONTACTS:
+        templates = (compile_template(subject_source), compile_template(body_source))
+        for chunk in chunks:
+            yield _render(templates, chunk)
+        return
+
+    # Spawn rather than fork: the parent runs the scheduler's threads and holds
+    # open database connections, neither of which survive a fork safely.
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(subject_source, body_source),
+    ) as pool:
+        # Executor.map would submit every chunk up front and let finished
+        # results pile up while the caller inserts; keep a bounded window.
+        pending: deque[Future[list[RenderResult]]] = deque()
+        try:
+            for chunk in chunks:
+                pending.append(pool.submit(_render_chunk, chunk))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
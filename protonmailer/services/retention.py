@@ -0,0 +1,261 @@
+"""Retention purge for finished queue rows.
+
+Sent, failed and cancelled rows older than their status's TTL (counted from
+their last update) are copied to ``archived_emails`` without bodies, payloads
+or attachment links, then deleted. Work happens in batches of
+``RETENTION_BATCH_SIZE`` ids, each in its own short transaction, so the send
+worker never waits long on the write lock. Afterwards the purge removes:
+- archived rows past ``ARCHIVE_RETENTION_DAYS``
+- deduplicated bodies nothing references any more
+- attachments nothing references any more, together with their files
+
+On SQLite it finally runs an incremental VACUUM to return the freed pages to
+the filesystem.
+"""
+
+import logging
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, exists, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from protonmailer import database
+from protonmailer.config import get_settings
+from protonmailer.models.archived_email import ArchivedEmail
+from protonmailer.models.attachment import Attachment, queued_email_attachments
+from protonmailer.models.email_body import EmailBody
+from protonmailer.models.enqueue_job import EnqueueJob
+from protonmailer.models.queued_email import QueuedEmail
+from protonmailer.services import health, metrics, sql_stats
+from protonmailer.services.attachment_store import delete_attachment_files
+
+logger = logging.getLogger(__name__)
+
+# Uploaded attachments get this long to be linked to an email before they count as orphans.
+ATTACHMENT_GRACE = timedelta(days=1)
+
+_ARCHIVED_COLUMNS = (
+    "id",
+    "campaign_id",
+    "run_id",
+    "enrollment_id",
+    "contact_id",
+    "account_id",
+    "from_address",
+    "to_address",
+    "subject",
+    "status",
+    "source",
+    "attempts",
+    "last_error",
+    "timeline_json",
+    "scheduled_for",
+    "sent_at",
+    "created_at",
+)
+
+
+@dataclass
+class RetentionReport:
+    started_at: datetime
+    finished_at: datetime | None = None
+    archived: dict[str, int] = field(default_factory=dict)
+    archive_rows_deleted: int = 0
+    bodies_deleted: int = 0
+    attachments_deleted: int = 0
+    # Inline bodies, MIME payloads, shared bodies and attachment files dropped.
+    payload_bytes: int = 0
+    # How much the SQLite file shrank after the incremental VACUUM (None elsewhere).
+    database_bytes_reclaimed: int | None = None
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+_last_report: RetentionReport | None = None
+
+
+def last_report() -> RetentionReport | None:
+    return _last_report
+
+
+def _ttls() -> dict[str, int]:
+    settings = get_settings()
+    return {
+        "sent": settings.RETENTION_SENT_DAYS,
+        "failed": settings.RETENTION_FAILED_DAYS,
+        "cancelled": settings.RETENTION_CANCELLED_DAYS,
+    }
+
+
+def _archive_batch(session: Session, ids: list[int]) -> int:
+    """Move one batch of queued emails to the archive; returns the payload bytes dropped."""
+
+    payload_bytes = session.execute(
+        select(
+            func.coalesce(
+                func.sum(
+                    func.coalesce(func.length(QueuedEmail._body_html), 0)
+                    + func.coalesce(func.length(QueuedEmail._body_text), 0)
+                    + func.coalesce(func.length(QueuedEmail.mime_payload), 0)
+                ),
+                0,
+            )
+        ).where(QueuedEmail.id.in_(ids))
+    ).scalar_one()
+
+    columns = [getattr(QueuedEmail.__table__.c, name) for name in _ARCHIVED_COLUMNS]
+    session.execute(
+        insert(ArchivedEmail).from_select(
+            list(_ARCHIVED_COLUMNS), select(*columns).where(QueuedEmail.id.in_(ids))
+        )
+    )
+    session.execute(
+        delete(queued_email_attachments).where(queued_email_attachments.c.queued_email_id.in_(ids))
+    )
+    session.execute(delete(QueuedEmail).where(QueuedEmail.id.in_(ids)))
+    session.commit()
+    return int(payload_bytes)
+
+
+def _purge_status(session: Session, status: str, cutoff: datetime, report: RetentionReport) -> None:
+    batch_size = max(get_settings().RETENTION_BATCH_SIZE, 1)
+    while True:
+        ids = list(
+            session.execute(
+                select(QueuedEmail.id)
+                .where(QueuedEmail.status == status, QueuedEmail.updated_at < cutoff)
+                .order_by(QueuedEmail.updated_at)
+                .limit(batch_size)
+            ).scalars()
+        )
+        if not ids:
+            return
+        report.payload_bytes += _archive_batch(session, ids)
+        report.archived[status] = report.archived.get(status, 0) + len(ids)
+
+
+def _purge_archive(session: Session, cutoff: datetime, report: RetentionReport) -> None:
+    batch_size = max(get_settings().RETENTION_BATCH_SIZE, 1)
+    while True:
+        ids = list(
+            session.execute(
+                select(ArchivedEmail.id).where(ArchivedEmail.archived_at < cutoff).limit(batch_size)
+            ).scalars()
+        )
+        if not ids:
+            return
+        session.execute(delete(ArchivedEmail).where(ArchivedEmail.id.in_(ids)))
+        session.commit()
+        report.archive_rows_deleted += len(ids)
+
+
+def _purge_orphaned_bodies(session: Session, report: RetentionReport) -> None:
+    batch_size = max(get_settings().RETENTION_BATCH_SIZE, 1)
+    unreferenced = ~exists().where(QueuedEmail.body_id == EmailBody.id)
+    while True:
+        rows = session.execute(
+            select(EmailBody.id, EmailBody.stored_size).where(unreferenced).limit(batch_size)
+        ).all()
+        if not rows:
+            return
+        session.execute(delete(EmailBody).where(EmailBody.id.in_([row.id for row in rows])))
+        session.commit()
+        report.bodies_deleted += len(rows)
+        report.payload_bytes += sum(row.stored_size for row in rows)
+
+
+def _attachments_in_pending_jobs(session: Session) -> set[int]:
+    jobs = session.query(EnqueueJob.payload).filter(EnqueueJob.status.in_(["pending", "running"]))
+    return {attachment_id for (payload,) in jobs for attachment_id in payload.get("attachment_ids", [])}
+
+
+def _purge_orphaned_attachments(session: Session, now: datetime, report: RetentionReport) -> None:
+    keep = _attachments_in_pending_jobs(session)
+    orphans = (
+        session.query(Attachment)
+        .filter(
+            ~exists().where(queued_email_attachments.c.attachment_id == Attachment.id),
+            Attachment.created_at < now - ATTACHMENT_GRACE,
+        )
+        .all()
+    )
+    for attachment in orphans:
+        if attachment.id in keep:
+            continue
+        sha256, size = attachment.sha256, attachment.size
+        session.delete(attachment)
+        session.commit()
+        # Files go only once the row is gone, so a crash leaves at worst a stray file.
+        delete_attachment_files(sha256)
+        report.attachments_deleted += 1
+        report.payload_bytes += size
+
+
+def _sqlite_file_size(session: Session) -> int:
+    page_size = session.execute(text("PRAGMA page_size")).scalar_one()
+    page_count = session.execute(text("PRAGMA page_count")).scalar_one()
+    return page_size * page_count
+
+
+def _incremental_vacuum(session: Session, report: RetentionReport) -> None:
+    if session.get_bind().dialect.name != "sqlite":
+        return
+    if session.execute(text("PRAGMA auto_vacuum")).scalar_one() != 2:
+        logger.info(
+            "SQLite auto_vacuum is not INCREMENTAL; freed pages are reused but the file "
+            "will not shrink until a manual VACUUM"
+        )
+        report.database_bytes_reclaimed = 0
+        return
+    before = _sqlite_file_size(session)
+    # Pragma results must be stepped through for the vacuum to run to completion.
+    session.execute(text("PRAGMA incremental_vacuum")).all()
+    session.commit()
+    report.database_bytes_reclaimed = before - _sqlite_file_size(session)
+
+
+@health.heartbeat("purge_expired")
+@metrics.scheduler_tick_seconds.time(job="purge_expired")
+@sql_stats.track("purge_expired")
+def purge_expired() -> RetentionReport:
+    """Archive and purge rows past their retention; returns what was reclaimed."""
+
+    global _last_report
+    settings = get_settings()
+    now = datetime.now(timezone.utc)
+    report = RetentionReport(started_at=now)
+    session = database.SessionLocal()
+    try:
+        for status, days in _ttls().items():
+            if days > 0:
+                _purge_status(session, status, now - timedelta(days=days), report)
+        if settings.ARCHIVE_RETENTION_DAYS > 0:
+            _purge_archive(session, now - timedelta(days=settings.ARCHIVE_RETENTION_DAYS), report)
+        _purge_orphaned_bodies(session, report)
+        _purge_orphaned_attachments(session, now, report)
+        _incremental_vacuum(session, report)
+    finally:
+        session.close()
+
+    report.finished_at = datetime.now(timezone.utc)
+    _last_report = report
+    logger.info(
+        "Retention purge archived %s emails (%s), deleted %s archive rows, %s bodies and "
+        "%s attachments; %s payload bytes dropped, %s database bytes reclaimed",
+        sum(report.archived.values()),
+        ", ".join(f"{count} {status}" for status, count in sorted(report.archived.items())) or "none",
+        report.archive_rows_deleted,
+        report.bodies_deleted,
+        report.attachments_deleted,
+        report.payload_bytes,
+        report.database_bytes_reclaimed,
+        extra={"retention": report.as_dict()},
+    )
+    return report
+
+
+def reset() -> None:
+    global _last_report
+    _last_report = None
@@ -0,0 +1,233 @@
+"""Multi-step compose sequences, expanded one step at a time.
+
+Composing a sequence stores its steps once and enrolls each recipient with
+only the first step queued. When a step is sent, ``record_step_outcome``
+enqueues the next one, scheduled relative to the step before it, so the queue
+only ever holds near-term work and cancelling an enrollment touches one row.
+"""
+
+import calendar
+import json
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from sqlalchemy.orm import Session
+
+from protonmailer.models.account import Account
+from protonmailer.models.attachment import Attachment
+from protonmailer.models.queued_email import QueuedEmail
+from protonmailer.models.sequence import Sequence, SequenceEnrollment
+from protonmailer.services.body_store import intern_body
+from protonmailer.services import suppression
+from protonmailer.services.delivery_stats import record_outcome
+
+
+def add_months(base: datetime, months: int, day: int) -> datetime:
+    month_index = base.month - 1 + months
+    year = base.year + month_index // 12
+    month = month_index % 12 + 1
+    last_day = calendar.monthrange(year, month)[1]
+    target_day = min(max(day, 1), last_day)
+    return base.replace(year=year, month=month, day=target_day)
+
+
+def calculate_step_time(previous: datetime, step: dict) -> datetime:
+    offset_type = step.get("offset_type") or "immediate"
+    if offset_type == "days":
+        try:
+            days = int(step.get("offset_value") or 0)
+        except (TypeError, ValueError):
+            days = 0
+        return previous + timedelta(days=days)
+
+    if offset_type == "monthly":
+        try:
+            day_of_month = int(step.get("day_of_month") or previous.day)
+        except (TypeError, ValueError):
+            day_of_month = previous.day
+        try:
+            month_interval = int(step.get("month_interval") or 1)
+        except (TypeError, ValueError):
+            month_interval = 1
+        return add_months(previous, month_interval, day_of_month)
+
+    return previous
+
+
+def load_sequence_steps(payload: str | None, fallback_subject: str, fallback_body: str) -> list[dict]:
+    try:
+        raw_steps = json.loads(payload or "[]")
+    except json.JSONDecodeError:
+        raw_steps = []
+
+    steps: list[dict] = []
+    for step in raw_steps:
+        subject = step.get("subject") or fallback_subject
+        body = step.get("body") or fallback_body
+        if not subject or not body:
+            continue
+        steps.append(
+            {
+                "subject": subject,
+                "body": body,
+                "offset_type": step.get("offset_type") or "immediate",
+                "offset_value": step.get("offset_value"),
+                "day_of_month": step.get("day_of_month"),
+                "month_interval": step.get("month_interval"),
+            }
+        )
+
+    if not steps:
+        steps.append(
+            {
+                "subject": fallback_subject,
+                "body": fallback_body,
+                "offset_type": "immediate",
+                "offset_value": 0,
+            }
+        )
+
+    return steps
+
+
+def step_metadata(index: int, step: dict) -> str:
+    return json.dumps(
+        {
+            "sequence_step": index,
+            "offset_type": step.get("offset_type"),
+            "offset_value": step.get("offset_value"),
+            "month_interval": step.get("month_interval"),
+            "day_of_month": step.get("day_of_month"),
+        }
+    )
+
+
+def step_email(
+    session: Session,
+    account_id: int,
+    from_address: str,
+    to_address: str,
+    steps: list[dict],
+    index: int,
+    scheduled_for: datetime,
+    attachments: Iterable[Attachment] = (),
+) -> QueuedEmail:
+    """Build (but do not add) the queued email for step ``index`` (1-based)."""
+
+    step = steps[index - 1]
+    return QueuedEmail(
+        campaign_id=None,
+        account_id=account_id,
+        from_address=from_address,
+        to_address=to_address,
+        subject=step["subject"],
+        body=intern_body(session, step["body"]),
+        scheduled_for=scheduled_for,
+        status="queued",
+        source="manual",
+        metadata_json=step_metadata(index, step),
+        attachments=list(attachments),
+    )
+
+
+def create_sequence(session: Session, account: Account, steps: list[dict]) -> Sequence:
+    sequence = Sequence(account_id=account.id, from_address=account.email_address, steps=steps)
+    session.add(sequence)
+    return sequence
+
+
+def enroll(
+    session: Session,
+    account: Account,
+    steps: list[dict],
+    to_addresses: list[str],
+    start_at: datetime,
+    attachments: Iterable[Attachment] = (),
+    sequence: Sequence | None = None,
+) -> Sequence:
+    """Enqueue the first step of ``steps`` for every recipient.
+
+    The steps are stored as a new sequence unless an existing ``sequence``
+    (e.g. one created by an earlier chunk of the same job) is passed in.
+    """
+
+    attachments = list(attachments)
+    if sequence is None:
+        sequence = create_sequence(session, account, steps)
+    first_time = calculate_step_time(start_at, steps[0])
+    for address in to_addresses:
+        enrollment = SequenceEnrollment(sequence=sequence, to_address=address, current_step=1)
+        email = step_email(
+            session, account.id, account.email_address, address, steps, 1, first_time, attachments
+        )
+        email.enrollment = enrollment
+        session.add_all([enrollment, email])
+    return sequence
+
+
+def _email_step(email: QueuedEmail) -> int | None:
+    try:
+        return json.loads(email.metadata_json or "{}").get("sequence_step")
+    except json.JSONDecodeError:
+        return None
+
+
+def advance_enrollment(session: Session, email: QueuedEmail) -> QueuedEmail | None:
+    """Enqueue the step after ``email``'s, or complete the enrollment."""
+
+    enrollment = email.enrollment
+    if enrollment is None or enrollment.status == "cancelled":
+        return None
+    if _email_step(email) != enrollment.current_step:
+        # A stale step (e.g. retried by hand after the sequence moved on).
+        return None
+
+    sequence = enrollment.sequence
+    next_index = enrollment.current_step + 1
+    if next_index > len(sequence.steps):
+        enrollment.status = "completed"
+        return None
+    if suppression.is_suppressed(enrollment.to_address):
+        enrollment.status = "cancelled"
+        return None
+
+    next_email = step_email(
+        session,
+        sequence.account_id,
+        sequence.from_address,
+        enrollment.to_address,
+        sequence.steps,
+        next_index,
+        calculate_step_time(email.scheduled_for, sequence.steps[next_index - 1]),
+        email.attachments,
+    )
+    next_email.enrollment = enrollment
+    enrollment.current_step = next_index
+    enrollment.status = "active"
+    session.add(next_email)
+    return next_email
+
+
+def record_step_outcome(session: Session, email: QueuedEmail) -> None:
+    """Move ``email``'s enrollment along once the step reached a final state."""
+
+    if email.enrollment_id is None:
+        return
+    if email.status == "sent":
+        advance_enrollment(session, email)
+    elif email.status == "failed" and email.enrollment.status == "active":
+        email.enrollment.status = "failed"
+
+
+def cancel_enrollment(session: Session, enrollment: SequenceEnrollment) -> None:
+    """Stop an enrollment; its single pending step, if any, is cancelled too."""
+
+    enrollment.status = "cancelled"
+    pending = (
+        session.query(QueuedEmail)
+        .filter(QueuedEmail.enrollment_id == enrollment.id, QueuedEmail.status == "queued")
+        .all()
+    )
+    for email in pending:
+        email.status = "cancelled"
+        record_outcome(session, email)
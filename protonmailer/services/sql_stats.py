@@ -0,0 +1,121 @@
+"""Per-request and per-tick SQL statement accounting.
+
+Engine events time every statement and add it to the ``QueryStats`` of the
+enclosing ``track`` scope (an HTTP request or a scheduler tick), carried in a
+context variable. Statements outside any scope are not counted. When a scope
+ends its totals feed the metrics, and a warning is logged if it ran too many
+statements, spent too long in the database, or repeated one statement often
+enough to look like an N+1 pattern.
+"""
+
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from protonmailer.config import get_settings
+from protonmailer.services import metrics
+
+logger = logging.getLogger(__name__)
+
+# ``IN (?, ?, ?)`` differs with the number of values; count those as one statement.
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:\?|%s|:\w+)\s*,)+\s*(?:\?|%s|:\w+)\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryStats:
+    __slots__ = ("scope", "count", "seconds", "statements")
+
+    def __init__(self, scope: str) -> None:
+        # May be refined before the scope ends, e.g. to the matched route.
+        self.scope = scope
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter[str] = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.statements[normalize(statement)] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statements run at least ``threshold`` times, most frequent first."""
+
+        return [(sql, count) for sql, count in self.statements.most_common() if count >= threshold]
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("sql_stats", default=None)
+
+
+def normalize(statement: str) -> str:
+    return _PLACEHOLDER_LIST.sub("(?...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def current() -> QueryStats | None:
+    return _current.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is not None:
+        conn.info.setdefault("sql_stats_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    started = conn.info.get("sql_stats_started")
+    if stats is None or not started:
+        return
+    stats.record(statement, time.perf_counter() - started.pop())
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context) -> None:
+    # A failed statement never reaches after_cursor_execute; drop its start time.
+    started = context.connection.info.get("sql_stats_started") if context.connection else None
+    if started:
+        started.pop()
+
+
+def _report(stats: QueryStats) -> None:
+    settings = get_settings()
+    scope = stats.scope
+    metrics.sql_statements.observe(stats.count, scope=scope)
+    metrics.sql_seconds.observe(stats.seconds, scope=scope)
+    repeated = stats.repeated(settings.SQL_REPEAT_THRESHOLD)
+    if repeated:
+        metrics.sql_repeated_statements.inc(len(repeated), scope=scope)
+
+    if (
+        stats.count > settings.SQL_WARN_QUERIES
+        or stats.seconds > settings.SQL_WARN_SECONDS
+        or repeated
+    ):
+        top = "; ".join(f"{count}x {sql[:200]}" for sql, count in repeated[:3]) or "none"
+        logger.warning(
+            "%s ran %s SQL statements in %.3fs; repeated statements: %s",
+            scope,
+            stats.count,
+            stats.seconds,
+            top,
+        )
+
+
+@contextmanager
+def track(scope: str) -> Iterator[QueryStats]:
+    """Count the SQL run inside the block (or decorated call) under ``scope``."""
+
+    stats = QueryStats(scope)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+        _report(stats)
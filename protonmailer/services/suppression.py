@@ -0,0 +1,186 @@
+"""Suppression list: addresses no mail is enqueued for.
+
+Membership checks read an in-memory set of normalized addresses. The set is
+loaded from the ``suppressions`` table on first use and re-read at least every
+``SUPPRESSION_CACHE_SECONDS``; changes made through this module update it
+straight away, and hard bounces once the send worker has committed them.
+Filtering a 200k-contact audience is one set lookup per address rather than
+a query.
+
+Campaign audiences, compose submissions (inline and background jobs) and each
+new sequence step are filtered on the way into the queue. The send worker
+checks again, so mail queued before its address was suppressed is cancelled
+instead of sent.
+"""
+
+import csv
+import io
+import logging
+import re
+import threading
+import time
+from typing import Iterable
+
+from email_validator import EmailNotValidError, validate_email
+from sqlalchemy import exists, insert
+from sqlalchemy.orm import Session
+
+from protonmailer import database
+from protonmailer.config import get_settings
+from protonmailer.models.queued_email import QueuedEmail
+from protonmailer.models.suppression import Suppression
+from protonmailer.services.email_service import PERMANENT
+
+logger = logging.getLogger(__name__)
+
+REASONS = ("unsubscribe", "bounce", "complaint", "manual")
+# RFC 3463 statuses for a bad address or disabled mailbox. Policy and content
+# rejections (5.7.x) say nothing about the address, so they do not count.
+_HARD_BOUNCE_STATUS = re.compile(r"\b5\.(?:1\.\d{1,3}|2\.1)\b")
+_LOOKUP_CHUNK = 500
+
+_addresses: set[str] | None = None
+_loaded_at = 0.0
+_lock = threading.Lock()
+
+
+def normalize(address: str) -> str:
+    return address.strip().lower()
+
+
+def _load() -> set[str]:
+    session = database.SessionLocal()
+    try:
+        return {email for (email,) in session.query(Suppression.email)}
+    finally:
+        session.close()
+
+
+def suppressed_addresses() -> set[str]:
+    """The normalized suppressed addresses; treat the returned set as read-only."""
+
+    global _addresses, _loaded_at
+    ttl = get_settings().SUPPRESSION_CACHE_SECONDS
+    with _lock:
+        if _addresses is None or time.monotonic() - _loaded_at >= ttl:
+            _addresses = _load()
+            _loaded_at = time.monotonic()
+        return _addresses
+
+
+def is_suppressed(address: str) -> bool:
+    return normalize(address) in suppressed_addresses()
+
+
+def filter_addresses(addresses: Iterable[str]) -> tuple[list[str], list[str]]:
+    """Split ``addresses`` into (allowed, suppressed), keeping their order."""
+
+    suppressed = suppressed_addresses()
+    allowed: list[str] = []
+    dropped: list[str] = []
+    for address in addresses:
+        (dropped if normalize(address) in suppressed else allowed).append(address)
+    return allowed, dropped
+
+
+def remember(addresses: Iterable[str]) -> None:
+    """Add committed suppressions to the loaded set without waiting for a reload."""
+
+    with _lock:
+        if _addresses is not None:
+            _addresses.update(addresses)
+
+
+def _add(session: Session, entries: dict[str, tuple[str, str | None]]) -> int:
+    """Insert the (reason, note) entries keyed by normalized address that are not listed yet."""
+
+    addresses = list(entries)
+    new = []
+    for offset in range(0, len(addresses), _LOOKUP_CHUNK):
+        chunk = addresses[offset : offset + _LOOKUP_CHUNK]
+        existing = {
+            email for (email,) in session.query(Suppression.email).filter(Suppression.email.in_(chunk))
+        }
+        new.extend(address for address in chunk if address not in existing)
+    if new:
+        session.execute(
+            insert(Suppression),
+            [
+                {"email": address, "reason": entries[address][0], "note": entries[address][1]}
+                for address in new
+            ],
+        )
+    session.commit()
+    remember(new)
+    return len(new)
+
+
+def suppress(
+    session: Session, addresses: Iterable[str], reason: str = "manual", note: str | None = None
+) -> int:
+    """Suppress ``addresses`` and commit; returns how many were not listed before."""
+
+    entries = {normalize(address): (reason, note) for address in addresses if address.strip()}
+    return _add(session, entries)
+
+
+def unsuppress(session: Session, suppression: Suppression) -> None:
+    address = suppression.email
+    session.delete(suppression)
+    session.commit()
+    with _lock:
+        if _addresses is not None:
+            _addresses.discard(address)
+
+
+def import_csv(session: Session, content: bytes) -> dict[str, int]:
+    """Suppress the rows of a CSV with an ``email`` column and optional ``reason`` and ``note``."""
+
+    entries: dict[str, tuple[str, str | None]] = {}
+    failed = 0
+    for row in csv.DictReader(io.StringIO(content.decode("utf-8-sig"))):
+        email = (row.get("email") or "").strip()
+        reason = (row.get("reason") or "").strip().lower() or "manual"
+        note = (row.get("note") or "").strip() or None
+        if not email or reason not in REASONS:
+            failed += 1
+            continue
+        try:
+            email = validate_email(email, check_deliverability=False).email
+        except EmailNotValidError:
+            failed += 1
+            continue
+        entries.setdefault(normalize(email), (reason, note))
+
+    created = _add(session, entries)
+    return {"created": created, "existing": len(entries) - created, "failed": failed}
+
+
+def suppress_hard_bounce(session: Session, email: QueuedEmail, error: str | None) -> str | None:
+    """Suppress the recipient of a single-recipient email its server permanently refused.
+
+    Only adds the row to ``session``; the caller commits it along with the
+    send outcome and then passes the returned address to ``remember``.
+    """
+
+    if not get_settings().SUPPRESS_HARD_BOUNCES or email.status != "failed" or "," in email.to_address:
+        return None
+    if getattr(error, "category", None) != PERMANENT or not _HARD_BOUNCE_STATUS.search(error or ""):
+        return None
+    address = normalize(email.to_address)
+    if address in suppressed_addresses():
+        return None
+    # The set can lag other processes by up to the cache TTL; a duplicate row
+    # would fail the caller's commit, so confirm with one indexed lookup.
+    if session.query(exists().where(Suppression.email == address)).scalar():
+        return None
+    session.add(Suppression(email=address, reason="bounce", note=str(error)[:500]))
+    session.flush()
+    logger.info("Suppressed %s after a hard bounce", email.to_address)
+    return address
+
+
+def reset() -> None:
+    global _addresses
+    with _lock:
+        _addresses = None
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 import jinja2
 
 from protonmailer.models.template import Template
@@ -6,14 +8,21 @@ from protonmailer.models.template import Template
 template_env = jinja2.Environment(autoescape=True)
 
 
+@lru_cache(maxsize=512)
+def compile_template(source: str) -> jinja2.Template:
+    """Compile template source once; repeated renders reuse the compiled code."""
+
+    return template_env.from_string(source)
+
+
 def render_template(template: Template, context: dict) -> tuple[str, str]:
     """
     Render the given template's subject and body_html with the provided context.
     Missing variables are rendered as empty strings via Jinja2's default undefined behavior.
     """
 
-    subject_template = template_env.from_string(template.subject or "")
-    body_template = template_env.from_string(template.body_html or "")
+    subject_template = compile_template(template.subject or "")
+    body_template = compile_template(template.body_html or "")
 
     subject_rendered = subject_template.render(**context)
     body_rendered = body_template.render(**context)
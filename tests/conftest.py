@@ -1,5 +1,6 @@
 import os
-from typing import Generator
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Generator
 
 import pytest
 from fastapi.testclient import TestClient
@@ -12,6 +13,11 @@ os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
 from protonmailer import database, main, scheduler  # noqa: E402
 from protonmailer.database import Base
 from protonmailer.dependencies import get_db
+from protonmailer.models import Account, QueuedEmail
+from protonmailer.services.circuit_breaker import circuit_breakers
+from protonmailer.services import health, profiler, retention, suppression
+from protonmailer.services.metrics import reset_metrics
+from protonmailer.services.rate_limiter import rate_limiter
 
 
 test_engine = create_engine(
@@ -41,6 +47,13 @@ main.app.dependency_overrides[get_db] = override_get_db
 def clean_db() -> Generator:
     Base.metadata.drop_all(bind=test_engine)
     Base.metadata.create_all(bind=test_engine)
+    rate_limiter.reset()
+    circuit_breakers.reset()
+    reset_metrics()
+    profiler.reset()
+    health.reset()
+    retention.reset()
+    suppression.reset()
     yield
 
 
@@ -56,3 +69,70 @@ def session() -> Generator:
 @pytest.fixture
 def client() -> TestClient:
     return TestClient(main.app)
+
+
+@pytest.fixture
+def make_account() -> Callable[..., Account]:
+    """Build an unsaved sending account; keyword arguments override the defaults."""
+
+    def build(**overrides) -> Account:
+        values = {
+            "display_name": "Sender",
+            "email_address": "sender@example.com",
+            "smtp_host": "smtp.example.com",
+            "smtp_port": 465,
+            "smtp_username": "user",
+            "smtp_password_encrypted": "pass",
+            "use_ssl": True,
+            "use_tls": False,
+        }
+        values.update(overrides)
+        return Account(**values)
+
+    return build
+
+
+@pytest.fixture
+def local_account(make_account) -> Callable[[int], Account]:
+    """Build an account that talks plain SMTP to a sink on localhost ``port``."""
+
+    def build(port: int = 465) -> Account:
+        return make_account(smtp_host="127.0.0.1", smtp_port=port, use_ssl=False)
+
+    return build
+
+
+@pytest.fixture
+def account(session, make_account) -> Account:
+    account = make_account()
+    session.add(account)
+    session.commit()
+    return account
+
+
+@pytest.fixture
+def queue_email(session, account) -> Callable[..., QueuedEmail]:
+    """Add and commit a queued email, due a minute ago unless overridden.
+
+    It is sent from the ``account`` fixture unless another account is passed.
+    """
+
+    default_account = account
+
+    def add(account: Account = default_account, **overrides) -> QueuedEmail:
+        values = {
+            "account_id": account.id,
+            "from_address": account.email_address,
+            "to_address": "to@example.com",
+            "subject": "Hello",
+            "body_html": "<p>Hi</p>",
+            "scheduled_for": datetime.now(timezone.utc) - timedelta(minutes=1),
+            "status": "queued",
+        }
+        values.update(overrides)
+        email = QueuedEmail(**values)
+        session.add(email)
+        session.commit()
+        return email
+
+    return add
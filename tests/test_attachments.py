@@ -0,0 +1,78 @@
+import base64
+from email.parser import BytesParser
+from email.policy import default
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from protonmailer.config import get_settings
+from protonmailer.models import Attachment
+from protonmailer.services import attachment_store
+from protonmailer.services.email_service import build_message_bytes, send_email
+
+
+@pytest.fixture(autouse=True)
+def attachment_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "ATTACHMENT_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_store_attachment_is_content_addressed(session, attachment_dir):
+    first = attachment_store.store_attachment(session, b"%PDF-1.4 report", "report.pdf", "application/pdf")
+    second = attachment_store.store_attachment(session, b"%PDF-1.4 report", "copy.pdf", "application/pdf")
+    session.commit()
+
+    assert first.id == second.id
+    assert session.query(Attachment).count() == 1
+    stored = [path for path in attachment_dir.rglob("*") if path.is_file()]
+    assert stored == [attachment_store.blob_path(first.sha256)]
+
+
+def test_encoded_rendition_is_built_once(session):
+    data = bytes(range(256)) * 40
+    attachment = attachment_store.store_attachment(session, data, "blob.bin")
+
+    path = attachment_store.ensure_encoded(attachment)
+    lines = path.read_bytes().split(b"\r\n")
+    assert all(len(line) <= 76 for line in lines)
+    assert base64.b64decode(b"".join(lines)) == data
+
+    with patch.object(attachment_store, "_encode_lines") as encode:
+        attachment_store.ensure_encoded(attachment)
+    encode.assert_not_called()
+
+
+@patch("protonmailer.services.email_service.smtplib.SMTP_SSL")
+def test_send_email_streams_attachments_into_data(
+    mock_smtp_ssl: MagicMock, session, make_account
+) -> None:
+    data = b"line one\n.hidden line\n" * 500
+    attachment = attachment_store.store_attachment(session, data, "notes.txt", "text/plain")
+    account = make_account()
+    head = build_message_bytes(
+        account.email_address, ["to@example.com"], "Report", "<p>See attached</p>", has_attachments=True
+    )
+
+    smtp_context = MagicMock()
+    smtp_context.mail.return_value = (250, b"ok")
+    smtp_context.rcpt.return_value = (250, b"ok")
+    smtp_context.docmd.return_value = (354, b"go ahead")
+    smtp_context.getreply.return_value = (250, b"queued")
+    written: list[bytes] = []
+    smtp_context.send.side_effect = lambda chunk: written.append(bytes(chunk))
+    mock_smtp_ssl.return_value.__enter__.return_value = smtp_context
+
+    success, error = send_email(
+        account, ["to@example.com"], "Report", "", raw_message=head, attachments=[attachment]
+    )
+
+    assert (success, error) == (True, None)
+    smtp_context.sendmail.assert_not_called()
+    stream = b"".join(written)
+    assert stream.endswith(b"\r\n.\r\n")
+    message = BytesParser(policy=default).parsebytes(stream[: -len(b".\r\n")])
+    assert message.get_content_type() == "multipart/mixed"
+    [part] = list(message.iter_attachments())
+    assert part.get_filename() == "notes.txt"
+    assert part.get_payload(decode=True) == data
+    assert message.get_body(("html",)).get_content().strip() == "<p>See attached</p>"
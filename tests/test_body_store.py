@@ -0,0 +1,48 @@
+from protonmailer.models import EmailBody, QueuedEmail
+from protonmailer.services.body_store import intern_body, migrate_inline_bodies
+
+
+def test_intern_body_deduplicates_and_compresses(session):
+    html = "<p>" + "Quarterly newsletter " * 200 + "</p>"
+    first = intern_body(session, html, "plain")
+    second = intern_body(session, html, "plain")
+    other = intern_body(session, html)
+    session.commit()
+
+    assert first is second
+    assert other.id != first.id
+    assert session.query(EmailBody).count() == 2
+    assert first.stored_size < first.raw_size / 5
+    assert first.html == html
+    assert first.text == "plain"
+    assert other.text is None
+
+
+def test_queued_email_reads_body_from_store(session, queue_email):
+    body = intern_body(session, "<p>Shared</p>", "Shared")
+    for index in range(3):
+        queue_email(body=body, to_address=f"r{index}@example.com")
+    session.commit()
+    session.expire_all()
+
+    emails = session.query(QueuedEmail).all()
+    assert {email.body_id for email in emails} == {body.id}
+    assert all(email.body_html == "<p>Shared</p>" for email in emails)
+    assert all(email.body_text == "Shared" for email in emails)
+
+
+def test_migrate_inline_bodies_moves_existing_rows(session, queue_email):
+    for index in range(5):
+        queue_email(body_html="<p>Legacy</p>", body_text=None, to_address=f"r{index}@example.com")
+    session.commit()
+
+    stats = migrate_inline_bodies(session, batch_size=2)
+
+    assert stats["rows"] == 5
+    assert session.query(EmailBody).count() == 1
+    session.expire_all()
+    for email in session.query(QueuedEmail).all():
+        assert email.body_id is not None
+        assert email._body_html == ""
+        assert email.body_html == "<p>Legacy</p>"
+    assert migrate_inline_bodies(session)["rows"] == 0
@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from protonmailer import scheduler
+from protonmailer.config import get_settings
+from protonmailer.models import Account, Campaign, CampaignRun, Contact, QueuedEmail, Template
+
+
+def _seed_campaign(session, account: Account, contact_count: int = 5) -> Campaign:
+    template = Template(name="Promo", subject="Hi {{ first_name }}", body_html="<p>{{ email }}</p>")
+    campaign = Campaign(
+        name="One Time",
+        account=account,
+        template=template,
+        schedule_type="one_time",
+        schedule_config={"run_at": (datetime.now(timezone.utc) - timedelta(minutes=1)).isoformat()},
+        active=True,
+    )
+    contacts = [Contact(email=f"user{index}@example.com", name=f"User {index}") for index in range(contact_count)]
+    session.add_all([template, campaign] + contacts)
+    session.commit()
+    return campaign
+
+
+def test_run_is_recorded_with_counts(session, account, monkeypatch):
+    monkeypatch.setattr(get_settings(), "RENDER_CHUNK_SIZE", 2)
+    campaign = _seed_campaign(session, account)
+
+    scheduler.run_campaigns()
+
+    run = session.query(CampaignRun).one()
+    assert run.campaign_id == campaign.id
+    assert run.status == "completed"
+    assert run.total_contacts == 5
+    assert run.enqueued_count == 5
+    assert run.cursor == max(contact.id for contact in session.query(Contact))
+    assert run.finished_at is not None
+    assert {email.run_id for email in session.query(QueuedEmail)} == {run.id}
+
+
+def test_interrupted_run_resumes_from_checkpoint(session, account, monkeypatch):
+    monkeypatch.setattr(get_settings(), "RENDER_CHUNK_SIZE", 2)
+    _seed_campaign(session, account)
+    real_intern_body = scheduler.intern_body
+    calls = []
+
+    def crash_on_third(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 3:
+            raise RuntimeError("worker killed")
+        return real_intern_body(*args, **kwargs)
+
+    monkeypatch.setattr(scheduler, "intern_body", crash_on_third)
+    scheduler.run_campaigns()
+
+    session.expire_all()
+    run = session.query(CampaignRun).one()
+    assert run.status == "running"
+    assert session.query(QueuedEmail).count() == 2
+
+    monkeypatch.setattr(scheduler, "intern_body", real_intern_body)
+    scheduler.run_campaigns()
+
+    session.expire_all()
+    run = session.query(CampaignRun).one()
+    assert run.status == "completed"
+    assert run.enqueued_count == 5
+    addresses = [email.to_address for email in session.query(QueuedEmail).order_by(QueuedEmail.id)]
+    assert addresses == [f"user{index}@example.com" for index in range(5)]
+
+
+def test_resumed_run_skips_contacts_already_enqueued(session, account, monkeypatch):
+    campaign = _seed_campaign(session, account, contact_count=3)
+    first = session.query(Contact).order_by(Contact.id).first()
+    run = CampaignRun(campaign_id=campaign.id, status="running", started_at=datetime.now(timezone.utc))
+    session.add(run)
+    session.flush()
+    session.add(
+        QueuedEmail(
+            campaign_id=campaign.id,
+            run_id=run.id,
+            contact_id=first.id,
+            account_id=campaign.account_id,
+            from_address="sender@example.com",
+            to_address=first.email,
+            subject="Hi",
+            body_html="<p>Hi</p>",
+            scheduled_for=datetime.now(timezone.utc),
+            status="queued",
+            source="campaign",
+        )
+    )
+    session.commit()
+
+    scheduler.run_campaigns()
+
+    session.expire_all()
+    run = session.query(CampaignRun).one()
+    assert run.status == "completed"
+    assert run.enqueued_count == 2
+    assert run.skipped_count == 1
+    assert session.query(QueuedEmail).count() == 3
+
+
+def test_unique_index_rejects_duplicate_recipient_in_run(session, account):
+    campaign = _seed_campaign(session, account, contact_count=1)
+    contact = session.query(Contact).one()
+    run = CampaignRun(campaign_id=campaign.id, status="running", started_at=datetime.now(timezone.utc))
+    session.add(run)
+    session.flush()
+    for _ in range(2):
+        session.add(
+            QueuedEmail(
+                campaign_id=campaign.id,
+                run_id=run.id,
+                contact_id=contact.id,
+                account_id=campaign.account_id,
+                from_address="sender@example.com",
+                to_address=contact.email,
+                subject="Hi",
+                body_html="<p>Hi</p>",
+                scheduled_for=datetime.now(timezone.utc),
+                status="queued",
+                source="campaign",
+            )
+        )
+
+    with pytest.raises(IntegrityError):
+        session.commit()
@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from protonmailer import scheduler
+from protonmailer.config import get_settings
+from protonmailer.models import QueuedEmail
+from protonmailer.services.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreakerRegistry,
+    circuit_breakers,
+)
+from protonmailer.services.email_service import CONNECTION, SendError
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_breaker_opens_after_threshold_and_probes_when_half_open(make_account):
+    clock = FakeClock()
+    registry = CircuitBreakerRegistry(clock=clock)
+    account = make_account()
+    settings = get_settings()
+
+    for _ in range(settings.CIRCUIT_FAILURE_THRESHOLD):
+        assert registry.allow(account)
+        registry.record_failure(account, "Connection refused")
+    assert registry.state(account) == OPEN
+    assert not registry.allow(account)
+    assert registry.retry_in(account) == settings.CIRCUIT_RESET_SECONDS
+
+    clock.now += settings.CIRCUIT_RESET_SECONDS
+    assert registry.allow(account)
+    assert registry.state(account) == HALF_OPEN
+    assert not registry.allow(account)
+
+    registry.record_success(account)
+    assert registry.state(account) == CLOSED
+    assert registry.allow(account)
+
+
+def test_failed_probe_reopens_breaker(make_account):
+    clock = FakeClock()
+    registry = CircuitBreakerRegistry(clock=clock)
+    account = make_account()
+    settings = get_settings()
+
+    for _ in range(settings.CIRCUIT_FAILURE_THRESHOLD):
+        registry.record_failure(account)
+    clock.now += settings.CIRCUIT_RESET_SECONDS
+    assert registry.allow(account)
+    registry.record_failure(account)
+
+    assert registry.state(account) == OPEN
+    assert not registry.allow(account)
+
+
+@patch("protonmailer.scheduler.send_email")
+def test_open_breaker_skips_down_endpoint_but_not_others(
+    mock_send_email, session, make_account, queue_email
+):
+    down = make_account(smtp_host="down.example.com")
+    up = make_account(smtp_host="up.example.com", email_address="up@example.com")
+    session.add_all([down, up])
+    session.commit()
+
+    for index in range(5):
+        queue_email(down, to_address=f"down{index}@example.com")
+    queue_email(up, to_address="up@example.com")
+
+    attempted_hosts = []
+
+    def fake_send(account, **kwargs):
+        attempted_hosts.append(account.smtp_host)
+        if account.smtp_host == "down.example.com":
+            return False, SendError("Connection refused", CONNECTION)
+        return True, None
+
+    mock_send_email.side_effect = fake_send
+
+    scheduler.process_queued_emails()
+
+    threshold = get_settings().CIRCUIT_FAILURE_THRESHOLD
+    assert attempted_hosts.count("down.example.com") == threshold
+    assert circuit_breakers.state(down) == OPEN
+    sent = session.query(QueuedEmail).filter(QueuedEmail.account_id == up.id).one()
+    assert sent.status == "sent"
+
+
+def test_circuit_breaker_status_endpoint(client, make_account):
+    account = make_account(id=1)
+    circuit_breakers.record_failure(account, "Connection refused")
+
+    response = client.get("/status/circuit-breakers")
+
+    assert response.status_code == 200
+    [breaker] = response.json()
+    assert breaker["smtp_host"] == "smtp.example.com"
+    assert breaker["state"] == CLOSED
+    assert breaker["consecutive_failures"] == 1
+    assert breaker["last_error"] == "Connection refused"
+
+
+@patch("protonmailer.scheduler.send_email")
+def test_open_breaker_does_not_starve_other_accounts(
+    mock_send_email, session, make_account, queue_email, monkeypatch
+):
+    monkeypatch.setattr(get_settings(), "SEND_BATCH_SIZE", 3)
+    monkeypatch.setattr(get_settings(), "CIRCUIT_FAILURE_THRESHOLD", 1)
+    mock_send_email.return_value = (True, None)
+    down = make_account(smtp_host="down.example.com")
+    up = make_account(smtp_host="up.example.com", email_address="up@example.com")
+    session.add_all([down, up])
+    session.commit()
+    now = datetime.now(timezone.utc)
+    held = [
+        queue_email(down, to_address=f"down{index}@example.com", scheduled_for=now - timedelta(hours=1))
+        for index in range(3)
+    ]
+    waiting = queue_email(up, to_address="up@example.com")
+    circuit_breakers.record_failure(down, "Connection refused")
+
+    scheduler.process_queued_emails()
+    scheduler.process_queued_emails()
+
+    session.expire_all()
+    assert session.get(QueuedEmail, waiting.id).status == "sent"
+    mock_send_email.assert_called_once()
+    for email in held:
+        email = session.get(QueuedEmail, email.id)
+        assert email.status == "queued"
+        assert email.attempts == 0
+        assert email.next_attempt_at is not None
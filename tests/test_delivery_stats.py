@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+
+from protonmailer import scheduler
+from protonmailer.config import get_settings
+from protonmailer.models import Campaign, DeliveryStat, QueuedEmail, Template
+from protonmailer.routers.campaigns import get_campaign_stats
+from protonmailer.services import delivery_stats, retention
+
+
+@pytest.fixture
+def campaign(session, account) -> Campaign:
+    template = Template(name="Welcome", subject="Welcome", body_html="<p>Welcome</p>")
+    campaign = Campaign(
+        name="Onboarding",
+        account=account,
+        template=template,
+        schedule_type="one_time",
+        schedule_config={"freq": "once"},
+        active=True,
+    )
+    session.add_all([template, campaign])
+    session.commit()
+    return campaign
+
+
+@pytest.fixture
+def add_email(campaign, queue_email):
+    def add(to_address: str, due_ago: timedelta) -> QueuedEmail:
+        due_at = datetime.now(timezone.utc) - due_ago
+        return queue_email(
+            campaign_id=campaign.id,
+            to_address=to_address,
+            scheduled_for=due_at,
+            source="campaign",
+            created_at=due_at,
+        )
+
+    return add
+
+
+@patch("protonmailer.scheduler.send_email")
+def test_send_worker_rolls_up_outcomes(mock_send_email, session, campaign, add_email, monkeypatch):
+    monkeypatch.setattr(get_settings(), "MAX_SEND_ATTEMPTS", 1)
+    mock_send_email.side_effect = lambda **kwargs: (
+        (False, "550 no such user") if kwargs["to_addresses"] == ["bad@example.com"] else (True, None)
+    )
+    add_email("a@example.com", timedelta(minutes=2))
+    add_email("b@example.com", timedelta(minutes=2))
+    add_email("bad@example.com", timedelta(minutes=2))
+
+    scheduler.process_queued_emails()
+
+    stat = session.query(DeliveryStat).one()
+    assert (stat.campaign_id, stat.account_id) == (campaign.id, campaign.account_id)
+    assert stat.day == datetime.now(timezone.utc).date()
+    assert (stat.sent_count, stat.failed_count, stat.cancelled_count) == (2, 1, 0)
+    assert 110 <= stat.avg_latency_seconds <= 180
+
+
+def test_retried_failure_is_taken_back_out(session, add_email):
+    email = add_email("a@example.com", timedelta(0))
+    email.status = "failed"
+    delivery_stats.record_outcome(session, email)
+    session.commit()
+
+    delivery_stats.retract_outcome(session, email)
+    email.status = "queued"
+    session.commit()
+
+    assert session.query(DeliveryStat.failed_count).scalar() == 0
+
+
+def test_stats_survive_the_retention_purge(session, campaign, add_email):
+    email = add_email("a@example.com", timedelta(0))
+    email.status = "sent"
+    email.sent_at = datetime.now(timezone.utc)
+    delivery_stats.record_outcome(session, email)
+    email.updated_at = datetime.now(timezone.utc) - timedelta(days=40)
+    session.commit()
+
+    retention.purge_expired()
+
+    assert session.query(QueuedEmail).count() == 0
+    stats = get_campaign_stats(campaign.id, days=30, db=session)
+    assert stats["sent_count"] == 1
+    assert [row.sent_count for row in stats["days"]] == [1]
+    assert delivery_stats.total_sent(session) == 1
+
+
+def test_stats_are_limited_to_the_requested_days(session, campaign):
+    session.add_all(
+        [
+            DeliveryStat(
+                campaign_id=campaign.id,
+                account_id=campaign.account_id,
+                day=datetime.now(timezone.utc).date() - timedelta(days=age),
+                sent_count=10,
+                latency_seconds_total=50.0,
+            )
+            for age in (0, 6, 7)
+        ]
+    )
+    session.commit()
+
+    stats = delivery_stats.campaign_stats(session, campaign.id, days=7)
+
+    assert stats["sent_count"] == 20
+    assert stats["avg_latency_seconds"] == 5.0
+    assert len(stats["days"]) == 2
@@ -0,0 +1,48 @@
+from unittest.mock import patch
+
+from benchmarks.smtp_sink import SMTPSink
+from protonmailer import scheduler
+from protonmailer.services.email_service import send_email
+
+
+def test_send_email_reports_smtp_stage_timings(local_account):
+    timings: dict[str, float] = {}
+    with SMTPSink() as sink:
+        success, _ = send_email(local_account(sink.port), "to@example.com", "Hi", "<p>Hi</p>", timings=timings)
+
+    assert success
+    assert set(timings) == {"connect", "auth", "data"}
+    assert all(value >= 0 for value in timings.values())
+
+
+def test_sent_email_records_full_timeline(session, local_account, queue_email):
+    with SMTPSink() as sink:
+        account = local_account(sink.port)
+        session.add(account)
+        session.commit()
+        email = queue_email(account)
+        scheduler.process_queued_emails()
+
+    session.refresh(email)
+    assert email.status == "sent"
+    timeline = email.timeline
+    assert timeline["attempt"] == 1
+    assert list(timeline)[1:] == ["queued", "claim", "serialize", "connect", "auth", "data"]
+    # Scheduled in the past but only just enqueued: queue time counts from enqueue.
+    assert 0 <= timeline["queued"] < 30_000
+
+
+@patch("protonmailer.scheduler.send_email")
+def test_retry_keeps_latest_attempt_without_prepare_stages(mock_send_email, session, queue_email):
+    mock_send_email.return_value = (False, "some error")
+    email = queue_email()
+    email.mime_payload = b"Subject: Hello\r\n\r\nHi\r\n"
+    email.attempts = 2
+    session.commit()
+
+    scheduler.process_queued_emails()
+
+    session.refresh(email)
+    assert email.timeline["attempt"] == 3
+    assert "serialize" not in email.timeline
+    assert mock_send_email.call_args.kwargs["timings"] is not None
@@ -1,7 +1,17 @@
+import smtplib
+from email.parser import BytesParser
+from email.policy import default
 from unittest.mock import MagicMock, patch
 
 from protonmailer.models.account import Account
-from protonmailer.services.email_service import send_email
+from protonmailer.services.email_service import (
+    CONNECTION,
+    PERMANENT,
+    build_message_bytes,
+    classify_exception,
+    is_transient_error,
+    send_email,
+)
 
 
 def make_account(**overrides: object) -> Account:
@@ -88,3 +98,65 @@ def test_send_email_failure_raises_error(mock_smtp_ssl: MagicMock) -> None:
     assert success is False
     assert error is not None
     assert "boom" in error
+
+
+@patch("protonmailer.services.email_service.smtplib.SMTP_SSL")
+def test_send_email_classifies_temporary_reply_as_transient(mock_smtp_ssl: MagicMock) -> None:
+    account = make_account()
+    smtp_context = MagicMock()
+    smtp_context.sendmail.side_effect = smtplib.SMTPDataError(451, b"try again later")
+    mock_smtp_ssl.return_value.__enter__.return_value = smtp_context
+
+    success, error = send_email(account, ["to@example.com"], "Hi", "<p>Hi</p>")
+
+    assert success is False
+    assert is_transient_error(error)
+    assert error.code == 451
+
+
+def test_classify_exception_categories() -> None:
+    assert classify_exception(ConnectionRefusedError("refused")).category == CONNECTION
+    assert classify_exception(TimeoutError("timed out")).category == CONNECTION
+    assert classify_exception(smtplib.SMTPServerDisconnected("gone")).category == CONNECTION
+    assert classify_exception(smtplib.SMTPDataError(554, b"rejected")).category == PERMANENT
+    refused = smtplib.SMTPRecipientsRefused({"bad@example.com": (550, b"no such user")})
+    assert classify_exception(refused).category == PERMANENT
+    assert classify_exception(RuntimeError("boom")).category == PERMANENT
+
+
+def test_build_message_bytes_produces_wire_format() -> None:
+    payload = build_message_bytes(
+        "from@example.com", ["a@example.com", "b@example.com"], "Hello", "<p>Hi</p>", "Hi"
+    )
+
+    message = BytesParser(policy=default).parsebytes(payload)
+    assert b"\r\n" in payload
+    assert message["To"] == "a@example.com, b@example.com"
+    assert message["Message-ID"].endswith("@example.com>")
+    assert message.get_content_type() == "multipart/alternative"
+    assert message.get_body(("html",)).get_content().strip() == "<p>Hi</p>"
+
+
+@patch("protonmailer.services.email_service.smtplib.SMTP_SSL")
+def test_send_email_streams_prebuilt_payload(mock_smtp_ssl: MagicMock) -> None:
+    account = make_account()
+    smtp_context = MagicMock()
+    mock_smtp_ssl.return_value.__enter__.return_value = smtp_context
+    payload = build_message_bytes(account.email_address, "to@example.com", "Hi", "<p>Hi</p>")
+
+    success, _ = send_email(account, "to@example.com", "Hi", "<p>Hi</p>", raw_message=payload)
+
+    assert success is True
+    args, _ = smtp_context.sendmail.call_args
+    assert args[2] is payload
+
+
+def test_build_message_bytes_keeps_non_ascii_bodies_7bit_clean() -> None:
+    payload = build_message_bytes("from@example.com", ["to@example.com"], "Grüße", "<p>Grüße</p>", "Grüße")
+
+    assert payload.isascii()
+    message = BytesParser(policy=default).parsebytes(payload)
+    for part in (message.get_body(("plain",)), message.get_body(("html",))):
+        assert part["Content-Transfer-Encoding"] in ("quoted-printable", "base64")
+    assert message["Subject"] == "Grüße"
+    assert message.get_body(("html",)).get_content().strip() == "<p>Grüße</p>"
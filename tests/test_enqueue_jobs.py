@@ -0,0 +1,76 @@
+from datetime import datetime
+
+from protonmailer.config import get_settings
+from protonmailer.models import EnqueueJob, QueuedEmail, Sequence, SequenceEnrollment
+from protonmailer.services.compose_service import (
+    create_enqueue_job,
+    resume_enqueue_jobs,
+    run_enqueue_job,
+)
+
+ONE_STEP = [{"subject": "Hello", "body": "<p>Hello</p>", "offset_type": "immediate"}]
+
+
+def test_job_enqueues_in_chunks_and_reports_progress(session, account, monkeypatch):
+    monkeypatch.setattr(get_settings(), "COMPOSE_CHUNK_SIZE", 2)
+    addresses = [f"user{index}@example.com" for index in range(5)]
+    job = create_enqueue_job(session, account, ONE_STEP, addresses, datetime(2024, 1, 1))
+    session.commit()
+    assert job.status == "pending"
+    assert session.query(QueuedEmail).count() == 0
+
+    run_enqueue_job(job.id)
+
+    session.expire_all()
+    job = session.get(EnqueueJob, job.id)
+    assert job.status == "completed"
+    assert job.enqueued_count == 5
+    assert job.finished_at is not None
+    assert [email.to_address for email in session.query(QueuedEmail).order_by(QueuedEmail.id)] == addresses
+
+
+def test_restarted_job_continues_after_committed_chunks(session, account, monkeypatch):
+    monkeypatch.setattr(get_settings(), "COMPOSE_CHUNK_SIZE", 2)
+    steps = ONE_STEP + [{"subject": "Later", "body": "<p>Later</p>", "offset_type": "days", "offset_value": 1}]
+    addresses = [f"user{index}@example.com" for index in range(3)]
+    job = create_enqueue_job(session, account, steps, addresses, datetime(2024, 1, 1))
+    job.status = "running"
+    session.commit()
+
+    resume_enqueue_jobs()
+    resume_enqueue_jobs()
+
+    session.expire_all()
+    assert session.get(EnqueueJob, job.id).enqueued_count == 3
+    assert session.query(SequenceEnrollment).count() == 3
+    assert session.query(QueuedEmail).count() == 3
+
+
+def test_chunked_sequence_job_stores_its_steps_once(session, account, monkeypatch):
+    monkeypatch.setattr(get_settings(), "COMPOSE_CHUNK_SIZE", 2)
+    steps = ONE_STEP + [{"subject": "Later", "body": "<p>Later</p>", "offset_type": "days", "offset_value": 1}]
+    addresses = [f"user{index}@example.com" for index in range(5)]
+    job = create_enqueue_job(session, account, steps, addresses, datetime(2024, 1, 1))
+    session.commit()
+
+    run_enqueue_job(job.id)
+
+    session.expire_all()
+    sequence = session.query(Sequence).one()
+    assert session.get(EnqueueJob, job.id).payload["sequence_id"] == sequence.id
+    assert {enrollment.sequence_id for enrollment in session.query(SequenceEnrollment)} == {sequence.id}
+    assert session.query(SequenceEnrollment).count() == 5
+
+
+def test_job_for_missing_account_fails(session, account):
+    job = create_enqueue_job(session, account, ONE_STEP, ["a@example.com"], datetime(2024, 1, 1))
+    session.commit()
+    session.delete(account)
+    session.commit()
+
+    run_enqueue_job(job.id)
+
+    session.expire_all()
+    job = session.get(EnqueueJob, job.id)
+    assert job.status == "failed"
+    assert job.error == "Account not found"
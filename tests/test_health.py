@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from fastapi import Response
+
+from protonmailer import main, scheduler, schemas
+from protonmailer.config import get_settings
+from protonmailer.services import health
+from protonmailer.services.circuit_breaker import circuit_breakers
+
+
+def test_details_report_backlog_and_stuck_rows(session, queue_email):
+    now = datetime.now(timezone.utc)
+    queue_email(status="queued", scheduled_for=now - timedelta(minutes=10))
+    queue_email(status="queued", scheduled_for=now + timedelta(hours=1))
+    queue_email(status="sending", scheduled_for=now, claimed_at=now - timedelta(hours=1))
+    queue_email(status="sending", scheduled_for=now, claimed_at=now)
+    queue_email(status="sent", scheduled_for=now - timedelta(hours=2))
+
+    details = health.health_details(scheduler_running=True)
+
+    assert details["status"] == "ok"
+    assert details["database"]["ok"] is True
+    assert details["database"]["latency_ms"] >= 0
+    assert details["queue"]["backlog"] == 2
+    assert details["queue"]["sending"] == 2
+    assert details["queue"]["stuck_sending"] == 1
+    assert 590 <= details["queue"]["oldest_due_age_seconds"] <= 700
+
+
+def test_database_stats_are_cached(session, queue_email, monkeypatch):
+    first = health.database_stats()
+    queue_email(status="queued", scheduled_for=datetime.now(timezone.utc))
+
+    assert health.database_stats()["queue"]["backlog"] == first["queue"]["backlog"] == 0
+
+    monkeypatch.setattr(get_settings(), "HEALTH_CACHE_SECONDS", 0)
+    assert health.database_stats()["queue"]["backlog"] == 1
+
+
+@patch("protonmailer.scheduler.send_email")
+def test_scheduler_ticks_report_heartbeats(mock_send_email, session, monkeypatch):
+    scheduler.process_queued_emails()
+
+    [job] = health.job_ticks()
+    assert job["job"] == "process_queued_emails"
+    assert job["stale"] is False
+    assert health.health_details(scheduler_running=True)["status"] == "ok"
+
+    monkeypatch.setattr(get_settings(), "HEALTH_STALE_TICK_SECONDS", -1)
+    assert health.health_details(scheduler_running=True)["status"] == "degraded"
+
+
+def test_open_breaker_or_stopped_scheduler_degrades(account, monkeypatch):
+    assert health.health_details(scheduler_running=False)["status"] == "degraded"
+
+    monkeypatch.setattr(get_settings(), "CIRCUIT_FAILURE_THRESHOLD", 1)
+    circuit_breakers.record_failure(account, "connection refused")
+    details = health.health_details(scheduler_running=True)
+    assert details["status"] == "degraded"
+    assert details["circuit_breakers"][0]["state"] == "open"
+
+
+def test_endpoint_returns_503_when_database_is_down(monkeypatch):
+    def unreachable() -> dict:
+        return {
+            "checked_at": datetime.now(timezone.utc),
+            "database": {"ok": False, "latency_ms": None, "error": "unable to open database"},
+            "queue": None,
+        }
+
+    monkeypatch.setattr(health, "_read_database_stats", unreachable)
+    response = Response()
+
+    details = main.read_health_details(response)
+
+    assert response.status_code == 503
+    assert schemas.HealthDetails.model_validate(details).status == "down"
@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta, timezone
+
+from protonmailer import scheduler
+from protonmailer.models import Account, Campaign, CampaignRun, Contact, QueuedEmail, Template
+
+
+def _seed_campaign(
+    session, account: Account, audience_mode: str, last_run_at: datetime | None
+) -> Campaign:
+    template = Template(name="Welcome", subject="Welcome", body_html="<p>Welcome {{ name }}</p>")
+    campaign = Campaign(
+        name="Onboarding",
+        account=account,
+        template=template,
+        schedule_type="recurring",
+        schedule_config={"freq": "daily", "hour": 0, "minute": 0},
+        target_tags="trial",
+        active=True,
+        audience_mode=audience_mode,
+        last_run_at=last_run_at,
+    )
+    session.add_all([template, campaign])
+    session.commit()
+    return campaign
+
+
+def _contact(session, email: str, tags: str, tags_updated_at: datetime) -> Contact:
+    contact = Contact(email=email, tags=tags)
+    contact.tags_updated_at = tags_updated_at
+    session.add(contact)
+    session.commit()
+    return contact
+
+
+def _enqueued(session) -> list[str]:
+    return sorted(email.to_address for email in session.query(QueuedEmail))
+
+
+def test_changing_tags_moves_the_watermark(session):
+    contact = _contact(session, "a@example.com", "trial", datetime(2024, 1, 1, tzinfo=timezone.utc))
+    stamped = contact.tags_updated_at
+
+    contact.name = "Renamed"
+    contact.tags = "trial"
+    assert contact.tags_updated_at == stamped
+
+    contact.tags = "trial,paid"
+    assert contact.tags_updated_at.date() > stamped.date()
+
+
+def test_incremental_run_only_enqueues_contacts_new_to_the_segment(session, account):
+    now = datetime.now(timezone.utc)
+    campaign = _seed_campaign(session, account, "incremental", last_run_at=now - timedelta(days=1))
+    _contact(session, "old@example.com", "trial", now - timedelta(days=3))
+    _contact(session, "new@example.com", "trial", now - timedelta(hours=1))
+    _contact(session, "other@example.com", "paid", now - timedelta(hours=1))
+    retagged = _contact(session, "retagged@example.com", "paid", now - timedelta(days=3))
+    retagged.tags = "paid,trial"
+    session.commit()
+
+    scheduler.run_campaigns()
+
+    assert _enqueued(session) == ["new@example.com", "retagged@example.com"]
+    run = session.query(CampaignRun).one()
+    assert run.audience_since is not None
+    assert run.total_contacts == 2
+    session.refresh(campaign)
+    assert campaign.last_run_at.date() == now.date()
+
+
+def test_incremental_run_skips_contacts_the_campaign_already_mailed(session, account):
+    now = datetime.now(timezone.utc)
+    campaign = _seed_campaign(session, account, "incremental", last_run_at=None)
+    _contact(session, "first@example.com", "trial", now - timedelta(days=3))
+
+    scheduler.run_campaigns()
+    assert _enqueued(session) == ["first@example.com"]
+
+    # Re-tagging an already-welcomed contact must not mail them again.
+    contact = session.query(Contact).one()
+    contact.tags = "trial,vip"
+    _contact(session, "second@example.com", "trial", now)
+    campaign.last_run_at = now - timedelta(days=1)
+    session.commit()
+
+    scheduler.run_campaigns()
+
+    assert _enqueued(session) == ["first@example.com", "second@example.com"]
+
+
+def test_full_mode_still_targets_whole_segment(session, account):
+    now = datetime.now(timezone.utc)
+    _seed_campaign(session, account, "full", last_run_at=now - timedelta(days=1))
+    _contact(session, "old@example.com", "trial", now - timedelta(days=3))
+    _contact(session, "new@example.com", "trial", now - timedelta(hours=1))
+
+    scheduler.run_campaigns()
+
+    assert _enqueued(session) == ["new@example.com", "old@example.com"]
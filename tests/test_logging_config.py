@@ -0,0 +1,102 @@
+import json
+import logging
+from unittest.mock import patch
+
+import pytest
+
+from protonmailer import logging_config, scheduler
+from protonmailer.config import get_settings
+from protonmailer.logging_config import SAMPLED, JsonFormatter, SampleFilter
+
+
+def make_record(msg: str = "Queued email %s sent", extra: dict | None = None) -> logging.LogRecord:
+    record = logging.LogRecord("protonmailer.test", logging.INFO, __file__, 1, msg, (7,), None)
+    for key, value in (extra or {}).items():
+        setattr(record, key, value)
+    return record
+
+
+@pytest.fixture()
+def restore_root_logger():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    # Importing the app already configured logging; start from scratch.
+    logging_config.stop_logging()
+    yield
+    logging_config.stop_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def test_json_formatter_includes_extra_fields():
+    line = JsonFormatter().format(make_record(extra={"batch": {"sent": 3}}))
+
+    entry = json.loads(line)
+    assert entry["message"] == "Queued email 7 sent"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "protonmailer.test"
+    assert entry["batch"] == {"sent": 3}
+    assert "args" not in entry
+
+
+def test_sample_filter_keeps_one_in_n_per_call_site():
+    sampler = SampleFilter(every=3)
+
+    kept = [sampler.filter(make_record(extra=SAMPLED)) for _ in range(7)]
+    other_site = sampler.filter(make_record("Other %s", extra=SAMPLED))
+
+    assert kept == [True, False, False, True, False, False, True]
+    assert other_site is True
+    assert all(sampler.filter(make_record()) for _ in range(5))
+
+
+def test_sample_filter_zero_drops_sampled_records():
+    sampler = SampleFilter(every=0)
+
+    assert sampler.filter(make_record(extra=SAMPLED)) is False
+    assert sampler.filter(make_record()) is True
+
+
+def test_configure_logging_writes_json_through_a_queue(restore_root_logger, capsys, monkeypatch):
+    monkeypatch.setattr(get_settings(), "LOG_FORMAT", "json")
+    configure = logging_config.configure_logging()
+    assert logging_config.configure_logging() is configure
+    assert isinstance(logging.getLogger().handlers[0], logging.handlers.QueueHandler)
+
+    logging.getLogger("protonmailer.test").info("hello %s", "world", extra={"account": 1})
+    logging_config.stop_logging()
+
+    entry = json.loads(capsys.readouterr().err.strip().splitlines()[-1])
+    assert entry["message"] == "hello world"
+    assert entry["account"] == 1
+
+
+def test_queued_exceptions_keep_their_traceback_field(restore_root_logger, capsys, monkeypatch):
+    monkeypatch.setattr(get_settings(), "LOG_FORMAT", "json")
+    logging_config.configure_logging()
+
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        logging.getLogger("protonmailer.test").exception("failed %s", 1)
+    logging_config.stop_logging()
+
+    entry = json.loads(capsys.readouterr().err.strip().splitlines()[-1])
+    assert entry["message"] == "failed 1"
+    assert entry["exc_info"].startswith("Traceback")
+    assert "RuntimeError: boom" in entry["exc_info"]
+
+
+@patch("protonmailer.scheduler.send_email")
+def test_send_tick_logs_one_summary(mock_send_email, queue_email, caplog):
+    mock_send_email.return_value = (True, None)
+    for index in range(3):
+        queue_email(to_address=f"to{index}@example.com")
+
+    with caplog.at_level(logging.INFO, logger="protonmailer.scheduler"):
+        scheduler.process_queued_emails()
+
+    [summary] = [record for record in caplog.records if record.msg.startswith("Send tick")]
+    assert summary.batch == {"sent": 3}
+    assert "3 emails" in summary.getMessage()
+    assert all(getattr(record, "sampled", False) for record in caplog.records if record is not summary)
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+from protonmailer import scheduler
+from protonmailer.services import metrics
+from protonmailer.services.email_service import SendError, send_email
+
+
+def _queue(queue_email, count: int, scheduled_for: datetime) -> None:
+    for index in range(count):
+        queue_email(to_address=f"user{index}@example.com", scheduled_for=scheduled_for)
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = metrics.Histogram("test_seconds", "Test.", ("job",), buckets=(1.0, 5.0))
+    try:
+        histogram.observe(0.5, job="a")
+        histogram.observe(3.0, job="a")
+        histogram.observe(10.0, job="a")
+
+        lines = histogram.render()
+    finally:
+        metrics.REGISTRY.remove(histogram)
+
+    assert 'test_seconds_bucket{job="a",le="1"} 1' in lines
+    assert 'test_seconds_bucket{job="a",le="5"} 2' in lines
+    assert 'test_seconds_bucket{job="a",le="+Inf"} 3' in lines
+    assert 'test_seconds_sum{job="a"} 13.5' in lines
+    assert 'test_seconds_count{job="a"} 3' in lines
+
+
+@patch("protonmailer.scheduler.send_email")
+def test_send_outcomes_update_counters_and_latency(mock_send_email, account, queue_email):
+    _queue(queue_email, 3, datetime.now(timezone.utc))
+    mock_send_email.side_effect = [
+        (True, None),
+        (False, SendError("550 no such user", category="permanent", code=550)),
+        (True, None),
+    ]
+
+    scheduler.process_queued_emails()
+
+    assert metrics.emails_sent.value(account=account.id) == 2
+    assert metrics.email_failures.value(account=account.id, category="permanent") == 1
+    assert metrics.enqueue_to_sent.count() == 2
+    assert metrics.scheduler_tick_seconds.count(job="process_queued_emails") == 1
+
+
+def test_queue_gauges_are_collected_on_scrape(session, queue_email):
+    _queue(queue_email, 2, datetime.now(timezone.utc) - timedelta(minutes=10))
+
+    metrics.collect_queue_metrics(session)
+    output = metrics.render_metrics()
+
+    assert 'protonmailer_queue_emails{status="queued"} 2' in output
+    assert 590 <= metrics.oldest_due_age.value() < 700
+
+
+@patch("protonmailer.services.email_service.smtplib.SMTP_SSL")
+def test_smtp_phases_are_timed_per_account(mock_smtp_ssl, account):
+    mock_smtp_ssl.return_value.__enter__.return_value = MagicMock()
+
+    success, _ = send_email(account, ["a@example.com"], "Hi", "<p>Hi</p>")
+
+    assert success
+    for histogram in (metrics.smtp_connect_seconds, metrics.smtp_login_seconds, metrics.smtp_send_seconds):
+        assert histogram.count(account=account.id) == 1
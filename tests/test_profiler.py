@@ -0,0 +1,66 @@
+from unittest.mock import patch
+
+import pytest
+
+from protonmailer import scheduler
+from protonmailer.config import get_settings
+from protonmailer.services import profiler
+
+
+@pytest.fixture(autouse=True)
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "PROFILE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_scheduler_jobs_are_registered():
+    assert {"process_queued_emails", "run_campaigns"} <= set(profiler.jobs())
+
+
+@patch("protonmailer.scheduler.send_email")
+def test_armed_ticks_write_profiles_with_phases(mock_send_email, queue_email, profile_dir):
+    mock_send_email.return_value = (True, None)
+    queue_email()
+    profiler.arm("process_queued_emails", 1)
+
+    scheduler.process_queued_emails()
+    scheduler.process_queued_emails()
+
+    assert profiler.armed() == {}
+    assert len(list(profile_dir.glob("*.prof"))) == 1
+    [summary] = profiler.list_profiles()
+    assert summary["job"] == "process_queued_emails"
+    assert summary["phases"]["send"]["calls"] == 1
+    assert summary["phases"]["serialize"]["calls"] == 1
+    assert summary["phases"]["commit"]["calls"] >= 2
+    assert summary["error"] is None
+
+    detail = profiler.load_profile(summary["name"])
+    assert any("process_queued_emails" in row["function"] for row in detail["top_functions"])
+    assert profiler.profile_stats_path(summary["name"]).is_file()
+
+
+def test_unarmed_ticks_are_not_profiled(session, profile_dir):
+    scheduler.process_queued_emails()
+
+    assert list(profile_dir.iterdir()) == []
+
+
+def test_failing_tick_is_recorded_and_reraised():
+    @profiler.profiled("test_job")
+    def job():
+        with profiler.phase("query"):
+            raise RuntimeError("boom")
+
+    profiler.arm("test_job", 1)
+    with pytest.raises(RuntimeError):
+        job()
+
+    [summary] = profiler.list_profiles()
+    assert summary["error"] == "RuntimeError('boom')"
+    assert summary["phases"]["query"]["calls"] == 1
+
+
+def test_profile_names_cannot_escape_profile_dir():
+    assert profiler.load_profile("../secrets") is None
+    assert profiler.profile_stats_path("../../etc/passwd") is None
@@ -0,0 +1,97 @@
+from unittest.mock import patch
+
+from protonmailer import scheduler
+from protonmailer.config import get_settings
+from protonmailer.models import QueuedEmail
+from protonmailer.services.email_service import THROTTLED, SendError
+from protonmailer.services.rate_limiter import AccountRateLimiter, rate_limiter
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_unlimited_account_never_waits(make_account):
+    limiter = AccountRateLimiter(clock=FakeClock())
+    account = make_account(id=1)
+    assert all(limiter.acquire(account) == 0 for _ in range(100))
+
+
+def test_per_second_limit_paces_sends(make_account):
+    clock = FakeClock()
+    limiter = AccountRateLimiter(clock=clock)
+    account = make_account(id=1, max_per_second=2)
+
+    assert limiter.acquire(account) == 0
+    assert limiter.acquire(account) == 0
+    wait = limiter.acquire(account)
+    assert 0.4 < wait <= 0.5
+
+    clock.now += wait
+    assert limiter.acquire(account) == 0
+
+
+def test_per_hour_limit_blocks_after_quota(make_account):
+    clock = FakeClock()
+    limiter = AccountRateLimiter(clock=clock)
+    account = make_account(id=1, max_per_hour=3)
+
+    for _ in range(3):
+        assert limiter.acquire(account) == 0
+    assert limiter.acquire(account) > 1000
+
+
+def test_throttling_halves_rate_and_recovers(make_account):
+    clock = FakeClock()
+    limiter = AccountRateLimiter(clock=clock)
+    account = make_account(id=1, max_per_second=10)
+
+    pause = limiter.record_throttled(account)
+    assert limiter.rate_factor(account.id) == 0.5
+    assert limiter.acquire(account) > 0
+
+    clock.now += pause
+    assert limiter.acquire(account) == 0
+    limiter.record_success(account)
+    assert limiter.rate_factor(account.id) > 0.5
+
+
+@patch("protonmailer.scheduler.send_email")
+def test_throttled_send_is_deferred_without_spending_attempt(mock_send_email, session, queue_email):
+    mock_send_email.return_value = (False, SendError("421 slow down", THROTTLED, 421))
+    for address in ("one@example.com", "two@example.com"):
+        queue_email(to_address=address)
+
+    scheduler.process_queued_emails()
+
+    emails = session.query(QueuedEmail).all()
+    assert all(email.status == "queued" for email in emails)
+    assert all(email.attempts == 0 for email in emails)
+    assert all(email.next_attempt_at is not None for email in emails)
+    # The second email is held back by the pause instead of hitting the server.
+    mock_send_email.assert_called_once()
+
+
+@patch("protonmailer.scheduler.send_email")
+def test_endless_throttling_eventually_fails_the_email(
+    mock_send_email, session, queue_email, monkeypatch
+):
+    monkeypatch.setattr(get_settings(), "MAX_THROTTLE_DEFERRALS", 2)
+    monkeypatch.setattr(get_settings(), "MAX_SEND_ATTEMPTS", 2)
+    mock_send_email.return_value = (False, SendError("451 try again later", THROTTLED, 451))
+    email = queue_email()
+
+    for _ in range(4):
+        email.next_attempt_at = None
+        session.commit()
+        rate_limiter.reset()
+        scheduler.process_queued_emails()
+        session.refresh(email)
+
+    assert mock_send_email.call_count == 4
+    assert email.status == "failed"
+    assert (email.throttle_deferrals, email.attempts) == (2, 2)
@@ -0,0 +1,109 @@
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
+
+from protonmailer import scheduler
+from protonmailer.config import get_settings
+from protonmailer.models import Campaign, Contact, QueuedEmail, Template
+from protonmailer.services import render_pool
+from protonmailer.services.render_pool import render_contexts
+
+SUBJECT = "Hello {{ first_name }}"
+BODY = "<p>{% for i in range(3) %}{{ name }} {% endfor %}</p>"
+
+
+def _items(count: int) -> list[tuple[int, dict]]:
+    return [(index, {"first_name": f"F{index}", "name": f"Name {index}"}) for index in range(count)]
+
+
+def test_inline_rendering_yields_chunks_in_order(monkeypatch):
+    monkeypatch.setattr(get_settings(), "RENDER_CHUNK_SIZE", 2)
+
+    chunks = list(render_contexts(SUBJECT, BODY, _items(5), workers=0))
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert [key for chunk in chunks for key, _, _ in chunk] == [0, 1, 2, 3, 4]
+    assert chunks[0][1] == (1, "Hello F1", "<p>Name 1 Name 1 Name 1 </p>")
+
+
+def test_pool_rendering_matches_inline(monkeypatch):
+    monkeypatch.setattr(get_settings(), "RENDER_CHUNK_SIZE", 3)
+    monkeypatch.setattr(get_settings(), "RENDER_POOL_MIN_CONTACTS", 1)
+    items = _items(10)
+
+    inline = [row for chunk in render_contexts(SUBJECT, BODY, items, workers=0) for row in chunk]
+    pooled = [row for chunk in render_contexts(SUBJECT, BODY, items, workers=2) for row in chunk]
+
+    assert pooled == inline
+
+
+class InlineExecutor:
+    """Runs submissions straight away in-process and counts them."""
+
+    def __init__(self, max_workers, mp_context, initializer, initargs) -> None:
+        initializer(*initargs)
+        self.submitted = 0
+        executors.append(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+    def submit(self, fn, *args) -> Future:
+        self.submitted += 1
+        future: Future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+executors: list[InlineExecutor] = []
+
+
+def test_pool_keeps_a_bounded_number_of_chunks_in_flight(monkeypatch):
+    monkeypatch.setattr(get_settings(), "RENDER_CHUNK_SIZE", 1)
+    monkeypatch.setattr(get_settings(), "RENDER_POOL_MIN_CONTACTS", 1)
+    monkeypatch.setattr(render_pool, "ProcessPoolExecutor", InlineExecutor)
+    monkeypatch.setattr(render_pool, "_worker_templates", None)
+    executors.clear()
+
+    chunks = render_contexts(SUBJECT, BODY, _items(20), workers=2)
+    first = next(chunks)
+
+    assert first == [(0, "Hello F0", "<p>Name 0 Name 0 Name 0 </p>")]
+    assert executors[0].submitted == 4
+    assert len(list(chunks)) == 19
+    assert executors[0].submitted == 20
+
+
+def test_run_campaigns_renders_through_pool(monkeypatch, session, account):
+    monkeypatch.setattr(get_settings(), "RENDER_WORKERS", 2)
+    monkeypatch.setattr(get_settings(), "RENDER_CHUNK_SIZE", 1)
+    monkeypatch.setattr(get_settings(), "RENDER_POOL_MIN_CONTACTS", 1)
+    template = Template(name="Welcome", subject=SUBJECT, body_html="<p>Hi {{ name }}</p>")
+    campaign = Campaign(
+        name="Pooled",
+        account=account,
+        template=template,
+        schedule_type="one_time",
+        schedule_config={"run_at": (datetime.now(timezone.utc) - timedelta(minutes=1)).isoformat()},
+        active=True,
+    )
+    session.add_all([template, campaign])
+    session.add_all(
+        [
+            Contact(email="ada@example.com", name="Ada Lovelace"),
+            Contact(email="alan@example.com", name="Alan Turing"),
+            Contact(email="grace@example.com", name="Grace Hopper"),
+        ]
+    )
+    session.commit()
+
+    scheduler.run_campaigns()
+
+    queued = session.query(QueuedEmail).order_by(QueuedEmail.id).all()
+    assert [(email.to_address, email.subject, email.body_html) for email in queued] == [
+        ("ada@example.com", "Hello Ada", "<p>Hi Ada Lovelace</p>"),
+        ("alan@example.com", "Hello Alan", "<p>Hi Alan Turing</p>"),
+        ("grace@example.com", "Hello Grace", "<p>Hi Grace Hopper</p>"),
+    ]
@@ -0,0 +1,173 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from protonmailer import scheduler
+from protonmailer.config import get_settings
+from protonmailer.models import (
+    ArchivedEmail,
+    Attachment,
+    Campaign,
+    CampaignRun,
+    Contact,
+    EmailBody,
+    EnqueueJob,
+    QueuedEmail,
+    Template,
+)
+from protonmailer.models.attachment import queued_email_attachments
+from protonmailer.services import attachment_store, retention
+from protonmailer.services.body_store import intern_body
+
+
+@pytest.fixture(autouse=True)
+def attachment_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "ATTACHMENT_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def add_email(queue_email):
+    def add(status: str, age_days: float, **fields) -> QueuedEmail:
+        updated_at = datetime.now(timezone.utc) - timedelta(days=age_days)
+        if "body" in fields:
+            fields["body_html"] = ""
+        return queue_email(status=status, scheduled_for=updated_at, updated_at=updated_at, **fields)
+
+    return add
+
+
+def test_rows_past_their_status_ttl_are_archived(session, add_email):
+    old_sent = add_email("sent", 31, attempts=1, last_error=None)
+    add_email("sent", 5)
+    old_failed = add_email("failed", 91, attempts=5, last_error="550 no such user")
+    add_email("failed", 60)
+    add_email("cancelled", 31)
+    add_email("queued", 400)
+    old_sent_id, old_failed_id = old_sent.id, old_failed.id
+
+    report = retention.purge_expired()
+
+    assert report.archived == {"sent": 1, "failed": 1, "cancelled": 1}
+    assert report.payload_bytes == 3 * len("<p>Hi</p>")
+    remaining = sorted(status for (status,) in session.query(QueuedEmail.status))
+    assert remaining == ["failed", "queued", "sent"]
+    archived = {row.id: row for row in session.query(ArchivedEmail)}
+    assert set(archived) >= {old_sent_id, old_failed_id}
+    assert archived[old_failed_id].last_error == "550 no such user"
+    assert archived[old_failed_id].attempts == 5
+    assert retention.last_report() is report
+
+
+def test_purge_works_in_batches(session, add_email, monkeypatch):
+    monkeypatch.setattr(get_settings(), "RETENTION_BATCH_SIZE", 2)
+    for _ in range(5):
+        add_email("sent", 40)
+
+    report = retention.purge_expired()
+
+    assert report.archived == {"sent": 5}
+    assert session.query(QueuedEmail).count() == 0
+    assert session.query(ArchivedEmail).count() == 5
+
+
+def test_zero_ttl_keeps_rows_forever(session, add_email, monkeypatch):
+    monkeypatch.setattr(get_settings(), "RETENTION_SENT_DAYS", 0)
+    add_email("sent", 1000)
+
+    report = retention.purge_expired()
+
+    assert report.archived == {}
+    assert session.query(QueuedEmail).count() == 1
+
+
+def test_old_archive_rows_are_deleted(session, add_email):
+    add_email("sent", 40)
+    retention.purge_expired()
+    session.query(ArchivedEmail).update(
+        {ArchivedEmail.archived_at: datetime.now(timezone.utc) - timedelta(days=400)}
+    )
+    session.commit()
+
+    report = retention.purge_expired()
+
+    assert report.archive_rows_deleted == 1
+    assert session.query(ArchivedEmail).count() == 0
+
+
+def test_orphaned_bodies_and_attachments_are_removed(session, add_email, attachment_dir):
+    shared = intern_body(session, "<p>Shared</p>", "Shared")
+    kept = intern_body(session, "<p>Kept</p>")
+    session.commit()
+    attachment = attachment_store.store_attachment(session, b"report", "report.pdf")
+    session.commit()
+    old = add_email("sent", 40, body=shared)
+    old.attachments.append(attachment)
+    add_email("queued", 0, body=kept)
+    session.commit()
+    session.query(Attachment).update(
+        {Attachment.created_at: datetime.now(timezone.utc) - timedelta(days=2)}
+    )
+    session.commit()
+    blob = attachment_store.blob_path(attachment.sha256)
+    assert blob.exists()
+
+    report = retention.purge_expired()
+
+    assert report.bodies_deleted == 1
+    assert report.attachments_deleted == 1
+    assert session.query(EmailBody.id).all() == [(kept.id,)]
+    assert session.query(Attachment).count() == 0
+    assert session.query(queued_email_attachments).count() == 0
+    assert not blob.exists()
+
+
+def test_fresh_and_pending_attachments_are_kept(session, account):
+    fresh = attachment_store.store_attachment(session, b"fresh", "fresh.txt")
+    pending = attachment_store.store_attachment(session, b"pending", "pending.txt")
+    session.commit()
+    session.query(Attachment).filter(Attachment.id == pending.id).update(
+        {Attachment.created_at: datetime.now(timezone.utc) - timedelta(days=3)}
+    )
+    session.add(
+        EnqueueJob(
+            account_id=account.id,
+            payload={"to_addresses": ["a@example.com"], "attachment_ids": [pending.id]},
+            total=1,
+        )
+    )
+    session.commit()
+
+    report = retention.purge_expired()
+
+    assert report.attachments_deleted == 0
+    assert session.query(Attachment).count() == 2
+
+
+def test_incremental_audience_skips_archived_contacts(session, account, add_email):
+    template = Template(name="Welcome", subject="Welcome", body_html="<p>Welcome</p>")
+    campaign = Campaign(
+        name="Onboarding",
+        account=account,
+        template=template,
+        schedule_type="recurring",
+        schedule_config={"freq": "daily", "hour": 0, "minute": 0},
+        target_tags="trial",
+        active=True,
+        audience_mode="incremental",
+    )
+    mailed = Contact(email="mailed@example.com", tags="trial")
+    fresh = Contact(email="fresh@example.com", tags="trial")
+    session.add_all([template, campaign, mailed, fresh])
+    session.commit()
+    add_email("sent", 40, campaign_id=campaign.id, contact_id=mailed.id)
+    retention.purge_expired()
+    assert session.query(QueuedEmail).count() == 0
+
+    run = CampaignRun(campaign_id=campaign.id, status="running", started_at=datetime.now(timezone.utc))
+    session.add(run)
+    session.commit()
+
+    audience = scheduler._campaign_audience(session, campaign, run)
+
+    assert [contact.email for contact in audience] == ["fresh@example.com"]
@@ -0,0 +1,119 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from email.parser import BytesParser
+from email.policy import default
+from unittest.mock import patch
+
+import pytest
+
+from protonmailer import scheduler
+from protonmailer.config import get_settings
+from protonmailer.models import Campaign, Contact, EmailBody, QueuedEmail, Template
+from protonmailer.services.circuit_breaker import circuit_breakers
+
+
+@pytest.fixture
+def campaign(session, account) -> Campaign:
+    template = Template(name="Welcome", subject="Hello {{ first_name }}", body_html="<p>Hi {{ name }}</p>")
+    campaign = Campaign(
+        name="Lazy",
+        account=account,
+        template=template,
+        schedule_type="one_time",
+        schedule_config={"run_at": (datetime.now(timezone.utc) - timedelta(minutes=1)).isoformat()},
+        target_tags="news",
+        active=True,
+        render_mode="lazy",
+    )
+    contacts = [
+        Contact(email="ada@example.com", name="Ada Lovelace", tags="news"),
+        Contact(email="alan@example.com", name="Alan Turing", tags="news"),
+    ]
+    session.add_all([template, campaign] + contacts)
+    session.commit()
+    return campaign
+
+
+def test_lazy_campaign_enqueues_lightweight_rows(session, campaign):
+
+    scheduler.run_campaigns()
+
+    queued = session.query(QueuedEmail).order_by(QueuedEmail.id).all()
+    assert [email.to_address for email in queued] == ["ada@example.com", "alan@example.com"]
+    assert all(email.needs_render for email in queued)
+    assert all(email.template_version == campaign.template.version for email in queued)
+    assert session.query(EmailBody).count() == 0
+
+
+@patch("protonmailer.scheduler.send_email")
+def test_lazy_rows_are_rendered_in_send_worker(mock_send_email, session, campaign, caplog):
+    mock_send_email.return_value = (True, None)
+    scheduler.run_campaigns()
+    campaign.template.body_html = "<p>Updated for {{ name }}</p>"
+    campaign.template.version += 1
+    session.commit()
+
+    with caplog.at_level(logging.WARNING, logger="protonmailer.scheduler"):
+        scheduler.process_queued_emails()
+
+    payloads = {
+        call.kwargs["to_addresses"][0]: BytesParser(policy=default).parsebytes(
+            call.kwargs["raw_message"]
+        )
+        for call in mock_send_email.call_args_list
+    }
+    ada = payloads["ada@example.com"]
+    assert ada["Subject"] == "Hello Ada"
+    assert ada.get_content().strip() == "<p>Updated for Ada Lovelace</p>"
+    session.expire_all()
+    sent = session.query(QueuedEmail).filter(QueuedEmail.to_address == "ada@example.com").one()
+    assert sent.status == "sent"
+    assert sent.subject == "Hello Ada"
+    assert session.query(EmailBody).count() == 0
+    # The latest template wins, but the mismatch is reported once per template.
+    [warning] = [record for record in caplog.records if "older version" in record.getMessage()]
+    assert warning.getMessage().startswith("2 queued emails")
+
+
+@patch("protonmailer.scheduler.send_email")
+def test_lazy_row_fails_when_contact_is_gone(mock_send_email, session, campaign):
+    mock_send_email.return_value = (True, None)
+    scheduler.run_campaigns()
+    session.query(Contact).filter(Contact.email == "alan@example.com").delete()
+    session.commit()
+
+    scheduler.process_queued_emails()
+
+    failed = session.query(QueuedEmail).filter(QueuedEmail.to_address == "alan@example.com").one()
+    assert failed.status == "failed"
+    assert mock_send_email.call_count == 1
+
+
+@patch("protonmailer.scheduler.send_email")
+def test_lazy_row_fails_when_template_cannot_render(mock_send_email, session, campaign):
+    mock_send_email.return_value = (True, None)
+    scheduler.run_campaigns()
+    campaign.template.body_html = "<p>{{ 1 / 0 }}</p>"
+    session.commit()
+
+    scheduler.process_queued_emails()
+
+    session.expire_all()
+    statuses = {email.status for email in session.query(QueuedEmail)}
+    assert statuses == {"failed"}
+    assert session.query(QueuedEmail).first().last_error.startswith("Could not render template:")
+    mock_send_email.assert_not_called()
+
+
+@patch("protonmailer.scheduler.send_email")
+def test_rows_held_back_are_not_serialized(mock_send_email, session, campaign, monkeypatch):
+    monkeypatch.setattr(get_settings(), "CIRCUIT_FAILURE_THRESHOLD", 1)
+    scheduler.run_campaigns()
+    circuit_breakers.record_failure(campaign.account, "Connection refused")
+
+    scheduler.process_queued_emails()
+
+    session.expire_all()
+    queued = session.query(QueuedEmail).all()
+    assert all(email.status == "queued" and email.mime_payload is None for email in queued)
+    mock_send_email.assert_not_called()
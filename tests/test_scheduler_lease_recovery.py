@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from protonmailer import scheduler
+from protonmailer.models import QueuedEmail
+
+
+@patch("protonmailer.scheduler.send_email")
+def test_expired_sending_lease_is_retried(mock_send_email, session, queue_email):
+    mock_send_email.return_value = (True, None)
+    queue_email(
+        status="sending",
+        claimed_at=datetime.now(timezone.utc) - timedelta(hours=1),
+        attempts=1,
+    )
+
+    scheduler.process_queued_emails()
+
+    updated = session.query(QueuedEmail).first()
+    assert updated.status == "sent"
+    assert updated.attempts == 2
+    mock_send_email.assert_called_once()
+
+
+@patch("protonmailer.scheduler.send_email")
+def test_active_sending_lease_is_left_alone(mock_send_email, session, queue_email):
+    queue_email(
+        status="sending",
+        claimed_at=datetime.now(timezone.utc) - timedelta(seconds=5),
+        attempts=1,
+    )
+
+    scheduler.process_queued_emails()
+
+    updated = session.query(QueuedEmail).first()
+    assert updated.status == "sending"
+    assert updated.attempts == 1
+    mock_send_email.assert_not_called()
+
+
+@patch("protonmailer.scheduler.send_email")
+def test_claim_records_lease_and_attempt(mock_send_email, session, queue_email):
+    mock_send_email.return_value = (True, None)
+    queue_email()
+
+    scheduler.process_queued_emails()
+
+    updated = session.query(QueuedEmail).first()
+    assert updated.claimed_at is not None
+    assert updated.attempts == 1
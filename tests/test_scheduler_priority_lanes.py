@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from protonmailer import scheduler
+from protonmailer.models.queued_email import PRIORITY_BULK, PRIORITY_TRANSACTIONAL
+
+
+def _queue(queue_email, to_address, source, minutes_ago):
+    return queue_email(
+        to_address=to_address,
+        scheduled_for=datetime.now(timezone.utc) - timedelta(minutes=minutes_ago),
+        source=source,
+    )
+
+
+def test_priority_defaults_from_source(queue_email):
+    manual = _queue(queue_email, "a@example.com", "manual", 1)
+    campaign = _queue(queue_email, "b@example.com", "campaign", 1)
+
+    assert manual.priority == PRIORITY_TRANSACTIONAL
+    assert campaign.priority == PRIORITY_BULK
+
+
+def test_weighted_interleave_spills_unused_share():
+    assert scheduler._weighted_interleave([([1, 2, 3, 4, 5, 6], 2), (["a", "b"], 1)], 10) == [
+        1, 2, "a", 3, 4, "b", 5, 6,
+    ]
+    assert scheduler._weighted_interleave([([1, 2], 4), (["a", "b", "c"], 1)], 4) == [
+        1, 2, "a", "b",
+    ]
+
+
+@patch("protonmailer.scheduler.send_email")
+def test_manual_email_jumps_ahead_of_campaign_backlog(mock_send_email, queue_email, monkeypatch):
+    mock_send_email.return_value = (True, None)
+    monkeypatch.setattr(scheduler.get_settings(), "SEND_BATCH_SIZE", 3)
+    for index in range(10):
+        _queue(queue_email, f"bulk{index}@example.com", "campaign", 60)
+    _queue(queue_email, "urgent@example.com", "manual", 1)
+
+    scheduler.process_queued_emails()
+
+    sent_to = [call.kwargs["to_addresses"][0] for call in mock_send_email.call_args_list]
+    assert sent_to[0] == "urgent@example.com"
+    assert len(sent_to) == 3
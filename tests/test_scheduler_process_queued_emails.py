@@ -119,3 +119,19 @@ def test_process_queued_emails_ignores_future_scheduled(mock_send_email, session
     assert updated.status == "queued"
     assert updated.sent_at is None
     mock_send_email.assert_not_called()
+
+
+@patch("protonmailer.scheduler.send_email")
+def test_unserializable_email_fails_without_blocking_the_batch(mock_send_email, session, queue_email):
+    mock_send_email.return_value = (True, None)
+    poison = queue_email(to_address="poison@example.com", subject="Hello\nWorld")
+    good = queue_email(to_address="good@example.com")
+
+    scheduler.process_queued_emails()
+
+    session.expire_all()
+    poison, good = session.get(QueuedEmail, poison.id), session.get(QueuedEmail, good.id)
+    assert poison.status == "failed"
+    assert poison.last_error.startswith("Could not build message:")
+    assert good.status == "sent"
+    mock_send_email.assert_called_once()
@@ -0,0 +1,79 @@
+from unittest.mock import patch
+
+from protonmailer import scheduler
+from protonmailer.config import get_settings
+from protonmailer.models import QueuedEmail
+from protonmailer.services.email_service import CONNECTION, PERMANENT, SendError
+
+
+@patch("protonmailer.scheduler.send_email")
+def test_transient_failure_is_rescheduled_with_backoff(mock_send_email, session, queue_email):
+    mock_send_email.return_value = (False, SendError("Connection refused", CONNECTION))
+    queue_email()
+
+    scheduler.process_queued_emails()
+
+    updated = session.query(QueuedEmail).first()
+    assert updated.status == "queued"
+    assert updated.attempts == 1
+    assert updated.last_error == "Connection refused"
+    assert updated.next_attempt_at is not None
+
+    # Not due again until the backoff elapses.
+    scheduler.process_queued_emails()
+    assert mock_send_email.call_count == 1
+
+
+@patch("protonmailer.scheduler.send_email")
+def test_transient_failure_gives_up_after_max_attempts(mock_send_email, session, queue_email):
+    mock_send_email.return_value = (False, SendError("Connection refused", CONNECTION))
+    queue_email(attempts=get_settings().MAX_SEND_ATTEMPTS - 1)
+
+    scheduler.process_queued_emails()
+
+    updated = session.query(QueuedEmail).first()
+    assert updated.status == "failed"
+    assert updated.attempts == get_settings().MAX_SEND_ATTEMPTS
+
+
+@patch("protonmailer.scheduler.send_email")
+def test_permanent_failure_is_not_retried(mock_send_email, session, queue_email):
+    mock_send_email.return_value = (False, SendError("550 no such user", PERMANENT, 550))
+    queue_email()
+
+    scheduler.process_queued_emails()
+
+    updated = session.query(QueuedEmail).first()
+    assert updated.status == "failed"
+    assert updated.next_attempt_at is None
+
+
+def test_retry_delay_grows_and_is_capped():
+    settings = get_settings()
+    first = scheduler._retry_delay(1).total_seconds()
+    assert settings.RETRY_BASE_SECONDS / 2 <= first <= settings.RETRY_BASE_SECONDS
+    capped = scheduler._retry_delay(50).total_seconds()
+    assert settings.RETRY_MAX_SECONDS / 2 <= capped <= settings.RETRY_MAX_SECONDS
+
+
+@patch("protonmailer.scheduler.build_message_bytes", wraps=scheduler.build_message_bytes)
+@patch("protonmailer.scheduler.send_email")
+def test_retry_reuses_serialized_payload(mock_send_email, mock_build, session, queue_email):
+    mock_send_email.side_effect = [
+        (False, SendError("Connection refused", CONNECTION)),
+        (True, None),
+    ]
+    email = queue_email()
+
+    scheduler.process_queued_emails()
+    first_payload = mock_send_email.call_args.kwargs["raw_message"]
+    session.refresh(email)
+    email.next_attempt_at = None
+    session.commit()
+    scheduler.process_queued_emails()
+
+    assert mock_build.call_count == 1
+    assert mock_send_email.call_args.kwargs["raw_message"] == first_payload
+    session.refresh(email)
+    assert email.status == "sent"
+    assert email.mime_payload is None
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+
+from protonmailer import scheduler
+from protonmailer.config import get_settings
+from protonmailer.models import Account, Campaign, CampaignRun, Contact, QueuedEmail, Template
+
+
+def _seed_campaign(session, account: Account, contact_count: int, **schedule) -> Campaign:
+    template = Template(name="News", subject="News", body_html="<p>News</p>")
+    campaign = Campaign(
+        name="Spread",
+        account=account,
+        template=template,
+        schedule_type="one_time",
+        schedule_config={
+            "run_at": (datetime.now(timezone.utc) - timedelta(minutes=1)).isoformat(),
+            **schedule,
+        },
+        active=True,
+    )
+    contacts = [Contact(email=f"user{index}@example.com") for index in range(contact_count)]
+    session.add_all([template, campaign] + contacts)
+    session.commit()
+    return campaign
+
+
+def _offsets(session) -> list[float]:
+    run = session.query(CampaignRun).one()
+    started = run.started_at
+    return [
+        (email.scheduled_for - started).total_seconds()
+        for email in session.query(QueuedEmail).order_by(QueuedEmail.contact_id)
+    ]
+
+
+def test_send_window_spreads_run_evenly(session, account):
+    _seed_campaign(session, account, 4, send_window_minutes=60)
+
+    scheduler.run_campaigns()
+
+    assert _offsets(session) == [0, 900, 1800, 2700]
+
+
+def test_rate_caps_spacing_when_window_is_too_short(session, account):
+    _seed_campaign(session, account, 3, send_window_minutes=1, send_rate_per_hour=60)
+
+    scheduler.run_campaigns()
+
+    assert _offsets(session) == [0, 60, 120]
+
+
+def test_unspread_campaign_schedules_everything_now(session, account):
+    _seed_campaign(session, account, 3)
+
+    scheduler.run_campaigns()
+
+    assert set(_offsets(session)) == {0}
+
+
+def test_resumed_run_keeps_original_timetable(session, account, monkeypatch):
+    monkeypatch.setattr(get_settings(), "RENDER_CHUNK_SIZE", 2)
+    _seed_campaign(session, account, 4, send_rate_per_hour=3600)
+    real_intern_body = scheduler.intern_body
+    calls = []
+
+    def crash_on_third(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 3:
+            raise RuntimeError("worker killed")
+        return real_intern_body(*args, **kwargs)
+
+    monkeypatch.setattr(scheduler, "intern_body", crash_on_third)
+    scheduler.run_campaigns()
+    monkeypatch.setattr(scheduler, "intern_body", real_intern_body)
+    scheduler.run_campaigns()
+
+    session.expire_all()
+    assert _offsets(session) == [0, 1, 2, 3]
@@ -0,0 +1,101 @@
+from datetime import datetime
+from unittest.mock import patch
+
+from protonmailer import scheduler
+from protonmailer.models import QueuedEmail, SequenceEnrollment
+from protonmailer.services.sequence_service import (
+    add_months,
+    calculate_step_time,
+    cancel_enrollment,
+    enroll,
+)
+
+STEPS = [
+    {"subject": "Welcome", "body": "<p>Welcome</p>", "offset_type": "immediate"},
+    {"subject": "Tips", "body": "<p>Tips</p>", "offset_type": "days", "offset_value": 3},
+    {"subject": "Monthly", "body": "<p>Monthly</p>", "offset_type": "monthly", "day_of_month": 31, "month_interval": 1},
+]
+
+
+def _queued(session) -> list[tuple[str, str, str]]:
+    return [
+        (email.to_address, email.subject, email.status)
+        for email in session.query(QueuedEmail).order_by(QueuedEmail.id)
+    ]
+
+
+def test_step_time_helpers():
+    start = datetime(2024, 1, 31, 9, 0)
+    assert add_months(start, 1, 31) == datetime(2024, 2, 29, 9, 0)
+    assert calculate_step_time(start, STEPS[1]) == datetime(2024, 2, 3, 9, 0)
+    assert calculate_step_time(start, STEPS[0]) == start
+
+
+def test_enroll_only_queues_first_step(session, account):
+    enroll(session, account, STEPS, ["a@example.com", "b@example.com"], datetime(2024, 1, 1))
+    session.commit()
+
+    assert _queued(session) == [
+        ("a@example.com", "Welcome", "queued"),
+        ("b@example.com", "Welcome", "queued"),
+    ]
+    assert {e.current_step for e in session.query(SequenceEnrollment)} == {1}
+
+
+@patch("protonmailer.scheduler.send_email")
+def test_sent_step_enqueues_the_next_one(mock_send_email, session, account):
+    mock_send_email.return_value = (True, None)
+    enroll(session, account, STEPS, ["a@example.com"], datetime(2024, 1, 1))
+    session.commit()
+
+    scheduler.process_queued_emails()
+
+    session.expire_all()
+    emails = session.query(QueuedEmail).order_by(QueuedEmail.id).all()
+    assert [(e.subject, e.status) for e in emails] == [("Welcome", "sent"), ("Tips", "queued")]
+    assert emails[1].scheduled_for == datetime(2024, 1, 4)
+    enrollment = session.query(SequenceEnrollment).one()
+    assert enrollment.current_step == 2
+
+    scheduler.process_queued_emails()
+    scheduler.process_queued_emails()
+
+    session.expire_all()
+    assert [e.subject for e in session.query(QueuedEmail).order_by(QueuedEmail.id)] == [
+        "Welcome",
+        "Tips",
+        "Monthly",
+    ]
+    assert session.query(SequenceEnrollment).one().status == "completed"
+
+
+@patch("protonmailer.scheduler.send_email")
+def test_failed_step_stops_enrollment(mock_send_email, session, account):
+    mock_send_email.return_value = (False, "550 mailbox unavailable")
+    enroll(session, account, STEPS, ["a@example.com"], datetime(2024, 1, 1))
+    session.commit()
+
+    scheduler.process_queued_emails()
+
+    session.expire_all()
+    assert _queued(session) == [("a@example.com", "Welcome", "failed")]
+    assert session.query(SequenceEnrollment).one().status == "failed"
+
+
+@patch("protonmailer.scheduler.send_email")
+def test_cancelled_enrollment_sends_nothing_more(mock_send_email, session, account):
+    mock_send_email.return_value = (True, None)
+    enroll(session, account, STEPS, ["a@example.com", "b@example.com"], datetime(2024, 1, 1))
+    session.commit()
+    enrollment = session.query(SequenceEnrollment).filter_by(to_address="a@example.com").one()
+
+    cancel_enrollment(session, enrollment)
+    session.commit()
+    scheduler.process_queued_emails()
+
+    session.expire_all()
+    assert _queued(session) == [
+        ("a@example.com", "Welcome", "cancelled"),
+        ("b@example.com", "Welcome", "sent"),
+        ("b@example.com", "Tips", "queued"),
+    ]
@@ -0,0 +1,57 @@
+from email.parser import BytesParser
+from email.policy import default
+
+import pytest
+
+from benchmarks.smtp_sink import SMTPSink
+from protonmailer.config import get_settings
+from protonmailer.services import attachment_store
+from protonmailer.services.email_service import TRANSIENT, build_message_bytes, send_email
+
+
+@pytest.fixture()
+def sink():
+    with SMTPSink(keep_messages=True) as running:
+        yield running
+
+
+def test_send_email_is_accepted_by_sink(sink, local_account):
+    success, error = send_email(local_account(sink.port), "to@example.com", "Hello", "<p>Hi</p>")
+
+    assert (success, error) == (True, None)
+    assert sink.accepted == 1
+    message = BytesParser(policy=default).parsebytes(sink.messages[0])
+    assert message["Subject"] == "Hello"
+    assert message["To"] == "to@example.com"
+
+
+def test_injected_errors_are_transient_send_errors(local_account):
+    with SMTPSink(error_rate=1.0) as sink:
+        success, error = send_email(local_account(sink.port), "to@example.com", "Hello", "<p>Hi</p>")
+
+    assert success is False
+    assert error.category == TRANSIENT
+    assert error.code == 450
+    assert (sink.accepted, sink.rejected) == (0, 1)
+
+
+def test_streamed_attachments_arrive_intact(session, sink, local_account, tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "ATTACHMENT_DIR", str(tmp_path))
+    # Leading dots exercise dot-stuffing on the way out and unstuffing in the sink.
+    payload = b".hidden\n" * 5000
+    attachment = attachment_store.store_attachment(session, payload, "notes.txt", "text/plain")
+    session.commit()
+    account = local_account(sink.port)
+    head = build_message_bytes(
+        account.email_address, ["to@example.com"], "Notes", "<p>Attached</p>", has_attachments=True
+    )
+
+    success, error = send_email(
+        account, ["to@example.com"], "Notes", "", raw_message=head, attachments=[attachment]
+    )
+
+    assert (success, error) == (True, None)
+    message = BytesParser(policy=default).parsebytes(sink.messages[0])
+    parts = list(message.iter_attachments())
+    assert [part.get_filename() for part in parts] == ["notes.txt"]
+    assert parts[0].get_payload(decode=True) == payload
@@ -0,0 +1,76 @@
+import logging
+from unittest.mock import patch
+
+from protonmailer import scheduler
+from protonmailer.config import get_settings
+from protonmailer.models import Contact
+from protonmailer.services import metrics, sql_stats
+
+
+def test_track_counts_statements_and_groups_in_lists(session):
+    with sql_stats.track("test") as stats:
+        session.query(Contact).filter(Contact.id.in_([1, 2])).all()
+        session.query(Contact).filter(Contact.id.in_([1, 2, 3])).all()
+
+    assert stats.count == 2
+    assert stats.seconds > 0
+    assert list(stats.statements.values()) == [2]
+    assert "(?...)" in next(iter(stats.statements))
+    assert metrics.sql_statements.count(scope="test") == 1
+
+
+def test_statements_outside_a_scope_are_not_counted(session):
+    session.query(Contact).all()
+
+    assert sql_stats.current() is None
+
+
+def test_repeated_statements_are_flagged(session, monkeypatch, caplog):
+    monkeypatch.setattr(get_settings(), "SQL_REPEAT_THRESHOLD", 3)
+    with caplog.at_level(logging.WARNING, logger="protonmailer.services.sql_stats"):
+        with sql_stats.track("n_plus_one") as stats:
+            for contact_id in range(4):
+                session.get(Contact, contact_id)
+
+    [(statement, count)] = stats.repeated(3)
+    assert count == 4
+    assert statement.startswith("SELECT")
+    assert metrics.sql_repeated_statements.value(scope="n_plus_one") == 1
+    assert "n_plus_one ran 4 SQL statements" in caplog.text
+
+
+@patch("protonmailer.scheduler.send_email")
+def test_scheduler_ticks_are_tracked(mock_send_email, queue_email):
+    mock_send_email.return_value = (True, None)
+    queue_email()
+
+    scheduler.process_queued_emails()
+
+    assert metrics.sql_statements.count(scope="process_queued_emails") == 1
+    assert "protonmailer_sql_seconds_bucket{scope=\"process_queued_emails\"" in metrics.render_metrics()
+
+
+def test_dev_responses_carry_query_headers(client):
+    response = client.get("/health")
+
+    assert response.headers["X-DB-Queries"] == "0"
+    assert "X-DB-Time-Ms" in response.headers
+    assert metrics.sql_statements.count(scope="GET /health") == 1
+
+
+@patch("protonmailer.scheduler.send_email")
+def test_send_tick_loads_attachments_once(mock_send_email, queue_email, monkeypatch):
+    mock_send_email.return_value = (True, None)
+    for index in range(5):
+        queue_email(to_address=f"to{index}@example.com")
+    reports = []
+    monkeypatch.setattr(sql_stats, "_report", reports.append)
+
+    scheduler.process_queued_emails()
+
+    [stats] = reports
+    attachment_queries = sum(
+        count for statement, count in stats.statements.items() if "queued_email_attachments" in statement
+    )
+    assert attachment_queries == 1
+    assert mock_send_email.call_count == 5
@@ -0,0 +1,165 @@
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+
+from protonmailer import schemas, scheduler
+from protonmailer.config import get_settings
+from protonmailer.models import (
+    Campaign,
+    CampaignRun,
+    Contact,
+    QueuedEmail,
+    SequenceEnrollment,
+    Suppression,
+    Template,
+)
+from protonmailer.routers.suppressions import create_suppression
+from protonmailer.services import suppression
+from protonmailer.services.compose_service import enqueue_compose
+from protonmailer.services.email_service import PERMANENT, SendError
+
+
+def test_membership_is_case_insensitive_and_cached(session):
+    assert suppression.suppress(session, ["Gone@Example.com ", "bounced@example.com"], "bounce") == 2
+    assert suppression.suppress(session, ["gone@example.com"]) == 0
+
+    allowed, dropped = suppression.filter_addresses(
+        ["a@example.com", "GONE@example.com", "bounced@example.com"]
+    )
+    assert allowed == ["a@example.com"]
+    assert dropped == ["GONE@example.com", "bounced@example.com"]
+
+    # Writes through the service update the loaded set without a reload.
+    suppression.suppress(session, ["late@example.com"])
+    assert suppression.is_suppressed("late@example.com")
+    suppression.unsuppress(session, session.query(Suppression).filter_by(email="gone@example.com").one())
+    assert not suppression.is_suppressed("gone@example.com")
+
+
+def test_csv_import_counts_rows(session):
+    suppression.suppress(session, ["old@example.com"])
+    content = (
+        "email,reason,note\n"
+        "new@example.com,unsubscribe,footer link\n"
+        "OLD@example.com,,\n"
+        "not-an-email,,\n"
+        "other@example.com,spam,\n"
+    ).encode()
+
+    result = suppression.import_csv(session, content)
+
+    assert result == {"created": 1, "existing": 1, "failed": 2}
+    row = session.query(Suppression).filter_by(email="new@example.com").one()
+    assert (row.reason, row.note) == ("unsubscribe", "footer link")
+
+
+def test_api_rejects_duplicates(session):
+    created = create_suppression(
+        schemas.SuppressionCreate(email="a@example.com", reason="complaint"), db=session
+    )
+    assert (created.email, created.reason) == ("a@example.com", "complaint")
+
+    with pytest.raises(HTTPException) as excinfo:
+        create_suppression(schemas.SuppressionCreate(email="A@example.com"), db=session)
+    assert excinfo.value.status_code == 409
+
+
+def test_campaign_audience_leaves_out_suppressed_contacts(session, account):
+    template = Template(name="Welcome", subject="Welcome", body_html="<p>Welcome</p>")
+    campaign = Campaign(
+        name="Launch",
+        account=account,
+        template=template,
+        schedule_type="one_time",
+        schedule_config={"freq": "once"},
+        target_tags="news",
+        active=True,
+    )
+    session.add_all(
+        [
+            template,
+            campaign,
+            Contact(email="keep@example.com", tags="news"),
+            Contact(email="Unsubscribed@example.com", tags="news"),
+        ]
+    )
+    session.commit()
+    suppression.suppress(session, ["unsubscribed@example.com"], "unsubscribe")
+    run = CampaignRun(campaign_id=campaign.id, status="running", started_at=datetime.now(timezone.utc))
+    session.add(run)
+    session.commit()
+
+    audience = scheduler._campaign_audience(session, campaign, run)
+
+    assert [contact.email for contact in audience] == ["keep@example.com"]
+
+
+def test_compose_skips_suppressed_recipients(session, account):
+    suppression.suppress(session, ["blocked@example.com"])
+    steps = [{"subject": "Hi", "body": "<p>Hi</p>"}]
+
+    processed = enqueue_compose(
+        session, account, steps, ["a@example.com", "blocked@example.com"], datetime(2024, 1, 1)
+    )
+    session.commit()
+
+    assert processed == 2
+    assert [email.to_address for email in session.query(QueuedEmail)] == ["a@example.com"]
+
+
+@patch("protonmailer.scheduler.send_email")
+def test_send_worker_cancels_mail_to_newly_suppressed_addresses(mock_send_email, session, account):
+    mock_send_email.return_value = (True, None)
+    steps = [{"subject": "Hi", "body": "<p>Hi</p>"}, {"subject": "Again", "body": "<p>Again</p>"}]
+    enqueue_compose(session, account, steps, ["a@example.com"], datetime(2024, 1, 1))
+    session.commit()
+    suppression.suppress(session, ["a@example.com"], "unsubscribe")
+
+    scheduler.process_queued_emails()
+
+    session.expire_all()
+    email = session.query(QueuedEmail).one()
+    assert (email.status, email.last_error) == ("cancelled", "Recipient is suppressed")
+    assert session.query(SequenceEnrollment).one().status == "cancelled"
+    mock_send_email.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    ("error", "suppressed"),
+    [
+        ("550 5.1.1 <a@example.com>: Recipient address rejected: User unknown", True),
+        ("550 5.7.1 Message rejected as spam", False),
+    ],
+)
+@patch("protonmailer.scheduler.send_email")
+def test_hard_bounces_are_suppressed(
+    mock_send_email, session, queue_email, monkeypatch, error, suppressed
+):
+    monkeypatch.setattr(get_settings(), "MAX_SEND_ATTEMPTS", 1)
+    mock_send_email.return_value = (False, SendError(error, PERMANENT, 550))
+    queue_email(to_address="a@example.com")
+
+    scheduler.process_queued_emails()
+
+    assert suppression.is_suppressed("a@example.com") is suppressed
+    if suppressed:
+        assert session.query(Suppression).one().reason == "bounce"
+
+
+def test_hard_bounce_is_left_for_the_caller_to_commit(session, queue_email):
+    email = queue_email(to_address="A@example.com", status="failed")
+    error = SendError("550 5.1.1 User unknown", PERMANENT, 550)
+
+    assert suppression.suppress_hard_bounce(session, email, error) == "a@example.com"
+    assert not suppression.is_suppressed("a@example.com")
+    session.rollback()
+    assert session.query(Suppression).count() == 0
+
+    address = suppression.suppress_hard_bounce(session, email, error)
+    session.commit()
+    suppression.remember([address])
+
+    assert suppression.is_suppressed("a@example.com")
+    assert suppression.suppress_hard_bounce(session, email, error) is None